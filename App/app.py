@@ -1,25 +1,18 @@
-
+import logging
+import argparse
 import streamlit as st
 import pandas as pd
-import numpy as np
-from sklearn.neighbors import NearestNeighbors
-import joblib
-import nltk
-import re
-from nltk.corpus import stopwords
-from nltk.stem import WordNetLemmatizer
-from st_aggrid import AgGrid, GridOptionsBuilder, JsCode
-
-# Téléchargement des ressources NLTK nécessaires
-nltk.download('stopwords')
-nltk.download('wordnet')
 
-# Configuration des stopwords
-stop_words_en = set(stopwords.words('english'))
-stop_words_fr = set(stopwords.words('french'))
-stop_words = stop_words_en.union(stop_words_fr)
+from preprocessing import preprocess_text, check_text_resources
+from ivf_index import IVFIndex
+from registry import get_registry, start_warm_up
+from recommender import sjr_ranking
+from profiling import StageTimer
+from result_cache import DISK_PATH, cache_key, get_result_cache
+from journal_index import HYBRID_WEIGHT
 
-lemmatizer = WordNetLemmatizer()
+# Journal structuré des durées par étape (une ligne JSON par recommandation)
+logging.basicConfig(level=logging.INFO, format='%(message)s')
 
 # Configuration de la page Streamlit
 st.set_page_config(
@@ -28,29 +21,49 @@ st.set_page_config(
     layout="wide"
 )
 
-# Fonctions de prétraitement du texte
-def clean_text(text):
-    if isinstance(text, str):
-        text = text.lower()
-        text = re.sub(r'\d+', '', text)
-        text = re.sub(r'[^\w\s]', '', text)
-        text = text.strip()
-        return text
-    return ""
+# Options de l'application, passées après "--" : streamlit run app.py -- --result-cache data/result_cache.sqlite
+def parse_args():
+    parser = argparse.ArgumentParser(description="Application de recommandation de journaux.")
+    parser.add_argument('--result-cache', default=DISK_PATH,
+                        help="Base SQLite du cache des résultats, partagée entre processus (par défaut : mémoire seulement)")
+    return parser.parse_known_args()[0]
+
 
-def remove_stopwords(text):
-    words = text.split()
-    meaningful_words = [word for word in words if word not in stop_words]
-    return ' '.join(meaningful_words)
+# Score SJR affiché dans les cards ; "N/A" pour un journal sans SJR connu
+def format_sjr(journal):
+    if not journal.get('sjr_known', True) or pd.isna(journal['sjr_score']):
+        return "N/A"
+    return f"{journal['sjr_score']:.3f}"
 
-def lemmatize_text(text):
-    words = text.split()
-    lemmatized_words = [lemmatizer.lemmatize(word) for word in words]
-    return ' '.join(lemmatized_words)
 
 # Interface principale
 def main():
+    args = parse_args()
+    # Ressources textuelles exportées à l'entraînement : erreur immédiate si elles manquent
+    check_text_resources()
+    # Chargement des modèles en arrière-plan dès le premier affichage
+    start_warm_up()
     st.title("🎓 Système de Recommandation de Journaux Académiques")
+
+    # TF-IDF (1000 termes) ou vecteurs denses Word2Vec moyennés (embeddings.py)
+    representation = st.sidebar.radio("Représentation du texte", ["TF-IDF", "Word2Vec"])
+
+    # Les profils de journaux donnent 10 journaux distincts ; le mode article conserve
+    # l'ancien comportement (plus proches articles du même cluster)
+    mode_similarite = st.sidebar.radio(
+        "Mode de similarité",
+        ["Par journal", "Par article", "Hybride"],
+        help="Par journal : comparaison avec le profil TF-IDF moyen de chaque journal. "
+             "Hybride : similarité et score SJR combinés en un seul classement."
+    )
+    # Nombre de clusters voisins explorés en mode article (1 : cluster prédit uniquement)
+    n_probe = st.sidebar.slider("Clusters explorés", min_value=1, max_value=6, value=1,
+                                disabled=mode_similarite != "Par article")
+    # Part de la similarité dans le score hybride (le reste revient au SJR normalisé)
+    poids_similarite = st.sidebar.slider("Poids de la similarité", min_value=0.0, max_value=1.0,
+                                         value=HYBRID_WEIGHT, step=0.05,
+                                         disabled=mode_similarite != "Hybride")
+    debug = st.sidebar.checkbox("Mode debug (durées par étape)")
     
     # Création de colonnes pour une meilleure mise en page
     col1, col2 = st.columns([1, 1])
@@ -75,19 +88,56 @@ def main():
         if titre and resume and mots_cles:
             with st.spinner("Analyse en cours..."):
                 try:
+                    timer = StageTimer()
+
                     # Prétraitement du texte avec les nouvelles fonctions
                     texte_combine = f"{titre} {resume} {mots_cles}"
-                    texte_traite = clean_text(texte_combine)
-                    texte_traite = remove_stopwords(texte_traite)
-                    texte_traite = lemmatize_text(texte_traite)
+                    with timer.stage('preprocess'):
+                        texte_traite = preprocess_text(texte_combine)
+
+                    # Modèles partagés par toutes les sessions (rechargés si les fichiers changent)
+                    with timer.stage('model_registry'):
+                        models = get_registry().get()
+                    tfidf = models.tfidf
+                    kmeans = models.kmeans
+
+                    # Résultat déjà calculé pour le même texte prétraité, le même modèle et les mêmes options ?
+                    cache = get_result_cache(args.result_cache)
+                    cle = cache_key(texte_traite, models.fingerprint, representation, mode_similarite, n_probe,
+                                    poids_similarite)
+                    with timer.stage('cache_lookup'):
+                        resultat = cache.get(cle)
+                    cache_hit = resultat is not None
 
-                    # Chargement des modèles
-                    tfidf = joblib.load('Tokenizers/tfidf_vectorizer.joblib')
-                    kmeans = joblib.load('Models/kmeans_model.joblib')
+                    if not cache_hit:
+                        # Transformation et prédiction
+                        with timer.stage('transform'):
+                            vecteur = tfidf.transform([texte_traite])
+                        with timer.stage('predict'):
+                            cluster_num = kmeans.predict(vecteur)[0]
+
+                        # Garder uniquement les journaux uniques avec le score SJR le plus élevé
+                        with timer.stage('sjr_ranking'):
+                            top_10_high_sjr = sjr_ranking(models, cluster_num, k=10)
 
-                    # Transformation et prédiction
-                    vecteur = tfidf.transform([texte_traite])
-                    cluster_num = kmeans.predict(vecteur)[0]
+                        with timer.stage('similarity_search'):
+                            if representation == "Word2Vec":
+                                # Vecteurs denses précalculés par embeddings.py
+                                closest_neighbors = models.embedding_index().search(texte_traite, k=10)
+                            elif mode_similarite == "Hybride":
+                                # Similarité et SJR combinés en un seul passage vectorisé
+                                closest_neighbors = models.journal_index().hybrid_query(
+                                    vecteur, k=10, weight=poids_similarite)
+                            elif mode_similarite == "Par journal":
+                                # Profils de journaux précalculés par journal_index.py
+                                closest_neighbors = models.journal_index().query(vecteur, k=10)
+                            else:
+                                # Recherche IVF dans les index par cluster (similarity_index.py)
+                                closest_neighbors = IVFIndex(models).search(vecteur, k=10, n_probe=n_probe)[0]
+
+                        resultat = (cluster_num, top_10_high_sjr, closest_neighbors)
+                        cache.put(cle, resultat, models.fingerprint)
+                    cluster_num, top_10_high_sjr, closest_neighbors = resultat
 
                     # Affichage des résultats
                     st.success("✅ Analyse terminée !")
@@ -95,17 +145,8 @@ def main():
                     st.subheader("📊 Recommandations")
                     tab1, tab2 = st.tabs(["Par score SJR", "Par similarité"])
 
-                    df = pd.read_csv('data/df_clustering.csv')
                     with tab1:
                         st.subheader("📈 Recommandations par score SJR")
-                        same_cluster_df = df[df['cluster'] == cluster_num].copy()
-                        same_cluster_df['sjr_score'] = pd.to_numeric(same_cluster_df['sjr_score'], errors='coerce')
-                        same_cluster_df = same_cluster_df.dropna(subset=['sjr_score'])
-                        
-                        # Garder uniquement les journaux uniques avec le score SJR le plus élevé
-                        top_10_high_sjr = (same_cluster_df.sort_values(by='sjr_score', ascending=False)
-                                          .drop_duplicates(subset=['journal_name'])
-                                          .head(10))
 
                         # Style CSS pour les cards
                         st.markdown("""
@@ -148,42 +189,20 @@ def main():
                         </style>
                         """, unsafe_allow_html=True)
 
-                        # Affichage des cards
-                        for idx, (_, journal) in enumerate(top_10_high_sjr.iterrows(), 1):
-                            card_html = f"""
-                            <div class="journal-card">
-                                <div class="rank-badge">Rang #{idx}</div>
-                                <div class="journal-name">{journal['journal_name']}</div>
-                                <div class="sjr-score">Score SJR: {journal['sjr_score']:.3f}</div>
-                            </div>
-                            """
-                            st.markdown(card_html, unsafe_allow_html=True)
+                        with timer.stage('render_sjr'):
+                            # Affichage des cards
+                            for idx, (_, journal) in enumerate(top_10_high_sjr.iterrows(), 1):
+                                card_html = f"""
+                                <div class="journal-card">
+                                    <div class="rank-badge">Rang #{idx}</div>
+                                    <div class="journal-name">{journal['journal_name']}</div>
+                                    <div class="sjr-score">Score SJR: {format_sjr(journal)}</div>
+                                </div>
+                                """
+                                st.markdown(card_html, unsafe_allow_html=True)
 
                     with tab2:
                         st.subheader("🔍 Recommandations par similarité")
-                        same_cluster_df['combined_text'] = (
-                            same_cluster_df['title'] + ' ' +
-                            same_cluster_df['abstract'] + ' ' +
-                            same_cluster_df['author_keywords']
-                        )
-                        same_cluster_df['processed_text'] = same_cluster_df['combined_text'].apply(clean_text)
-                        same_cluster_df['processed_text'] = same_cluster_df['processed_text'].apply(remove_stopwords)
-                        same_cluster_df['processed_text'] = same_cluster_df['processed_text'].apply(lemmatize_text)
-
-                        X_cluster = tfidf.transform(same_cluster_df['processed_text'])
-                        knn = NearestNeighbors(n_neighbors=10, metric='cosine')
-                        knn.fit(X_cluster)
-
-                        distances, indices = knn.kneighbors(vecteur)
-                        closest_neighbors = same_cluster_df.iloc[indices[0]]
-                        
-                        # Création d'un DataFrame formaté pour l'affichage
-                        display_df_knn = closest_neighbors[['journal_name', 'sjr_score']].copy()
-                        display_df_knn.columns = ['Journal', 'Score SJR']
-                        display_df_knn['Score SJR'] = display_df_knn['Score SJR'].round(3)
-                        display_df_knn['Similarité'] = (1 - distances[0]) * 100
-                        display_df_knn['Similarité'] = display_df_knn['Similarité'].round(1)
-                        display_df_knn.index = range(1, len(display_df_knn) + 1)
                         
                         # Ajout du style CSS pour les cards de similarité
                         st.markdown("""
@@ -243,26 +262,35 @@ def main():
                         </style>
                         """, unsafe_allow_html=True)
 
-                        # Affichage des cards
-                        for idx, (_, journal) in enumerate(closest_neighbors.iterrows(), 1):
-                            similarity = (1 - distances[0][idx-1]) * 100
-                            card_html = f"""
-                            <div class="similarity-card">
-                                <div class="journal-title">{journal['journal_name']}</div>
-                                <div class="similarity-bar">
-                                    <div class="similarity-fill" style="width: {similarity}%;"></div>
-                                </div>
-                                <div class="metrics-container">
-                                    <div class="metric similarity-score">
-                                        <span>🎯 Similarité: {similarity:.1f}%</span>
+                        with timer.stage('render_similarity'):
+                            # Affichage des cards
+                            for idx, (_, journal) in enumerate(closest_neighbors.iterrows(), 1):
+                                similarity = journal['similarity'] * 100
+                                card_html = f"""
+                                <div class="similarity-card">
+                                    <div class="journal-title">{journal['journal_name']}</div>
+                                    <div class="similarity-bar">
+                                        <div class="similarity-fill" style="width: {similarity}%;"></div>
                                     </div>
-                                    <div class="metric sjr-metric">
-                                        <span>📊 Score SJR: {journal['sjr_score']:.3f}</span>
+                                    <div class="metrics-container">
+                                        <div class="metric similarity-score">
+                                            <span>🎯 Similarité: {similarity:.1f}%</span>
+                                        </div>
+                                        <div class="metric sjr-metric">
+                                            <span>📊 Score SJR: {format_sjr(journal)}</span>
+                                        </div>
                                     </div>
                                 </div>
-                            </div>
-                            """
-                            st.markdown(card_html, unsafe_allow_html=True)
+                                """
+                                st.markdown(card_html, unsafe_allow_html=True)
+
+                    timer.log('recommendation', cluster=int(cluster_num), representation=representation,
+                              mode=mode_similarite, n_probe=n_probe, model_version=models.version,
+                              cache_hit=cache_hit, cache=cache.stats())
+                    if debug:
+                        with st.expander("🛠️ Durées par étape (ms)", expanded=True):
+                            st.table(pd.DataFrame(timer.as_dict().items(), columns=['Étape', 'Durée (ms)']))
+                            st.caption(f"Cache : {'touché' if cache_hit else 'manqué'} — {cache.stats()}")
                 except Exception as e:
                     st.error(f"Une erreur s'est produite : {str(e)}")
         else:
@@ -0,0 +1,66 @@
+import os
+import time
+import argparse
+import pandas as pd
+
+from recommender import manuscript_text, recommend_batch
+from registry import ModelRegistry
+
+
+# Lecture des manuscrits (CSV ou JSONL) avec les colonnes title, abstract, keywords
+def load_manuscripts(path):
+    if path.endswith('.jsonl'):
+        manuscripts = pd.read_json(path, lines=True)
+    else:
+        manuscripts = pd.read_csv(path)
+    if 'keywords' not in manuscripts.columns and 'author_keywords' in manuscripts.columns:
+        manuscripts = manuscripts.rename(columns={'author_keywords': 'keywords'})
+
+    missing = {'title', 'abstract', 'keywords'} - set(manuscripts.columns)
+    if missing:
+        raise ValueError(f"Colonnes manquantes dans {path} : {', '.join(sorted(missing))}")
+    if 'id' not in manuscripts.columns:
+        manuscripts['id'] = range(len(manuscripts))
+    return manuscripts.fillna({'title': '', 'abstract': '', 'keywords': ''})
+
+
+# Écriture des recommandations au format déduit de l'extension
+def save_recommendations(records, path):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    if path.endswith('.jsonl'):
+        records.to_json(path, orient='records', lines=True, force_ascii=False)
+    else:
+        records.to_csv(path, index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recommandation de journaux pour un lot de manuscrits.")
+    parser.add_argument('input', help="Fichier CSV ou JSONL (colonnes title, abstract, keywords, id optionnel)")
+    parser.add_argument('output', help="Fichier de sortie CSV ou JSONL")
+    parser.add_argument('--top-k', type=int, default=10)
+    parser.add_argument('--chunk-size', type=int, default=256,
+                        help="Nombre de manuscrits par bloc de produit matriciel")
+    parser.add_argument('--jobs', type=int, default=-1,
+                        help="Processus de prétraitement (-1 : tous les cœurs)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    models = ModelRegistry().get()
+    manuscripts = load_manuscripts(args.input)
+    texts = [manuscript_text(titre, resume, mots_cles) for titre, resume, mots_cles in
+             zip(manuscripts['title'], manuscripts['abstract'], manuscripts['keywords'])]
+
+    records = recommend_batch(models, texts, manuscripts['id'].to_numpy(), args.top_k, args.chunk_size,
+                              n_jobs=args.jobs)
+    save_recommendations(records, args.output)
+
+    elapsed = time.perf_counter() - start
+    print(f"{len(manuscripts)} manuscrits traités en {elapsed:.1f} s "
+          f"({len(manuscripts) / max(elapsed, 1e-9) * 60:.0f} manuscrits/min).")
+    print(f"Recommandations sauvegardées dans '{args.output}'.")
+
+
+if __name__ == "__main__":
+    main()
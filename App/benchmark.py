@@ -0,0 +1,233 @@
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+import multiprocessing
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import joblib
+
+from preprocessing import preprocess_text
+from recommender import manuscript_text, sjr_ranking
+from batch_recommend import load_manuscripts
+from registry import KMEANS_PATH, ModelRegistry
+from similarity_index import DATA_PATH, TFIDF_PATH, build_index
+from ivf_index import IVFIndex
+from cluster_store import write_cluster_dataset
+from profiling import StageTimer, peak_rss_mb
+
+BENCHMARK_DIR = 'benchmarks'
+CORPUS_SIZES = (1_000, 10_000, 100_000)
+N_MANUSCRIPTS = 200
+RANDOM_STATE = 42
+
+# Budgets du démarrage à froid (secondes) : imports de l'application, puis première recommandation
+IMPORT_BUDGET_S = 1.5
+FIRST_RECOMMENDATION_BUDGET_S = 5.0
+
+# Exécuté dans un interpréteur neuf : mêmes imports et même chemin que l'application
+COLD_START_SCRIPT = '''
+import json, time
+start = time.perf_counter()
+from preprocessing import preprocess_text
+from registry import get_registry, warm_up
+from recommender import sjr_ranking
+from ivf_index import IVFIndex
+imported = time.perf_counter()
+warm_up()
+warmed = time.perf_counter()
+models = get_registry().get()
+vecteur = models.tfidf.transform([preprocess_text("deep learning for protein structure prediction")])
+cluster_num = models.kmeans.predict(vecteur)[0]
+sjr_ranking(models, cluster_num, 10)
+IVFIndex(models).search(vecteur, 10)
+done = time.perf_counter()
+print(json.dumps({'import_s': imported - start, 'warm_up_s': warmed - imported,
+                  'first_query_s': done - warmed, 'first_recommendation_s': done - start}))
+'''
+
+STAGES = ['model_registry', 'preprocess', 'transform', 'predict', 'sjr_ranking', 'similarity_search']
+
+
+# Corpus de taille donnée, tiré (avec remise si nécessaire) du jeu de clustering
+def sample_corpus(df, size, random_state=RANDOM_STATE):
+    return df.sample(n=size, replace=size > len(df), random_state=random_state).reset_index(drop=True)
+
+
+# Manuscrits rejoués : fichier fourni, ou échantillon déterministe du jeu de clustering
+def benchmark_texts(df, manuscripts_path=None, n=N_MANUSCRIPTS, random_state=RANDOM_STATE):
+    if manuscripts_path:
+        manuscripts = load_manuscripts(manuscripts_path)
+    else:
+        manuscripts = df.sample(n=min(n, len(df)), random_state=random_state).rename(
+            columns={'author_keywords': 'keywords'}).fillna({'title': '', 'abstract': '', 'keywords': ''})
+    return [manuscript_text(titre, resume, mots_cles) for titre, resume, mots_cles in
+            zip(manuscripts['title'], manuscripts['abstract'], manuscripts['keywords'])]
+
+
+# Construction du corpus et de son index (processus séparé : n'affecte pas la mémoire mesurée)
+def prepare_size(df_path, tfidf_path, size, work_dir):
+    df = sample_corpus(pd.read_csv(df_path), size)
+    data_path = os.path.join(work_dir, 'df_clustering.csv')
+    index_dir = os.path.join(work_dir, 'index')
+    dataset_dir = os.path.join(work_dir, 'clusters')
+    df.to_csv(data_path, index=False)
+    write_cluster_dataset(df, dataset_dir)
+    start = time.perf_counter()
+    build_index(df, joblib.load(tfidf_path), index_dir)
+    return data_path, index_dir, dataset_dir, round(time.perf_counter() - start, 3)
+
+
+# Rejoue les manuscrits un par un sur le chemin de recommandation de l'application
+def replay(tfidf_path, kmeans_path, data_path, index_dir, dataset_dir, texts, k=10, n_probe=1):
+    start = time.perf_counter()
+    registry = ModelRegistry(tfidf_path, kmeans_path, data_path, index_dir, dataset_dir)
+    registry.get()
+    load_seconds = time.perf_counter() - start
+
+    latencies = {stage: [] for stage in STAGES + ['total_ms']}
+    start = time.perf_counter()
+    for text in texts:
+        timer = StageTimer()
+        with timer.stage('model_registry'):
+            models = registry.get()
+        with timer.stage('preprocess'):
+            processed = preprocess_text(text)
+        with timer.stage('transform'):
+            vecteur = models.tfidf.transform([processed])
+        with timer.stage('predict'):
+            cluster_num = models.kmeans.predict(vecteur)[0]
+        with timer.stage('sjr_ranking'):
+            sjr_ranking(models, cluster_num, k)
+        with timer.stage('similarity_search'):
+            IVFIndex(models).search(vecteur, k, n_probe)
+        for stage, ms in timer.as_dict().items():
+            latencies[stage].append(ms)
+    elapsed = time.perf_counter() - start
+
+    return {
+        'load_seconds': round(load_seconds, 3),
+        'throughput_per_s': round(len(texts) / elapsed, 2) if elapsed > 0 else None,
+        'p50_ms': {stage: round(float(np.percentile(values, 50)), 3) for stage, values in latencies.items()},
+        'p99_ms': {stage: round(float(np.percentile(values, 99)), 3) for stage, values in latencies.items()},
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+# Un processus neuf par étape pour que le pic de mémoire soit propre à chaque taille de corpus
+def run_in_fresh_process(function, *args):
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        return executor.submit(function, *args).result()
+
+
+# Démarrage à froid mesuré dans un processus neuf (interpréteur compris)
+def cold_start():
+    start = time.perf_counter()
+    output = subprocess.run([sys.executable, '-c', COLD_START_SCRIPT], capture_output=True, text=True, check=True)
+    process_seconds = time.perf_counter() - start
+    result = json.loads(output.stdout.strip().splitlines()[-1])
+    result = {key: round(value, 3) for key, value in result.items()}
+    result['process_s'] = round(process_seconds, 3)
+    result['import_within_budget'] = result['import_s'] <= IMPORT_BUDGET_S
+    result['first_recommendation_within_budget'] = result['first_recommendation_s'] <= FIRST_RECOMMENDATION_BUDGET_S
+    return result
+
+
+# Version du modèle entraîné (manifeste écrit par train.py), si disponible
+def model_manifest(kmeans_path=KMEANS_PATH):
+    path = os.path.join(os.path.dirname(kmeans_path), 'manifest.json')
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        manifest = json.load(f)
+    return {key: manifest.get(key) for key in ('version', 'best_k', 'documents', 'sklearn_version')}
+
+
+# Écarts relatifs (en %) par rapport à un rapport précédent
+def compare(report, previous):
+    previous_runs = {run['corpus_size']: run for run in previous['runs']}
+    rows = []
+    for run in report['runs']:
+        before = previous_runs.get(run['corpus_size'])
+        if before is None:
+            continue
+        for metric, now, then in [
+            ('throughput_per_s', run['throughput_per_s'], before['throughput_per_s']),
+            ('p50_total_ms', run['p50_ms']['total_ms'], before['p50_ms']['total_ms']),
+            ('p99_total_ms', run['p99_ms']['total_ms'], before['p99_ms']['total_ms']),
+            ('peak_rss_mb', run['peak_rss_mb'], before['peak_rss_mb']),
+        ]:
+            delta = round((now - then) / then * 100, 1) if now is not None and then else None
+            rows.append({'corpus_size': run['corpus_size'], 'metric': metric,
+                         'previous': then, 'current': now, 'delta_%': delta})
+    return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Banc d'essai du chemin de recommandation à tailles de corpus croissantes.")
+    parser.add_argument('--manuscripts', default=None,
+                        help="Fichier CSV ou JSONL rejoué ; par défaut, un échantillon fixe du jeu de clustering")
+    parser.add_argument('--sizes', default=','.join(str(size) for size in CORPUS_SIZES),
+                        help="Tailles de corpus séparées par des virgules")
+    parser.add_argument('--top-k', type=int, default=10)
+    parser.add_argument('--n-probe', type=int, default=1)
+    parser.add_argument('--data', default=DATA_PATH)
+    parser.add_argument('--tfidf', default=TFIDF_PATH)
+    parser.add_argument('--kmeans', default=KMEANS_PATH)
+    parser.add_argument('--output', default=None, help="Rapport JSON (par défaut benchmarks/bench_<date>.json)")
+    parser.add_argument('--compare', default=None, help="Rapport JSON précédent à comparer")
+    parser.add_argument('--cold-start', action='store_true',
+                        help="Mesurer aussi le démarrage à froid (imports et première recommandation)")
+    args = parser.parse_args()
+
+    texts = benchmark_texts(pd.read_csv(args.data), args.manuscripts)
+    runs = []
+    for size in [int(value) for value in args.sizes.split(',') if value]:
+        with tempfile.TemporaryDirectory() as work_dir:
+            data_path, index_dir, dataset_dir, build_seconds = run_in_fresh_process(
+                prepare_size, args.data, args.tfidf, size, work_dir)
+            run = run_in_fresh_process(replay, args.tfidf, args.kmeans, data_path, index_dir, dataset_dir,
+                                       texts, args.top_k, args.n_probe)
+        run = {'corpus_size': size, 'manuscripts': len(texts), 'index_build_seconds': build_seconds, **run}
+        runs.append(run)
+        print(f"{size:>8} articles : {run['throughput_per_s']} req/s, "
+              f"p50 {run['p50_ms']['total_ms']} ms, p99 {run['p99_ms']['total_ms']} ms, "
+              f"pic mémoire {run['peak_rss_mb']} Mo")
+
+    cold = None
+    if args.cold_start:
+        cold = cold_start()
+        print(f"Démarrage à froid : imports {cold['import_s']} s (budget {IMPORT_BUDGET_S} s), "
+              f"première recommandation {cold['first_recommendation_s']} s (budget {FIRST_RECOMMENDATION_BUDGET_S} s)")
+
+    report = {
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'model': model_manifest(args.kmeans),
+        'top_k': args.top_k,
+        'n_probe': args.n_probe,
+        'runs': runs,
+        'cold_start': cold,
+    }
+    output = args.output or os.path.join(BENCHMARK_DIR, f"bench_{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Rapport enregistré dans '{output}'.")
+
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+        print(compare(report, previous).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import os
+import json
+import shutil
+import argparse
+import pandas as pd
+
+from similarity_index import DATA_PATH, replace_file
+
+# Jeu de clustering au format Parquet, un dossier par cluster (cluster=<k>/part-<n>.parquet)
+CLUSTER_DATASET_DIR = 'data/clusters'
+
+STORED_COLUMNS = ['title', 'author_keywords', 'abstract', 'issn', 'journal_name', 'sjr_score']
+
+
+# Schéma colonnaire : noms de journaux encodés par dictionnaire, score SJR en float32
+def _schema():
+    import pyarrow as pa
+    return pa.schema([
+        ('title', pa.string()),
+        ('author_keywords', pa.string()),
+        ('abstract', pa.string()),
+        ('issn', pa.string()),
+        ('journal_name', pa.dictionary(pa.int32(), pa.string())),
+        ('sjr_score', pa.float32()),
+    ])
+
+
+def to_table(df):
+    import pyarrow as pa
+    frame = df.reindex(columns=STORED_COLUMNS)
+    columns = {}
+    for column in STORED_COLUMNS:
+        if column == 'sjr_score':
+            values = pd.to_numeric(frame[column], errors='coerce').astype('float32')
+            columns[column] = pa.array(values, type=pa.float32(), from_pandas=True)
+            continue
+        values = frame[column].astype(object).where(frame[column].notna(), None)
+        values = values.map(lambda value: value if value is None else str(value))
+        array = pa.array(values, type=pa.string(), from_pandas=True)
+        columns[column] = array.dictionary_encode() if column == 'journal_name' else array
+    return pa.Table.from_pydict(columns, schema=_schema())
+
+
+def _write_part(df, cluster_dir, name):
+    import pyarrow.parquet as pq
+    os.makedirs(cluster_dir, exist_ok=True)
+    table = to_table(df)
+    replace_file(os.path.join(cluster_dir, name), lambda f: pq.write_table(table, f))
+
+
+# Fichiers d'un cluster listés dans le manifeste (anciens manifestes : nombre de fichiers part-<n>)
+def part_names(entry):
+    parts = entry['parts']
+    return parts if isinstance(parts, list) else [f'part-{part:04d}.parquet' for part in range(parts)]
+
+
+def load_dataset_manifest(dataset_dir=CLUSTER_DATASET_DIR):
+    with open(os.path.join(dataset_dir, 'manifest.json')) as f:
+        return json.load(f)
+
+
+def _write_dataset_manifest(manifest, dataset_dir):
+    replace_file(os.path.join(dataset_dir, 'manifest.json'),
+                 lambda f: json.dump(manifest, f, indent=2), mode='w')
+
+
+# Écrit tout le jeu de clustering ; le nouveau dossier remplace l'ancien d'un bloc
+def write_cluster_dataset(df, dataset_dir=CLUSTER_DATASET_DIR):
+    tmp_dir = dataset_dir + '.tmp'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    manifest = {'columns': STORED_COLUMNS, 'clusters': {}, 'batches': []}
+    for cluster_num, rows in df.dropna(subset=['cluster']).groupby('cluster'):
+        cluster_num = int(cluster_num)
+        _write_part(rows, os.path.join(tmp_dir, f'cluster={cluster_num}'), 'part-0000.parquet')
+        manifest['clusters'][str(cluster_num)] = {'rows': len(rows), 'parts': ['part-0000.parquet']}
+    _write_dataset_manifest(manifest, tmp_dir)
+
+    old_dir = dataset_dir + '.old'
+    shutil.rmtree(old_dir, ignore_errors=True)
+    if os.path.exists(dataset_dir):
+        os.replace(dataset_dir, old_dir)
+    os.replace(tmp_dir, dataset_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+    return manifest
+
+
+# Ajoute un lot de nouvelles lignes : un fichier part-<lot>.parquet par cluster touché. Un lot déjà
+# présent dans le manifeste est ignoré, et les fichiers d'un ajout interrompu (absents du manifeste)
+# sont réécrits : reprendre une mise à jour interrompue ne duplique aucune ligne
+def append_to_cluster_dataset(df, batch_id, dataset_dir=CLUSTER_DATASET_DIR):
+    manifest = load_dataset_manifest(dataset_dir)
+    batches = manifest.setdefault('batches', [])
+    if batch_id in batches:
+        return manifest
+    name = f'part-{batch_id}.parquet'
+    for cluster_num, rows in df.groupby('cluster'):
+        key = str(int(cluster_num))
+        entry = manifest['clusters'].get(key, {'rows': 0, 'parts': []})
+        _write_part(rows, os.path.join(dataset_dir, f'cluster={key}'), name)
+        manifest['clusters'][key] = {'rows': entry['rows'] + len(rows), 'parts': part_names(entry) + [name]}
+    batches.append(batch_id)
+    _write_dataset_manifest(manifest, dataset_dir)
+    return manifest
+
+
+# Lit uniquement les fichiers du cluster demandé listés dans le manifeste, et seulement les colonnes utiles
+def read_cluster(cluster_num, columns=None, dataset_dir=CLUSTER_DATASET_DIR):
+    import pyarrow.parquet as pq
+    entry = load_dataset_manifest(dataset_dir)['clusters'].get(str(int(cluster_num)))
+    if entry is None:
+        return pd.DataFrame(columns=columns or STORED_COLUMNS)
+    cluster_dir = os.path.join(dataset_dir, f'cluster={int(cluster_num)}')
+    paths = [os.path.join(cluster_dir, name) for name in part_names(entry)]
+    return pd.concat([pq.read_table(path, columns=columns).to_pandas() for path in paths], ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convertit df_clustering.csv en Parquet partitionné par cluster.")
+    parser.add_argument('--data', default=DATA_PATH)
+    parser.add_argument('--output', default=CLUSTER_DATASET_DIR)
+    args = parser.parse_args()
+
+    manifest = write_cluster_dataset(pd.read_csv(args.data), args.output)
+    total = sum(entry['rows'] for entry in manifest['clusters'].values())
+    print(f"{total} articles répartis en {len(manifest['clusters'])} clusters dans '{args.output}'.")
+
+
+if __name__ == "__main__":
+    main()
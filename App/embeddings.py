@@ -0,0 +1,154 @@
+import os
+import json
+import argparse
+import numpy as np
+import pandas as pd
+
+from preprocessing import preprocess_corpus
+from similarity_index import DATA_PATH, INDEX_DIR, META_COLUMNS, replace_file, load_manifest, write_manifest
+
+EMBEDDING_DIR = os.path.join(INDEX_DIR, 'embeddings')
+
+VECTOR_SIZE = 100
+WINDOW = 5
+MIN_COUNT = 2
+EPOCHS = 10
+RANDOM_STATE = 42
+
+# Nombre de documents par bloc lors du produit matrice-vecteur
+BLOCK_SIZE = 65_536
+
+
+# Moyenne des vecteurs des mots connus de chaque document, normalisée (L2)
+def average_vectors(token_lists, word_vectors, vocabulary):
+    vectors = np.zeros((len(token_lists), word_vectors.shape[1]), dtype=np.float32)
+    for i, tokens in enumerate(token_lists):
+        rows = [vocabulary[token] for token in tokens if token in vocabulary]
+        if rows:
+            vectors[i] = word_vectors[rows].mean(axis=0)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+# Articles encodés (ceux qui ont un score SJR) et leurs mots prétraités
+def document_tokens(df, n_jobs=1):
+    df = df.assign(sjr_score=pd.to_numeric(df['sjr_score'], errors='coerce'))
+    df = df.dropna(subset=['sjr_score']).reset_index(drop=True)
+    texts = df['title'].fillna('') + ' ' + df['abstract'].fillna('') + ' ' + df['author_keywords'].fillna('')
+    return df, [text.split() for text in preprocess_corpus(texts, n_jobs)]
+
+
+# Étape hors ligne : Word2Vec entraîné sur le corpus, puis un vecteur dense par article
+def build_embeddings(df, output_dir=EMBEDDING_DIR, n_jobs=1):
+    from gensim.models import Word2Vec
+
+    df, token_lists = document_tokens(df, n_jobs)
+
+    workers = n_jobs if n_jobs and n_jobs > 0 else os.cpu_count() or 1
+    model = Word2Vec(sentences=token_lists, vector_size=VECTOR_SIZE, window=WINDOW, min_count=MIN_COUNT,
+                     epochs=EPOCHS, seed=RANDOM_STATE, workers=workers)
+    word_vectors = model.wv.vectors.astype(np.float32)
+    vocabulary = {word: i for i, word in enumerate(model.wv.index_to_key)}
+    vectors = average_vectors(token_lists, word_vectors, vocabulary)
+
+    os.makedirs(output_dir, exist_ok=True)
+    replace_file(os.path.join(output_dir, 'word_vectors.npy'), lambda f: np.save(f, word_vectors))
+    replace_file(os.path.join(output_dir, 'vocabulary.json'),
+                 lambda f: json.dump(model.wv.index_to_key, f, ensure_ascii=False), mode='w')
+    replace_file(os.path.join(output_dir, 'documents.f32'), lambda f: f.write(vectors.tobytes()))
+    replace_file(os.path.join(output_dir, 'documents.csv'), lambda f: df[META_COLUMNS].to_csv(f, index=False), mode='w')
+    manifest = {'documents': len(vectors), 'dimension': VECTOR_SIZE, 'vocabulary': len(vocabulary),
+                'meta_bytes': os.path.getsize(os.path.join(output_dir, 'documents.csv')), 'batches': []}
+    replace_file(os.path.join(output_dir, 'manifest.json'),
+                 lambda f: json.dump(manifest, f, indent=2), mode='w')
+    print(f"{len(vectors)} documents encodés ({len(vocabulary)} mots, dimension {VECTOR_SIZE}).")
+
+
+# Mise à jour incrémentale : les nouveaux articles sont encodés avec les vecteurs de mots existants
+# (Word2Vec n'est pas réentraîné, les mots inconnus sont ignorés) et ajoutés à la fin de documents.f32
+# et de documents.csv ; le manifeste, écrit en dernier, fixe le nombre de documents lus. Un lot déjà
+# présent dans le manifeste est ignoré, les restes d'un ajout interrompu sont remplacés.
+def append_to_embeddings(df, batch, index_dir=EMBEDDING_DIR, n_jobs=1):
+    manifest = load_manifest(index_dir)
+    batches = manifest.setdefault('batches', [])
+    if batch in batches:
+        return manifest
+    df, token_lists = document_tokens(df, n_jobs)
+    with open(os.path.join(index_dir, 'vocabulary.json'), encoding='utf-8') as f:
+        vocabulary = {word: i for i, word in enumerate(json.load(f))}
+    word_vectors = np.load(os.path.join(index_dir, 'word_vectors.npy'), mmap_mode='r')
+    vectors = average_vectors(token_lists, word_vectors, vocabulary)
+
+    n_documents = manifest['documents']
+    with open(os.path.join(index_dir, 'documents.f32'), 'r+b') as f:
+        f.truncate(n_documents * manifest['dimension'] * 4)
+        f.seek(0, os.SEEK_END)
+        f.write(vectors.tobytes())
+    meta_path = os.path.join(index_dir, 'documents.csv')
+    if 'meta_bytes' in manifest:
+        with open(meta_path, 'r+b') as f:
+            f.truncate(manifest['meta_bytes'])
+    else:
+        # Index construit avant le suivi de la taille de documents.csv : relu une seule fois
+        meta = pd.read_csv(meta_path, nrows=n_documents)
+        replace_file(meta_path, lambda f: meta.to_csv(f, index=False), mode='w')
+    df[META_COLUMNS].to_csv(meta_path, mode='a', header=False, index=False)
+
+    manifest['documents'] = n_documents + len(vectors)
+    manifest['meta_bytes'] = os.path.getsize(meta_path)
+    batches.append(batch)
+    write_manifest(manifest, index_dir)
+    return manifest
+
+
+# Index dense : la matrice float32 est projetée en mémoire (pages partagées entre processus)
+class EmbeddingIndex:
+    def __init__(self, index_dir=EMBEDDING_DIR):
+        if not os.path.exists(os.path.join(index_dir, 'manifest.json')):
+            raise FileNotFoundError(
+                f"Index dense introuvable dans '{index_dir}'. Lancez d'abord : python embeddings.py"
+            )
+        with open(os.path.join(index_dir, 'manifest.json')) as f:
+            manifest = json.load(f)
+        with open(os.path.join(index_dir, 'vocabulary.json'), encoding='utf-8') as f:
+            self.vocabulary = {word: i for i, word in enumerate(json.load(f))}
+        self.word_vectors = np.load(os.path.join(index_dir, 'word_vectors.npy'), mmap_mode='r')
+        self.vectors = np.memmap(os.path.join(index_dir, 'documents.f32'), dtype=np.float32, mode='r',
+                                 shape=(manifest['documents'], manifest['dimension']))
+        self.meta = pd.read_csv(os.path.join(index_dir, 'documents.csv'))
+
+    # Vecteur d'un texte déjà prétraité
+    def embed(self, processed_text):
+        return average_vectors([processed_text.split()], self.word_vectors, self.vocabulary)[0]
+
+    # Produit matrice-vecteur par blocs ; seuls les k meilleurs candidats de chaque bloc sont conservés
+    def search(self, processed_text, k=10, block_size=BLOCK_SIZE):
+        query = self.embed(processed_text)
+        best_rows = np.empty(0, dtype=np.int64)
+        best_scores = np.empty(0, dtype=np.float32)
+        for start in range(0, self.vectors.shape[0], block_size):
+            scores = self.vectors[start:start + block_size] @ query
+            kk = min(k, len(scores))
+            top = np.argpartition(-scores, kk - 1)[:kk]
+            best_rows = np.concatenate([best_rows, top + start])
+            best_scores = np.concatenate([best_scores, scores[top]])
+
+        order = np.argsort(-best_scores, kind='stable')[:k]
+        recommendations = self.meta.iloc[best_rows[order]].copy()
+        recommendations['similarity'] = best_scores[order]
+        return recommendations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Construit l'index dense (Word2Vec moyenné) des articles.")
+    parser.add_argument('--data', default=DATA_PATH)
+    parser.add_argument('--output', default=EMBEDDING_DIR)
+    parser.add_argument('--jobs', type=int, default=-1, help="Processus (-1 : tous les cœurs)")
+    args = parser.parse_args()
+
+    build_embeddings(pd.read_csv(args.data), args.output, args.jobs)
+    print(f"Index dense sauvegardé dans '{args.output}'.")
+
+
+if __name__ == "__main__":
+    main()
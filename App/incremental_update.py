@@ -0,0 +1,187 @@
+import os
+import json
+import hashlib
+import argparse
+import numpy as np
+import pandas as pd
+import joblib
+
+from preprocessing import preprocess_corpus
+from registry import KMEANS_PATH
+from cluster_store import CLUSTER_DATASET_DIR, append_to_cluster_dataset
+from journal_index import append_to_journal_index
+from embeddings import append_to_embeddings
+from similarity_index import (DATA_PATH, TFIDF_PATH, INDEX_DIR, prepare_cluster_rows,
+                              append_to_cluster_index, load_manifest, write_manifest, replace_file)
+
+# Seuils de dérive au-delà desquels un réentraînement complet est préférable
+MAX_DISTANCE_RATIO = 1.5
+MAX_CENTROID_SHIFT = 0.2
+# Colonnes du jeu de clustering lues par la mise à jour : clés de déduplication et cluster
+KEY_COLUMNS = ['title', 'journal_name', 'cluster']
+
+
+# Clé d'un article : titre et journal normalisés
+def article_keys(df):
+    return (df['title'].fillna('').str.lower().str.strip() + '|' +
+            df['journal_name'].fillna('').str.lower().str.strip())
+
+
+# Lignes du jeu fusionné absentes du jeu de clustering
+def select_new_rows(merged_df, df_clustering):
+    known = set(article_keys(df_clustering))
+    merged_df = merged_df.drop_duplicates()
+    return merged_df[~article_keys(merged_df).isin(known)].reset_index(drop=True)
+
+
+# Identifiant d'un lot : empreinte des clés des nouvelles lignes. Tant que le jeu de clustering
+# n'a pas reçu ces lignes, une nouvelle exécution retrouve le même lot
+def batch_id(new_rows):
+    keys = '\n'.join(sorted(article_keys(new_rows)))
+    return hashlib.sha1(keys.encode('utf-8')).hexdigest()[:16]
+
+
+# Vecteurs utilisés pour le clustering (même texte que dans le notebook d'entraînement)
+def clustering_vectors(df, tfidf, n_jobs=1):
+    filled = df.fillna({'title': '', 'abstract': '', 'author_keywords': '', 'journal_name': ''})
+    combined_text = (filled['title'] + ' ' + filled['abstract'] + ' ' +
+                     filled['author_keywords'] + ' ' + filled['journal_name'])
+    return tfidf.transform(preprocess_corpus(combined_text, n_jobs))
+
+
+# Moyenne courante : chaque centroïde devient la moyenne exacte de ses anciens et nouveaux points
+def updated_centroids(kmeans, X_new, labels, counts):
+    centers = np.array(kmeans.cluster_centers_, dtype=np.float64)
+    for cluster_num in np.unique(labels):
+        selected = labels == cluster_num
+        m = int(selected.sum())
+        n = int(counts.get(cluster_num, 0))
+        new_sum = np.asarray(X_new[selected].sum(axis=0)).ravel()
+        centers[cluster_num] = (n * centers[cluster_num] + new_sum) / (n + m)
+    return centers
+
+
+# Mesures de dérive des nouveaux articles par rapport au modèle existant
+def measure_drift(kmeans, X_new, labels, new_centers, n_train):
+    distances = kmeans.transform(X_new)[np.arange(len(labels)), labels]
+    reference = kmeans.inertia_ / max(n_train, 1)
+    old_centers = np.asarray(kmeans.cluster_centers_)
+    shifts = np.linalg.norm(new_centers - old_centers, axis=1) / np.maximum(np.linalg.norm(old_centers, axis=1), 1e-12)
+    return {
+        'new_rows': int(len(labels)),
+        'distance_ratio': float(np.mean(distances ** 2) / reference) if reference > 0 else 0.0,
+        'centroid_shift': float(shifts.max()),
+        'empty_vector_rate': float(np.mean(X_new.getnnz(axis=1) == 0)),
+    }
+
+
+# Mise à jour incrémentale : affectation, index par cluster, profils de journaux, index dense, centroïdes.
+# Retourne le rapport de dérive ; rien n'est écrit si un réentraînement complet est requis.
+# Reprise après interruption : tant que le jeu de clustering (écrit avant les centroïdes, en dernier)
+# n'a pas reçu les nouvelles lignes, le même lot est recalculé avec le même modèle, et les étapes
+# déjà faites (jeu Parquet, index) sont reconnues à son identifiant dans leur manifeste.
+# Les index absents (profils de journaux, index dense) sont ignorés
+def incremental_update(merged_df, data_path=DATA_PATH, tfidf_path=TFIDF_PATH, kmeans_path=KMEANS_PATH,
+                       index_dir=INDEX_DIR, max_distance_ratio=MAX_DISTANCE_RATIO,
+                       max_centroid_shift=MAX_CENTROID_SHIFT, n_jobs=1, dataset_dir=CLUSTER_DATASET_DIR):
+    # Seules les colonnes des clés sont lues, pas les résumés
+    df_clustering = pd.read_csv(data_path, usecols=KEY_COLUMNS)
+    new_rows = select_new_rows(merged_df, df_clustering)
+    if new_rows.empty:
+        return {'new_rows': 0, 'retrain_required': False}
+
+    tfidf = joblib.load(tfidf_path)
+    kmeans = joblib.load(kmeans_path)
+
+    X_new = clustering_vectors(new_rows, tfidf, n_jobs)
+    labels = kmeans.predict(X_new)
+    counts = df_clustering['cluster'].value_counts().to_dict()
+    new_centers = updated_centroids(kmeans, X_new, labels, counts)
+
+    report = measure_drift(kmeans, X_new, labels, new_centers, len(df_clustering))
+    report['retrain_required'] = (report['distance_ratio'] > max_distance_ratio or
+                                  report['centroid_shift'] > max_centroid_shift)
+    if report['retrain_required']:
+        return report
+
+    batch = batch_id(new_rows)
+    report['batch'] = batch
+
+    # 1. Jeu Parquet : un fichier du lot dans chaque cluster touché (ignoré si le lot y est déjà)
+    new_rows['cluster'] = labels
+    if os.path.exists(os.path.join(dataset_dir, 'manifest.json')):
+        append_to_cluster_dataset(new_rows, batch, dataset_dir)
+
+    # 2. Index de similarité : seules les nouvelles lignes des clusters touchés sont écrites ; les tailles
+    # du manifeste font foi, les restes d'une exécution interrompue sont remplacés. Le lot est inscrit
+    # dans le manifeste avec les nouvelles tailles
+    manifest = load_manifest(index_dir)
+    batches = manifest.setdefault('batches', [])
+    if batch not in batches:
+        for cluster_num in np.unique(labels):
+            rows = prepare_cluster_rows(new_rows, cluster_num, n_jobs)
+            if rows.empty:
+                continue
+            key = str(int(cluster_num))
+            size = append_to_cluster_index(os.path.join(index_dir, f'cluster_{key}'),
+                                           tfidf.transform(rows['processed_text']), rows,
+                                           manifest['clusters'].get(key, 0))
+            manifest['clusters'][key] = size
+        batches.append(batch)
+        write_manifest(manifest, index_dir)
+
+    # 3. Profils de journaux (modes "Par journal" et "Hybride") et index dense Word2Vec : nouveaux
+    # articles ajoutés en fin de fichier, profils mis à jour par moyenne courante
+    journal_dir = os.path.join(index_dir, 'journals')
+    if os.path.exists(os.path.join(journal_dir, 'manifest.json')):
+        append_to_journal_index(new_rows, tfidf, batch, journal_dir, n_jobs)
+    embedding_dir = os.path.join(index_dir, 'embeddings')
+    if os.path.exists(os.path.join(embedding_dir, 'manifest.json')):
+        append_to_embeddings(new_rows, batch, embedding_dir, n_jobs)
+
+    # 4. Lignes ajoutées à la fin du jeu de clustering (pas de réécriture) : à partir d'ici, elles ne
+    # sont plus sélectionnées comme nouvelles
+    header = pd.read_csv(data_path, nrows=0).columns
+    new_rows.reindex(columns=header).to_csv(data_path, mode='a', header=False, index=False)
+
+    # 5. Centroïdes rafraîchis en dernier : les effectifs lus plus haut ne contiennent pas encore le lot,
+    # et une reprise ne peut pas appliquer deux fois la moyenne courante (au pire, après une
+    # interruption entre 4 et 5, ce lot ne déplace pas les centroïdes)
+    kmeans.cluster_centers_ = new_centers
+    replace_file(kmeans_path, lambda f: joblib.dump(kmeans, f))
+
+    report['clusters'] = {str(int(c)): int(n) for c, n in zip(*np.unique(labels, return_counts=True))}
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mise à jour incrémentale du modèle avec les nouveaux articles.")
+    parser.add_argument('merged', help="Jeu de documents fusionné (ex. merged_documents_datasets.csv)")
+    parser.add_argument('--data', default=DATA_PATH)
+    parser.add_argument('--tfidf', default=TFIDF_PATH)
+    parser.add_argument('--kmeans', default=KMEANS_PATH)
+    parser.add_argument('--index', default=INDEX_DIR)
+    parser.add_argument('--dataset', default=CLUSTER_DATASET_DIR, help="Jeu Parquet partitionné par cluster")
+    parser.add_argument('--max-distance-ratio', type=float, default=MAX_DISTANCE_RATIO)
+    parser.add_argument('--max-centroid-shift', type=float, default=MAX_CENTROID_SHIFT)
+    parser.add_argument('--jobs', type=int, default=-1,
+                        help="Processus de prétraitement (-1 : tous les cœurs)")
+    args = parser.parse_args()
+
+    merged_df = pd.read_csv(args.merged)
+    report = incremental_update(merged_df, args.data, args.tfidf, args.kmeans, args.index,
+                                args.max_distance_ratio, args.max_centroid_shift, args.jobs, args.dataset)
+    print(json.dumps(report, indent=2))
+
+    if report['retrain_required']:
+        print("Dérive trop importante : aucune modification appliquée, "
+              "relancez l'entraînement complet (python train.py).")
+    elif report['new_rows']:
+        print(f"{report['new_rows']} nouveaux articles intégrés (index par cluster, profils de journaux, "
+              "index dense).")
+    else:
+        print("Aucun nouvel article.")
+
+
+if __name__ == "__main__":
+    main()
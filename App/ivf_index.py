@@ -0,0 +1,137 @@
+import json
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+from preprocessing import preprocess_corpus
+from recommender import manuscript_text, top_k_rows
+from batch_recommend import load_manuscripts
+from registry import ModelRegistry
+from similarity_index import indexed_clusters
+
+# Nombre de clusters explorés par défaut (1 : équivalent au filtrage strict sur le cluster prédit)
+N_PROBE = 1
+CHUNK_SIZE = 256
+
+
+# Index IVF : les centroïdes KMeans servent de quantificateur grossier,
+# les index par cluster (similarity_index.py) de listes inversées
+class IVFIndex:
+    def __init__(self, models):
+        self.models = models
+        self.n_clusters = models.kmeans.n_clusters
+        self.clusters = models.memo('indexed_clusters', lambda: indexed_clusters(models.index_dir))
+
+    # Les n_probe clusters dont le centroïde est le plus proche de chaque requête
+    def probe(self, vecteurs, n_probe=N_PROBE):
+        n_probe = min(max(n_probe, 1), self.n_clusters)
+        distances = self.models.kmeans.transform(vecteurs)
+        return np.argsort(distances, axis=1, kind='stable')[:, :n_probe]
+
+    # Recherche des k articles les plus similaires dans les clusters sondés, puis fusion.
+    # Retourne, pour chaque requête, les tableaux (clusters, lignes, similarités) triés.
+    def search_arrays(self, vecteurs, k=10, n_probe=N_PROBE, chunk_size=CHUNK_SIZE):
+        probes = self.probe(vecteurs, n_probe)
+        n_queries = vecteurs.shape[0]
+        candidates = [[] for _ in range(n_queries)]
+
+        for cluster_num in np.unique(probes):
+            if cluster_num not in self.clusters:
+                continue
+            positions = np.flatnonzero((probes == cluster_num).any(axis=1))
+            X_cluster, _ = self.models.cluster_index(cluster_num)
+            if X_cluster.shape[0] == 0:
+                continue
+            for start in range(0, len(positions), chunk_size):
+                chunk = positions[start:start + chunk_size]
+                queries = vecteurs[chunk].toarray().astype(np.float32)
+                scores = np.asarray(X_cluster @ queries.T).T
+                top, similarities = top_k_rows(scores, k)
+                for row, position in enumerate(chunk):
+                    candidates[position].append((np.full(top.shape[1], cluster_num), top[row], similarities[row]))
+
+        results = []
+        for parts in candidates:
+            if not parts:
+                results.append((np.array([], dtype=int), np.array([], dtype=int), np.array([], dtype=np.float32)))
+                continue
+            clusters = np.concatenate([part[0] for part in parts])
+            rows = np.concatenate([part[1] for part in parts])
+            similarities = np.concatenate([part[2] for part in parts])
+            best, _ = top_k_rows(similarities[np.newaxis, :], k)
+            best = best[0]
+            results.append((clusters[best], rows[best], similarities[best]))
+        return results
+
+    # Même recherche, avec les métadonnées des journaux pour chaque résultat
+    def search(self, vecteurs, k=10, n_probe=N_PROBE):
+        results = []
+        for clusters, rows, similarities in self.search_arrays(vecteurs, k, n_probe):
+            frames = []
+            for cluster_num in np.unique(clusters):
+                _, meta = self.models.cluster_index(cluster_num)
+                selected = clusters == cluster_num
+                frame = meta.iloc[rows[selected]].copy()
+                frame['cluster'] = int(cluster_num)
+                frame['similarity'] = similarities[selected]
+                frames.append(frame)
+            if frames:
+                result = pd.concat(frames).sort_values('similarity', ascending=False, kind='stable')
+            else:
+                result = pd.DataFrame(columns=['journal_name', 'sjr_score', 'cluster', 'similarity'])
+            results.append(result)
+        return results
+
+
+# Rappel@k et latence de la recherche IVF par rapport à la recherche exhaustive
+def recall_report(models, texts, k=10, n_probes=(1, 2, 3)):
+    index = IVFIndex(models)
+    vecteurs = models.tfidf.transform(preprocess_corpus(texts))
+
+    exact = index.search_arrays(vecteurs, k, n_probe=index.n_clusters)
+    exact_sets = [set(zip(clusters.tolist(), rows.tolist())) for clusters, rows, _ in exact]
+
+    report = []
+    for n_probe in sorted({min(n, index.n_clusters) for n in n_probes} | {index.n_clusters}):
+        latencies = []
+        recalls = []
+        for i in range(vecteurs.shape[0]):
+            start = time.perf_counter()
+            clusters, rows, _ = index.search_arrays(vecteurs[i], k, n_probe)[0]
+            latencies.append((time.perf_counter() - start) * 1000)
+            if exact_sets[i]:
+                found = set(zip(clusters.tolist(), rows.tolist()))
+                recalls.append(len(found & exact_sets[i]) / len(exact_sets[i]))
+        report.append({
+            'n_probe': n_probe,
+            'recall_at_k': round(float(np.mean(recalls)), 4) if recalls else None,
+            'p50_ms': round(float(np.percentile(latencies, 50)), 3),
+            'p99_ms': round(float(np.percentile(latencies, 99)), 3),
+        })
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rappel et latence de la recherche IVF par rapport à la recherche exacte.")
+    parser.add_argument('manuscripts', help="Fichier CSV ou JSONL (colonnes title, abstract, keywords)")
+    parser.add_argument('--top-k', type=int, default=10)
+    parser.add_argument('--n-probe', default='1,2,3', help="Valeurs de n_probe séparées par des virgules")
+    parser.add_argument('--output', default=None, help="Fichier JSON où enregistrer le rapport")
+    args = parser.parse_args()
+
+    models = ModelRegistry().get()
+    manuscripts = load_manuscripts(args.manuscripts)
+    texts = [manuscript_text(titre, resume, mots_cles) for titre, resume, mots_cles in
+             zip(manuscripts['title'], manuscripts['abstract'], manuscripts['keywords'])]
+    n_probes = [int(value) for value in args.n_probe.split(',')]
+
+    report = recall_report(models, texts, args.top_k, n_probes)
+    print(pd.DataFrame(report).to_string(index=False))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
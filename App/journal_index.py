@@ -0,0 +1,275 @@
+import os
+import glob
+import json
+import shutil
+import argparse
+import numpy as np
+import pandas as pd
+import joblib
+from scipy import sparse
+
+from preprocessing import preprocess_corpus
+from similarity_index import (DATA_PATH, TFIDF_PATH, INDEX_DIR, save_csr, load_csr, append_csr, append_npy,
+                              top_k, replace_file, load_manifest, write_manifest)
+
+JOURNAL_INDEX_DIR = os.path.join(INDEX_DIR, 'journals')
+
+# Nombre de journaux candidats (par journal demandé) re-classés au niveau des articles
+RERANK_FACTOR = 5
+
+# Poids de la similarité dans le score hybride (1 - poids pour le score SJR)
+HYBRID_WEIGHT = 0.7
+
+
+# Texte combiné des articles ; les champs manquants sont remplacés par une chaîne vide
+# pour que les articles sans mots-clés (Google Scholar) contribuent tout de même au profil
+def article_texts(df):
+    return (df['title'].fillna('') + ' ' +
+            df['abstract'].fillna('') + ' ' +
+            df['author_keywords'].fillna(''))
+
+
+# Métadonnées par journal : meilleur score SJR, nombre d'articles et premier ISSN connu ;
+# un journal sans SJR reçoit explicitement 0 et sjr_known = False (affiché "N/A")
+def journal_metadata(df):
+    df = df.assign(sjr_score=pd.to_numeric(df['sjr_score'], errors='coerce'))
+    grouped = df.groupby('journal_name', sort=True)
+    sjr = grouped['sjr_score'].max()
+    return pd.DataFrame({
+        'journal_name': grouped.size().index,
+        'issn': grouped['issn'].first().to_numpy(),
+        'sjr_score': sjr.fillna(0.0).to_numpy(),
+        'sjr_known': sjr.notna().to_numpy(),
+        'article_count': grouped.size().to_numpy(),
+    })
+
+
+# Index construits avant sjr_known : le SJR manquant y est encore NaN
+def fill_sjr(journals):
+    sjr = pd.to_numeric(journals['sjr_score'], errors='coerce')
+    if 'sjr_known' not in journals:
+        journals['sjr_known'] = sjr.notna()
+    journals['sjr_score'] = sjr.fillna(0.0)
+    return journals
+
+
+# Dossier des profils (journals, sums, journals.csv) : racine de l'index après build_journal_index,
+# sous-dossier profiles-<lot> désigné par le manifeste après une mise à jour incrémentale
+def profile_dir(index_dir, manifest):
+    return os.path.join(index_dir, manifest.get('profiles', ''))
+
+
+# Somme des vecteurs des articles par journal (lignes : journaux, colonnes : articles)
+def membership_matrix(journal_ids, n_journals):
+    return sparse.csr_matrix(
+        (np.ones(len(journal_ids), dtype=np.float32), (journal_ids, np.arange(len(journal_ids)))),
+        shape=(n_journals, len(journal_ids)),
+    )
+
+
+# Étape hors ligne : un centroïde TF-IDF normalisé par journal
+def build_journal_index(df, tfidf, index_dir=JOURNAL_INDEX_DIR, n_jobs=1):
+    df = df.dropna(subset=['journal_name']).reset_index(drop=True)
+    journals = journal_metadata(df)
+    journal_ids = pd.Categorical(df['journal_name'], categories=journals['journal_name']).codes
+
+    # Articles triés par journal : ceux du journal j occupent les lignes offsets[j]:offsets[j + 1]
+    order = np.argsort(journal_ids, kind='stable')
+    journal_ids = journal_ids[order]
+    X_articles = tfidf.transform(preprocess_corpus(article_texts(df).iloc[order], n_jobs))
+    offsets = np.searchsorted(journal_ids, np.arange(len(journals) + 1))
+
+    # Somme des vecteurs des articles de chaque journal (conservée pour la mise à jour incrémentale),
+    # puis normalisation L2
+    from sklearn.preprocessing import normalize
+    sums = membership_matrix(journal_ids, len(journals)) @ X_articles
+    X_journals = normalize(sums)
+
+    # Fichiers remplacés atomiquement (offsets.npy est projeté en mémoire par les processus en cours) ;
+    # le manifeste, surveillé par le registre, est écrit en dernier
+    save_csr(X_journals, os.path.join(index_dir, 'journals'))
+    save_csr(sums, os.path.join(index_dir, 'sums'))
+    save_csr(X_articles, os.path.join(index_dir, 'articles'))
+    replace_file(os.path.join(index_dir, 'offsets.npy'), lambda f: np.save(f, offsets.astype(np.int64)))
+    replace_file(os.path.join(index_dir, 'journals.csv'), lambda f: journals.to_csv(f, index=False), mode='w')
+    manifest = {'journals': len(journals), 'articles': len(journal_ids), 'delta': 0, 'batches': []}
+    replace_file(os.path.join(index_dir, 'manifest.json'), lambda f: json.dump(manifest, f, indent=2), mode='w')
+
+    # Restes des mises à jour incrémentales de l'index précédent
+    shutil.rmtree(os.path.join(index_dir, 'delta'), ignore_errors=True)
+    for path in glob.glob(os.path.join(index_dir, 'profiles-*')):
+        shutil.rmtree(path, ignore_errors=True)
+
+    print(f"{len(journals)} journaux indexés à partir de {len(journal_ids)} articles.")
+    return journals
+
+
+# Mise à jour incrémentale : les nouveaux articles sont ajoutés à la fin du segment delta (avec le
+# numéro de leur journal), les journaux inconnus à la fin de la liste, et chaque profil devient la
+# moyenne courante de ses articles (somme mise à jour, puis normalisation). Seuls les profils, de
+# taille proportionnelle au nombre de journaux, sont réécrits, dans un nouveau dossier désigné par
+# le manifeste ; un lot déjà présent dans le manifeste est ignoré.
+def append_to_journal_index(df, tfidf, batch, index_dir=JOURNAL_INDEX_DIR, n_jobs=1):
+    from sklearn.preprocessing import normalize
+
+    manifest = load_manifest(index_dir)
+    batches = manifest.setdefault('batches', [])
+    if batch in batches:
+        return manifest
+    df = df.dropna(subset=['journal_name']).reset_index(drop=True)
+    base_dir = profile_dir(index_dir, manifest)
+    journals = fill_sjr(pd.read_csv(os.path.join(base_dir, 'journals.csv')))
+    n_journals = manifest['journals']
+    n_delta = manifest.get('delta', 0)
+    if os.path.exists(os.path.join(base_dir, 'sums')):
+        sums = load_csr(os.path.join(base_dir, 'sums')).astype(np.float32)
+    else:
+        # Index construit avant la conservation des sommes : recalculées une fois à partir des articles
+        offsets = np.load(os.path.join(index_dir, 'offsets.npy'))[:n_journals + 1]
+        journal_ids = np.repeat(np.arange(n_journals), np.diff(offsets))
+        sums = membership_matrix(journal_ids, n_journals) @ load_csr(os.path.join(index_dir, 'articles'))
+
+    # Métadonnées : meilleur SJR, nombre d'articles, ISSN ; journaux inconnus ajoutés à la fin
+    added = journal_metadata(df).set_index('journal_name')
+    journals = journals.set_index('journal_name')
+    known = added.index.intersection(journals.index)
+    journals.loc[known, 'sjr_score'] = np.maximum(journals.loc[known, 'sjr_score'], added.loc[known, 'sjr_score'])
+    journals.loc[known, 'sjr_known'] = journals.loc[known, 'sjr_known'] | added.loc[known, 'sjr_known']
+    journals.loc[known, 'article_count'] += added.loc[known, 'article_count']
+    journals.loc[known, 'issn'] = journals.loc[known, 'issn'].fillna(added.loc[known, 'issn'])
+    journals = pd.concat([journals, added.drop(known)]).reset_index()
+    n_added = len(journals) - n_journals
+
+    journal_ids = pd.Categorical(df['journal_name'], categories=journals['journal_name']).codes.astype(np.int32)
+    X_new = tfidf.transform(preprocess_corpus(article_texts(df), n_jobs))
+    sums = sparse.vstack([sums, sparse.csr_matrix((n_added, sums.shape[1]), dtype=np.float32)]).tocsr()
+    sums = sums + membership_matrix(journal_ids, len(journals)) @ X_new
+
+    # Segment delta et offsets : ajout en fin de fichier, au-delà des tailles du manifeste
+    delta_dir = os.path.join(index_dir, 'delta')
+    if n_delta == 0:
+        save_csr(X_new, os.path.join(delta_dir, 'articles'))
+        replace_file(os.path.join(delta_dir, 'journal_ids.npy'), lambda f: np.save(f, journal_ids))
+    else:
+        append_csr(X_new, os.path.join(delta_dir, 'articles'), n_delta)
+        append_npy(os.path.join(delta_dir, 'journal_ids.npy'), journal_ids, keep=n_delta)
+    offsets_path = os.path.join(index_dir, 'offsets.npy')
+    append_npy(offsets_path, np.full(n_added, manifest['articles'], dtype=np.int64), keep=n_journals + 1)
+
+    # Profils du lot dans un nouveau dossier ; le manifeste bascule d'un bloc, puis l'ancien dossier est supprimé
+    profiles = f'profiles-{batch}'
+    new_dir = os.path.join(index_dir, profiles)
+    save_csr(normalize(sums), os.path.join(new_dir, 'journals'))
+    save_csr(sums, os.path.join(new_dir, 'sums'))
+    replace_file(os.path.join(new_dir, 'journals.csv'), lambda f: journals.to_csv(f, index=False), mode='w')
+    manifest.update({'journals': len(journals), 'delta': n_delta + len(df), 'profiles': profiles})
+    batches.append(batch)
+    write_manifest(manifest, index_dir)
+    if base_dir.rstrip(os.sep) != index_dir.rstrip(os.sep):
+        shutil.rmtree(base_dir, ignore_errors=True)
+    return manifest
+
+
+# Index des profils de journaux chargé en mémoire partagée (mmap)
+class JournalIndex:
+    def __init__(self, index_dir=JOURNAL_INDEX_DIR):
+        if not os.path.exists(os.path.join(index_dir, 'manifest.json')):
+            raise FileNotFoundError(
+                f"Index des journaux introuvable dans '{index_dir}'. "
+                "Lancez d'abord : python journal_index.py"
+            )
+        manifest = load_manifest(index_dir)
+        base_dir = profile_dir(index_dir, manifest)
+        self.X_journals = load_csr(os.path.join(base_dir, 'journals'))
+        self.X_articles = load_csr(os.path.join(index_dir, 'articles'))
+        # Tailles du manifeste : les ajouts d'une mise à jour en cours ne sont pas lus
+        self.offsets = np.load(os.path.join(index_dir, 'offsets.npy'), mmap_mode='r')[:manifest['journals'] + 1]
+        self.journals = fill_sjr(pd.read_csv(os.path.join(base_dir, 'journals.csv')))
+        # Articles ajoutés par les mises à jour incrémentales, avec le numéro de leur journal
+        n_delta = manifest.get('delta', 0)
+        if n_delta:
+            self.X_delta = load_csr(os.path.join(index_dir, 'delta', 'articles'), rows=n_delta)
+            self.delta_journals = np.load(os.path.join(index_dir, 'delta', 'journal_ids.npy'),
+                                          mmap_mode='r')[:n_delta]
+        else:
+            self.X_delta = None
+            self.delta_journals = np.empty(0, dtype=np.int32)
+        # SJR par journal, aligné sur les lignes de l'index et ramené dans [0, 1] (échelle log) ;
+        # un journal sans SJR connu ne reçoit aucun bonus
+        sjr = np.log1p(np.maximum(self.journals['sjr_score'].to_numpy(np.float32), 0))
+        self.sjr_norm = sjr / max(float(sjr.max()) if len(sjr) else 0.0, 1e-12)
+        # Articles de l'index initial par journal (0 pour un journal apparu dans le segment delta)
+        self.article_counts = np.diff(self.offsets)
+
+    # Similarité maximale entre la requête et les articles de chaque journal candidat
+    def _best_article_scores(self, vecteur, candidates):
+        best = np.zeros(len(candidates), dtype=np.float32)
+        counts = self.article_counts[candidates]
+        stored = counts > 0
+        if stored.any():
+            rows = np.concatenate([np.arange(self.offsets[j], self.offsets[j + 1]) for j in candidates[stored]])
+            scores = np.asarray((self.X_articles[rows] @ vecteur.T).todense()).ravel()
+            best[stored] = np.maximum.reduceat(scores, np.concatenate([[0], np.cumsum(counts[stored])[:-1]]))
+        if self.X_delta is not None:
+            delta_rows = np.flatnonzero(np.isin(self.delta_journals, candidates))
+            if len(delta_rows):
+                scores = np.asarray((self.X_delta[delta_rows] @ vecteur.T).todense()).ravel()
+                order = np.argsort(candidates)
+                positions = order[np.searchsorted(candidates[order], self.delta_journals[delta_rows])]
+                np.maximum.at(best, positions, scores)
+        return best
+
+    # k journaux distincts les plus proches ; avec rerank, les meilleurs candidats sont
+    # re-classés d'après l'article le plus proche de chaque journal
+    def query(self, vecteur, k=10, rerank=True):
+        scores = np.asarray((self.X_journals @ vecteur.T).todense()).ravel()
+        if rerank:
+            candidates, _ = top_k(scores, k * RERANK_FACTOR)
+            article_scores = self._best_article_scores(vecteur, candidates)
+            candidate_scores = (scores[candidates] + article_scores) / 2
+            best, similarities = top_k(candidate_scores, k)
+            top = candidates[best]
+        else:
+            top, similarities = top_k(scores, k)
+
+        recommendations = self.journals.iloc[top].copy()
+        recommendations['similarity'] = similarities
+        return recommendations
+
+    # Classement hybride en un seul passage : similarité du meilleur article de chaque journal
+    # (normalisée par la meilleure similarité) pondérée avec le SJR normalisé
+    def hybrid_query(self, vecteur, k=10, weight=HYBRID_WEIGHT):
+        scores = np.asarray((self.X_articles @ vecteur.T).todense()).ravel()
+        best_article = np.zeros(len(self.journals), dtype=np.float32)
+        non_empty = self.article_counts > 0
+        best_article[non_empty] = np.maximum.reduceat(scores, self.offsets[:-1][non_empty])
+        if self.X_delta is not None:
+            delta_scores = np.asarray((self.X_delta @ vecteur.T).todense()).ravel()
+            np.maximum.at(best_article, self.delta_journals, delta_scores)
+        similarity = best_article / max(float(best_article.max()), 1e-12)
+
+        hybrid = weight * similarity + (1 - weight) * self.sjr_norm
+        top, hybrid_scores = top_k(hybrid, k)
+        recommendations = self.journals.iloc[top].copy()
+        recommendations['similarity'] = best_article[top]
+        recommendations['hybrid_score'] = hybrid_scores
+        return recommendations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Construit l'index des profils de journaux.")
+    parser.add_argument('--data', default=DATA_PATH)
+    parser.add_argument('--tfidf', default=TFIDF_PATH)
+    parser.add_argument('--output', default=JOURNAL_INDEX_DIR)
+    parser.add_argument('--jobs', type=int, default=-1,
+                        help="Processus de prétraitement (-1 : tous les cœurs)")
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.data)
+    tfidf = joblib.load(args.tfidf)
+    build_journal_index(df, tfidf, args.output, args.jobs)
+    print(f"Index sauvegardé dans '{args.output}'.")
+
+
+if __name__ == "__main__":
+    main()
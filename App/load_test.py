@@ -0,0 +1,76 @@
+import json
+import time
+import argparse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Manuscrit utilisé si aucun fichier n'est fourni
+SAMPLE_MANUSCRIPT = {
+    'title': "A novel fractional Moreau's sweeping process with applications",
+    'abstract': "We investigate a novel category of Caputo fractional Moreau's sweeping process, "
+                "formulated in a real Hilbert space. Our primary focus is to develop a framework "
+                "for proving the unique solvability of the fractional Moreau's sweeping processes.",
+    'keywords': "Existence and uniqueness, Fractional differential inclusion, Sweeping process",
+}
+
+
+# Envoie une requête et retourne sa latence (ms) et les durées par étape renvoyées par le service
+def send_request(url, manuscript):
+    body = json.dumps(manuscript).encode('utf-8')
+    request = urllib.request.Request(url, data=body, headers={'Content-Type': 'application/json'})
+    start = time.perf_counter()
+    with urllib.request.urlopen(request) as response:
+        payload = json.loads(response.read())
+    return (time.perf_counter() - start) * 1000, payload.get('timings', {})
+
+
+# Rejoue les manuscrits à un niveau de concurrence donné
+def run_level(url, manuscripts, concurrency, n_requests):
+    jobs = [manuscripts[i % len(manuscripts)] for i in range(n_requests)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lambda manuscript: send_request(url, manuscript), jobs))
+    elapsed = time.perf_counter() - start
+
+    latencies = np.array([latency for latency, _ in results])
+    batch_sizes = np.array([timings.get('batch_size', 1) for _, timings in results])
+    return {
+        'concurrency': concurrency,
+        'requests': n_requests,
+        'throughput_rps': round(n_requests / elapsed, 1),
+        'p50_ms': round(float(np.percentile(latencies, 50)), 2),
+        'p99_ms': round(float(np.percentile(latencies, 99)), 2),
+        'mean_batch_size': round(float(batch_sizes.mean()), 1),
+    }
+
+
+def load_manuscripts(path):
+    if path is None:
+        return [SAMPLE_MANUSCRIPT]
+    manuscripts = pd.read_json(path, lines=True) if path.endswith('.jsonl') else pd.read_csv(path)
+    manuscripts = manuscripts.rename(columns={'author_keywords': 'keywords'}).fillna('')
+    return manuscripts[['title', 'abstract', 'keywords']].to_dict(orient='records')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test de charge du service de recommandation.")
+    parser.add_argument('--url', default='http://127.0.0.1:8000/recommend')
+    parser.add_argument('--manuscripts', default=None, help="Fichier CSV ou JSONL de manuscrits à rejouer")
+    parser.add_argument('--concurrency', default='1,4,16,64',
+                        help="Niveaux de concurrence séparés par des virgules")
+    parser.add_argument('--requests', type=int, default=200, help="Nombre de requêtes par niveau")
+    args = parser.parse_args()
+
+    manuscripts = load_manuscripts(args.manuscripts)
+    send_request(args.url, manuscripts[0])  # requête de chauffe
+
+    report = [run_level(args.url, manuscripts, int(level), args.requests)
+              for level in args.concurrency.split(',')]
+    print(pd.DataFrame(report).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+import re
+import os
+import argparse
+from functools import lru_cache
+from multiprocessing import Pool
+
+# Ressources textuelles sans NLTK : stopwords anglais et français de NLTK versionnés avec le dépôt,
+# table de lemmes exportée à l'entraînement (versionnée avec le TF-IDF). Le service ne télécharge (ni n'importe) jamais NLTK.
+STOPWORDS_PATH = 'Tokenizers/stopwords.txt'
+LEMMAS_PATH = 'Tokenizers/lemmas.tsv'
+
+
+def load_stopwords(path=STOPWORDS_PATH):
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Liste de stopwords introuvable : '{path}' (fichier versionné avec le dépôt).")
+    with open(path, encoding='utf-8') as f:
+        return frozenset(line.strip() for line in f if line.strip())
+
+
+# Table mot -> lemme ; une colonne lemme vide signifie que le mot est son propre lemme
+def load_lemmas(path=LEMMAS_PATH):
+    lemmas = {}
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                word, _, lemma = line.rstrip('\n').partition('\t')
+                lemmas[word] = lemma or word
+    return lemmas
+
+
+# Vérification au démarrage de l'application et du service : la table de lemmes doit exister
+def check_text_resources(lemmas_path=LEMMAS_PATH):
+    if not os.path.exists(lemmas_path):
+        raise FileNotFoundError(f"Table de lemmes introuvable : '{lemmas_path}'. "
+                                "Lancez train.py, ou 'python preprocessing.py' pour un modèle existant.")
+
+
+# Configuration des stopwords et de la table de lemmes
+stop_words = load_stopwords()
+lemma_table = load_lemmas()
+
+# Expressions régulières compilées une seule fois
+DIGITS_RE = re.compile(r'\d+')
+PUNCTUATION_RE = re.compile(r'[^\w\s]')
+# Les deux suppressions combinées : chiffres et caractères ni alphanumériques ni espaces
+NOISE_RE = re.compile(r'\d|[^\w\s]')
+
+# Taille maximale du cache mot -> lemme
+LEMMA_CACHE_SIZE = 200_000
+
+# En dessous de ce nombre de documents, le mode parallèle coûte plus qu'il ne rapporte
+PARALLEL_MIN_DOCUMENTS = 5_000
+CHUNK_SIZE = 1_000
+
+
+_lemmatizer = None
+# WordNet n'est utilisé qu'à l'entraînement (use_wordnet) ; ailleurs, un mot absent
+# de la table de lemmes est conservé tel quel
+_use_wordnet = False
+
+
+# Lemmatiseur WordNet, téléchargé si nécessaire : entraînement et export uniquement
+def wordnet_lemmatize(word):
+    global _lemmatizer
+    if _lemmatizer is None:
+        try:
+            import nltk
+            from nltk.stem import WordNetLemmatizer
+            _lemmatizer = WordNetLemmatizer()
+            try:
+                _lemmatizer.lemmatize('test')
+            except LookupError:
+                nltk.download('wordnet', quiet=True)
+                _lemmatizer.lemmatize('test')
+        except (ImportError, LookupError):
+            print("WordNet indisponible : les mots absents de la table de lemmes sont conservés tels quels.")
+            _lemmatizer = False
+    if _lemmatizer is False:
+        return word
+    return _lemmatizer.lemmatize(word)
+
+
+# Active WordNet pour les mots absents de la table (train.py, export des lemmes)
+def use_wordnet(enabled=True):
+    global _use_wordnet
+    _use_wordnet = enabled
+    lemmatize_word.cache_clear()
+
+
+# Lemme d'un mot, mémorisé : la table précalculée, puis WordNet à l'entraînement seulement
+@lru_cache(maxsize=LEMMA_CACHE_SIZE)
+def lemmatize_word(word):
+    lemma = lemma_table.get(word)
+    if lemma is None:
+        lemma = wordnet_lemmatize(word) if _use_wordnet else word
+    return lemma
+
+
+# Relit la table de lemmes (nouvel entraînement) ; appelé à chaque chargement des modèles
+def reload_lemmas(lemmas_path=LEMMAS_PATH):
+    global lemma_table
+    check_text_resources(lemmas_path)
+    lemma_table = load_lemmas(lemmas_path)
+    lemmatize_word.cache_clear()
+
+
+# Fonctions de prétraitement du texte
+def clean_text(text):
+    if isinstance(text, str):
+        text = text.lower()
+        text = DIGITS_RE.sub('', text)
+        text = PUNCTUATION_RE.sub('', text)
+        text = text.strip()
+        return text
+    return ""
+
+def remove_stopwords(text):
+    words = text.split()
+    meaningful_words = [word for word in words if word not in stop_words]
+    return ' '.join(meaningful_words)
+
+def lemmatize_text(text):
+    words = text.split()
+    lemmatized_words = [lemmatize_word(word) for word in words]
+    return ' '.join(lemmatized_words)
+
+
+# Les trois étapes en une seule passe : un seul découpage et une seule jointure par document.
+# Résultat identique à lemmatize_text(remove_stopwords(clean_text(text))).
+def preprocess_text(text):
+    if not isinstance(text, str):
+        return ""
+    words = NOISE_RE.sub('', text.lower()).split()
+    return ' '.join([lemmatize_word(word) for word in words if word not in stop_words])
+
+
+def _preprocess_chunk(texts):
+    return [preprocess_text(text) for text in texts]
+
+
+# Prétraitement d'un corpus entier ; réparti sur n_jobs processus par blocs (-1 : tous les cœurs)
+def preprocess_corpus(texts, n_jobs=1, chunk_size=CHUNK_SIZE):
+    texts = list(texts)
+    if n_jobs is None:
+        n_jobs = 1
+    elif n_jobs < 0:
+        n_jobs = os.cpu_count() or 1
+    if n_jobs == 1 or len(texts) < PARALLEL_MIN_DOCUMENTS:
+        return _preprocess_chunk(texts)
+
+    chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+    with Pool(n_jobs, initializer=use_wordnet, initargs=(_use_wordnet,)) as pool:
+        results = pool.map(_preprocess_chunk, chunks)
+    return [text for chunk in results for text in chunk]
+
+
+# Formes au pluriel d'un terme, que le lemmatiseur WordNet (noms) ramène à ce terme
+def plural_forms(term):
+    forms = {term + 's', term + 'es'}
+    if term.endswith('y'):
+        forms.add(term[:-1] + 'ies')
+    if term.endswith('man'):
+        forms.add(term[:-3] + 'men')
+    return forms
+
+
+# Mots d'une requête susceptibles de produire un terme du modèle : les termes eux-mêmes,
+# leurs pluriels réguliers et les pluriels irréguliers de WordNet (noun.exc)
+def vocabulary_forms(vocabulary):
+    from nltk.corpus import wordnet
+    terms = set(vocabulary)
+    forms = set(terms)
+    for term in terms:
+        forms |= plural_forms(term)
+    for line in wordnet.open('noun.exc').read().splitlines():
+        inflected, *bases = line.split()
+        if any(base in terms for base in bases):
+            forms.add(inflected)
+    return {form for form in forms if form in terms or wordnet_lemmatize(form) in terms}
+
+
+# Export des lemmes de tous les mots du corpus (à l'entraînement) et des formes qui produisent
+# un terme du TF-IDF (vocabulary), pour que les requêtes retrouvent les colonnes de l'entraînement
+def export_text_resources(texts, lemmas_path=LEMMAS_PATH, vocabulary=()):
+    wordnet_lemmatize('test')
+    if _lemmatizer is False:
+        raise RuntimeError("WordNet est nécessaire pour exporter la table de lemmes (nltk.download('wordnet')).")
+    words = vocabulary_forms(vocabulary) if vocabulary else set()
+    for text in texts:
+        if isinstance(text, str):
+            words.update(NOISE_RE.sub('', text.lower()).split())
+    words -= stop_words
+    rows = []
+    for word in sorted(words):
+        lemma = wordnet_lemmatize(word)
+        rows.append(f"{word}\t{'' if lemma == word else lemma}\n")
+
+    directory = os.path.dirname(lemmas_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # Écriture via un fichier temporaire, comme les autres artefacts
+    with open(lemmas_path + '.tmp', 'w', encoding='utf-8') as f:
+        f.writelines(rows)
+    os.replace(lemmas_path + '.tmp', lemmas_path)
+    return len(stop_words), len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exporte la table de lemmes du corpus et du modèle TF-IDF.")
+    parser.add_argument('--data', default='data/df_clustering.csv',
+                        help="Corpus d'entraînement ; absent, seuls les termes du TF-IDF et leurs pluriels sont exportés")
+    parser.add_argument('--tfidf', default='Tokenizers/tfidf_vectorizer.joblib')
+    args = parser.parse_args()
+
+    import joblib
+    vocabulary = joblib.load(args.tfidf).vocabulary_
+    texts = []
+    if os.path.exists(args.data):
+        import pandas as pd
+        df = pd.read_csv(args.data)
+        texts = df['title'].fillna('') + ' ' + df['abstract'].fillna('') + ' ' + \
+            df['author_keywords'].fillna('') + ' ' + df['journal_name'].fillna('')
+    n_stopwords, n_lemmas = export_text_resources(texts, vocabulary=vocabulary)
+    print(f"{n_lemmas} lemmes exportés dans '{LEMMAS_PATH}' ({n_stopwords} stopwords exclus).")
+
+
+if __name__ == "__main__":
+    main()
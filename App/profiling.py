@@ -0,0 +1,44 @@
+import json
+import time
+import logging
+from contextlib import contextmanager
+
+logger = logging.getLogger('recommandation')
+
+
+# Chronomètre par étape : chaque bloc "with timer.stage(nom)" ajoute sa durée (ms)
+class StageTimer:
+    def __init__(self):
+        self.stages = {}
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + (time.perf_counter() - start) * 1000
+
+    @property
+    def total_ms(self):
+        return (time.perf_counter() - self._start) * 1000
+
+    def as_dict(self):
+        return {**{name: round(ms, 3) for name, ms in self.stages.items()}, 'total_ms': round(self.total_ms, 3)}
+
+    # Une ligne JSON par requête dans le journal "recommandation"
+    def log(self, event, **context):
+        logger.info(json.dumps({'event': event, **context, 'timings_ms': self.as_dict()}, ensure_ascii=False))
+
+
+# Mémoire résidente maximale du processus (Mo), si le système la fournit
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    import sys
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux : kilo-octets ; macOS : octets
+    return round(peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024, 1)
@@ -0,0 +1,131 @@
+import time
+import numpy as np
+import pandas as pd
+
+from preprocessing import preprocess_corpus
+from similarity_index import indexed_clusters
+
+# Nombre de manuscrits traités par bloc lors du produit matriciel
+CHUNK_SIZE = 256
+
+# Colonnes du résultat en format long : une ligne par (manuscrit, classement, rang)
+RECORD_COLUMNS = ['id', 'cluster', 'ranking', 'rank', 'journal_name', 'sjr_score', 'similarity']
+
+
+# Texte combiné d'un manuscrit, comme dans le formulaire de l'application
+def manuscript_text(titre, resume, mots_cles):
+    return f"{titre} {resume} {mots_cles}"
+
+
+# Ajoute la durée écoulée depuis start (en ms) à l'étape donnée
+def _record_timing(timings, stage, start):
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + (time.perf_counter() - start) * 1000
+    return time.perf_counter()
+
+
+# Prétraite et vectorise un lot de textes, puis prédit leurs clusters en un seul appel
+def vectorize_batch(models, texts, timings=None, n_jobs=1):
+    start = time.perf_counter()
+    processed = preprocess_corpus(texts, n_jobs)
+    start = _record_timing(timings, 'preprocess_ms', start)
+    vecteurs = models.tfidf.transform(processed)
+    start = _record_timing(timings, 'transform_ms', start)
+    clusters = models.kmeans.predict(vecteurs)
+    _record_timing(timings, 'predict_ms', start)
+    return vecteurs, clusters
+
+
+# Journaux uniques d'un cluster triés par score SJR décroissant (calculé une fois par version)
+def sjr_ranking(models, cluster_num, k=10):
+    def build():
+        same_cluster_df = models.cluster_rows(cluster_num, ['journal_name', 'sjr_score']).dropna(subset=['sjr_score'])
+        return (same_cluster_df.sort_values(by='sjr_score', ascending=False)
+                .drop_duplicates(subset=['journal_name'])
+                .head(k)[['journal_name', 'sjr_score']]
+                .astype({'journal_name': object})
+                .reset_index(drop=True))
+    return models.memo(('sjr_ranking', int(cluster_num), k), build)
+
+
+# Top-k par ligne d'une matrice de scores dense (une ligne par manuscrit)
+def top_k_rows(scores, k):
+    k = min(k, scores.shape[1])
+    if k == 0:
+        empty = np.empty((scores.shape[0], 0), dtype=int)
+        return empty, np.empty((scores.shape[0], 0), dtype=scores.dtype)
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    top_scores = np.take_along_axis(scores, top, axis=1)
+    order = np.argsort(-top_scores, axis=1, kind='stable')
+    return np.take_along_axis(top, order, axis=1), np.take_along_axis(top_scores, order, axis=1)
+
+
+# Lignes du classement SJR, identiques pour tous les manuscrits d'un même cluster
+def _sjr_records(models, cluster_num, positions, k):
+    ranking = sjr_ranking(models, cluster_num, k)
+    n, kk = len(positions), len(ranking)
+    return pd.DataFrame({
+        'position': np.repeat(positions, kk),
+        'cluster': int(cluster_num),
+        'ranking': 'sjr',
+        'rank': np.tile(np.arange(1, kk + 1), n),
+        'journal_name': np.tile(ranking['journal_name'].to_numpy(), n),
+        'sjr_score': np.tile(ranking['sjr_score'].to_numpy(), n),
+        'similarity': np.nan,
+    })
+
+
+# Similarité cosinus de chaque manuscrit avec les articles de son cluster, par blocs.
+# Cluster sans index (aucune ligne SJR à la construction) : pas de résultat, comme IVFIndex.search_arrays
+def _similarity_records(models, cluster_num, vecteurs, positions, k, chunk_size):
+    if int(cluster_num) not in models.memo('indexed_clusters', lambda: indexed_clusters(models.index_dir)):
+        return []
+    X_cluster, meta = models.cluster_index(cluster_num)
+    journals = meta['journal_name'].to_numpy()
+    sjr_scores = meta['sjr_score'].to_numpy()
+
+    frames = []
+    for start in range(0, len(positions), chunk_size):
+        chunk = positions[start:start + chunk_size]
+        queries = vecteurs[chunk].toarray().astype(np.float32)
+        # (articles x features) @ (features x manuscrits), transposé : une ligne par manuscrit
+        scores = np.asarray(X_cluster @ queries.T).T
+        top, similarities = top_k_rows(scores, k)
+        n, kk = top.shape
+        frames.append(pd.DataFrame({
+            'position': np.repeat(chunk, kk),
+            'cluster': int(cluster_num),
+            'ranking': 'similarity',
+            'rank': np.tile(np.arange(1, kk + 1), n),
+            'journal_name': journals[top.ravel()],
+            'sjr_score': sjr_scores[top.ravel()],
+            'similarity': similarities.ravel(),
+        }))
+    return frames
+
+
+# Recommandations SJR et par similarité pour un lot de manuscrits, en format long.
+# Si un dictionnaire timings est fourni, il reçoit la durée (ms) de chaque étape.
+def recommend_batch(models, texts, ids=None, k=10, chunk_size=CHUNK_SIZE, timings=None, n_jobs=1):
+    ids = np.arange(len(texts)) if ids is None else np.asarray(ids)
+    if len(texts) == 0:
+        return pd.DataFrame(columns=RECORD_COLUMNS)
+
+    vecteurs, clusters = vectorize_batch(models, texts, timings, n_jobs)
+
+    frames = []
+    for cluster_num in np.unique(clusters):
+        positions = np.flatnonzero(clusters == cluster_num)
+        start = time.perf_counter()
+        frames.append(_sjr_records(models, cluster_num, positions, k))
+        start = _record_timing(timings, 'sjr_ms', start)
+        frames.extend(_similarity_records(models, cluster_num, vecteurs, positions, k, chunk_size))
+        _record_timing(timings, 'similarity_ms', start)
+
+    start = time.perf_counter()
+    records = pd.concat(frames, ignore_index=True)
+    records = records.sort_values(['position', 'ranking', 'rank'], kind='stable')
+    records.insert(0, 'id', ids[records['position'].to_numpy()])
+    records = records[RECORD_COLUMNS].reset_index(drop=True)
+    _record_timing(timings, 'assemble_ms', start)
+    return records
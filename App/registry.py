@@ -0,0 +1,197 @@
+import os
+import time
+import hashlib
+import threading
+import joblib
+import pandas as pd
+
+from preprocessing import preprocess_text, reload_lemmas
+from similarity_index import DATA_PATH, TFIDF_PATH, INDEX_DIR, load_cluster_index, indexed_clusters
+from journal_index import JournalIndex
+from embeddings import EmbeddingIndex
+from cluster_store import CLUSTER_DATASET_DIR, read_cluster
+
+KMEANS_PATH = 'Models/kmeans_model.joblib'
+
+# Intervalle minimal (en secondes) entre deux vérifications des fichiers sur disque
+CHECK_INTERVAL = 5.0
+
+# Texte factice du préchauffage (premier passage transform/predict)
+WARM_UP_TEXT = "journal recommendation warm up"
+
+
+# Jeu de modèles chargés ensemble ; remplacé en bloc lors d'un rechargement
+class LoadedModels:
+    def __init__(self, tfidf, kmeans, data_path, dataset_dir, index_dir, version, fingerprint=None):
+        self.tfidf = tfidf
+        self.kmeans = kmeans
+        self.data_path = data_path
+        self.dataset_dir = dataset_dir
+        self.index_dir = index_dir
+        self.version = version
+        # Empreinte des fichiers chargés : identique dans tous les processus qui lisent les mêmes artefacts
+        self.fingerprint = fingerprint
+        self._memo = {}
+        self._lock = threading.RLock()
+
+    # Calcule une valeur dérivée des modèles une seule fois par version
+    def memo(self, key, factory):
+        with self._lock:
+            if key not in self._memo:
+                self._memo[key] = factory()
+            return self._memo[key]
+
+    # Jeu de clustering complet (CSV), lu uniquement si le format Parquet est absent
+    @property
+    def df(self):
+        def load():
+            df = pd.read_csv(self.data_path)
+            df['sjr_score'] = pd.to_numeric(df['sjr_score'], errors='coerce')
+            return df
+        return self.memo('df', load)
+
+    # Lignes d'un cluster, limitées aux colonnes demandées (partition Parquet si disponible)
+    def cluster_rows(self, cluster_num, columns=('journal_name', 'sjr_score')):
+        cluster_num = int(cluster_num)
+        columns = list(columns)
+
+        def load():
+            if os.path.exists(os.path.join(self.dataset_dir, 'manifest.json')):
+                return read_cluster(cluster_num, columns, self.dataset_dir)
+            return self.df.loc[self.df['cluster'] == cluster_num, columns].reset_index(drop=True)
+        return self.memo(('cluster_rows', cluster_num, tuple(columns)), load)
+
+    # Index de similarité d'un cluster, chargé une seule fois (mmap)
+    def cluster_index(self, cluster_num):
+        cluster_num = int(cluster_num)
+        return self.memo(('cluster_index', cluster_num),
+                         lambda: load_cluster_index(cluster_num, self.index_dir))
+
+    # Index des profils de journaux (journal_index.py)
+    def journal_index(self):
+        return self.memo('journal_index',
+                         lambda: JournalIndex(os.path.join(self.index_dir, 'journals')))
+
+    # Index dense Word2Vec (embeddings.py)
+    def embedding_index(self):
+        return self.memo('embedding_index',
+                         lambda: EmbeddingIndex(os.path.join(self.index_dir, 'embeddings')))
+
+
+# Registre des artefacts partagé par toutes les sessions du processus
+class ModelRegistry:
+    def __init__(self, tfidf_path=TFIDF_PATH, kmeans_path=KMEANS_PATH,
+                 data_path=DATA_PATH, index_dir=INDEX_DIR, dataset_dir=CLUSTER_DATASET_DIR,
+                 check_interval=CHECK_INTERVAL):
+        self.tfidf_path = tfidf_path
+        self.kmeans_path = kmeans_path
+        self.data_path = data_path
+        self.index_dir = index_dir
+        self.dataset_dir = dataset_dir
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._models = None
+        self._signature = None
+        self._last_check = 0.0
+        self._version = 0
+        self._listeners = []
+
+    # Fonctions appelées (avec les nouveaux modèles) après chaque rechargement
+    def on_reload(self, callback):
+        self._listeners.append(callback)
+
+    # Fichiers surveillés pour le rechargement à chaud
+    def watched_paths(self):
+        return [
+            self.tfidf_path,
+            self.kmeans_path,
+            self.data_path,
+            os.path.join(self.dataset_dir, 'manifest.json'),
+            os.path.join(self.index_dir, 'manifest.json'),
+            os.path.join(self.index_dir, 'journals', 'manifest.json'),
+            os.path.join(self.index_dir, 'embeddings', 'manifest.json'),
+        ]
+
+    # Empreinte (mtime, taille) des fichiers surveillés
+    def signature(self):
+        signature = []
+        for path in self.watched_paths():
+            try:
+                stat = os.stat(path)
+                signature.append((path, stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                signature.append((path, None, None))
+        return tuple(signature)
+
+    def _load(self, signature):
+        # Table de lemmes du même entraînement que le TF-IDF (erreur si elle est absente)
+        reload_lemmas()
+        tfidf = joblib.load(self.tfidf_path)
+        # Les tableaux numpy du modèle (centroïdes) sont projetés en mémoire
+        kmeans = joblib.load(self.kmeans_path, mmap_mode='r')
+
+        self._version += 1
+        fingerprint = hashlib.sha1(repr(signature).encode()).hexdigest()[:16]
+        self._models = LoadedModels(tfidf, kmeans, self.data_path, self.dataset_dir,
+                                    self.index_dir, self._version, fingerprint)
+        self._signature = signature
+        print(f"Modèles chargés (version {self._version}).")
+        for callback in self._listeners:
+            callback(self._models)
+
+    # Retourne les modèles courants, en les rechargeant si les fichiers ont changé
+    def get(self):
+        now = time.monotonic()
+        if self._models is not None and now - self._last_check < self.check_interval:
+            return self._models
+
+        with self._lock:
+            if self._models is None or now - self._last_check >= self.check_interval:
+                self._last_check = now
+                signature = self.signature()
+                if signature != self._signature:
+                    self._load(signature)
+            return self._models
+
+    @property
+    def version(self):
+        return self._version
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+# Registre unique du processus
+def get_registry():
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ModelRegistry()
+    return _registry
+
+
+# Préchauffage : modèles, index par cluster et un premier passage transform/predict.
+# Retourne la durée en secondes.
+def warm_up(registry=None):
+    start = time.perf_counter()
+    models = (registry or get_registry()).get()
+    vecteur = models.tfidf.transform([preprocess_text(WARM_UP_TEXT)])
+    models.kmeans.predict(vecteur)
+    if os.path.exists(os.path.join(models.index_dir, 'manifest.json')):
+        for cluster_num in indexed_clusters(models.index_dir):
+            models.cluster_index(cluster_num)
+    return time.perf_counter() - start
+
+
+_warm_up_thread = None
+
+# Lance le préchauffage une seule fois par processus, en arrière-plan :
+# la page s'affiche pendant que les modèles se chargent
+def start_warm_up():
+    global _warm_up_thread
+    with _registry_lock:
+        if _warm_up_thread is None:
+            _warm_up_thread = threading.Thread(target=warm_up, name='warm-up', daemon=True)
+            _warm_up_thread.start()
+    return _warm_up_thread
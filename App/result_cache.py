@@ -0,0 +1,119 @@
+import os
+import time
+import pickle
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+
+from registry import get_registry
+
+MAX_ENTRIES = 512
+TTL_SECONDS = 3600
+# Chemin d'une base SQLite locale pour partager le cache entre processus : variable d'environnement
+# RESULT_CACHE_PATH ou option --result-cache de app.py (absent : cache en mémoire seulement)
+DISK_PATH = os.environ.get('RESULT_CACHE_PATH') or None
+
+
+# Clé d'un résultat : texte prétraité, empreinte du modèle et paramètres de la recherche
+def cache_key(processed_text, model_fingerprint, *params):
+    payload = '\x1f'.join([processed_text, str(model_fingerprint)] + [str(param) for param in params])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+# Cache LRU avec durée de vie ; les valeurs sont des résultats complets de recommandation
+class ResultCache:
+    def __init__(self, max_entries=MAX_ENTRIES, ttl=TTL_SECONDS, disk_path=DISK_PATH):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.disk_path = disk_path
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if disk_path:
+            directory = os.path.dirname(disk_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with self._connect() as db:
+                db.execute("PRAGMA journal_mode=WAL")
+                db.execute("CREATE TABLE IF NOT EXISTS results "
+                           "(key TEXT PRIMARY KEY, fingerprint TEXT, created REAL, value BLOB)")
+
+    def _connect(self):
+        return sqlite3.connect(self.disk_path, timeout=5)
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] <= self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self._entries.pop(key, None)
+
+        if self.disk_path:
+            with self._connect() as db:
+                row = db.execute("SELECT created, value FROM results WHERE key = ?", (key,)).fetchone()
+            if row is not None and now - row[0] <= self.ttl:
+                value = pickle.loads(row[1])
+                with self._lock:
+                    self._store(key, row[0], value)
+                    self.hits += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, value, fingerprint=None):
+        created = time.time()
+        with self._lock:
+            self._store(key, created, value)
+        if self.disk_path:
+            with self._connect() as db:
+                db.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                           (key, fingerprint, created, pickle.dumps(value)))
+                # Même plafond que la mémoire : les entrées les plus anciennes sont supprimées
+                db.execute("DELETE FROM results WHERE key NOT IN "
+                           "(SELECT key FROM results ORDER BY created DESC LIMIT ?)", (self.max_entries,))
+
+    def _store(self, key, created, value):
+        self._entries[key] = (created, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    # Vide le cache ; sur disque, seules les entrées d'un autre modèle (ou expirées) sont supprimées
+    def invalidate(self, fingerprint=None):
+        with self._lock:
+            self._entries.clear()
+        if self.disk_path:
+            with self._connect() as db:
+                db.execute("DELETE FROM results WHERE fingerprint IS NOT ? OR created < ?",
+                           (fingerprint, time.time() - self.ttl))
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 3) if total else None,
+            'entries': len(self._entries),
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+# Cache unique du processus, vidé à chaque rechargement du registre ; disk_path n'est pris en compte
+# qu'à la création
+def get_result_cache(disk_path=DISK_PATH):
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResultCache(disk_path=disk_path)
+                get_registry().on_reload(lambda models: _cache.invalidate(models.fingerprint))
+    return _cache
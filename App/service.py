@@ -0,0 +1,173 @@
+import json
+import time
+import queue
+import argparse
+import threading
+from concurrent.futures import Future
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from recommender import manuscript_text, recommend_batch
+from registry import get_registry
+
+# Paramètres du micro-batching
+MAX_WAIT_MS = 5
+MAX_BATCH_SIZE = 64
+DEFAULT_TOP_K = 10
+
+
+# Regroupe les requêtes concurrentes pour n'exécuter qu'un passage transform/predict/matmul par lot
+class MicroBatcher:
+    def __init__(self, registry, max_wait_ms=MAX_WAIT_MS, max_batch_size=MAX_BATCH_SIZE):
+        self.registry = registry
+        self.max_wait = max_wait_ms / 1000
+        self.max_batch_size = max_batch_size
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+        self._thread.start()
+
+    # Soumet un manuscrit ; retourne un Future résolu avec ses recommandations
+    def submit(self, text, k):
+        future = Future()
+        self._queue.put((text, k, time.perf_counter(), future))
+        return future
+
+    # Attend la première requête puis collecte les suivantes pendant max_wait
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            try:
+                self._process(batch)
+            except Exception as e:
+                if len(batch) == 1:
+                    batch[0][3].set_exception(e)
+                    continue
+                # Une requête en erreur ne fait pas échouer les autres : chaque requête est rejouée seule
+                for item in batch:
+                    if item[3].done():
+                        continue
+                    try:
+                        self._process([item])
+                    except Exception as item_error:
+                        item[3].set_exception(item_error)
+
+    def _process(self, batch):
+        batch_start = time.perf_counter()
+        models = self.registry.get()
+        texts = [text for text, _, _, _ in batch]
+        k = max(k for _, k, _, _ in batch)
+
+        timings = {}
+        records = recommend_batch(models, texts, k=k, timings=timings)
+        timings['batch_ms'] = (time.perf_counter() - batch_start) * 1000
+
+        responses = [{'cluster': None, 'sjr': [], 'similarity': []} for _ in batch]
+        for row in records.to_dict(orient='records'):
+            response = responses[row['id']]
+            response['cluster'] = row['cluster']
+            entry = {'rank': row['rank'], 'journal_name': row['journal_name'], 'sjr_score': row['sjr_score']}
+            if row['ranking'] == 'similarity':
+                entry['similarity'] = row['similarity']
+            response[row['ranking']].append(entry)
+
+        for response, (_, request_k, enqueued, future) in zip(responses, batch):
+            response['sjr'] = response['sjr'][:request_k]
+            response['similarity'] = response['similarity'][:request_k]
+            response['timings'] = dict(timings,
+                                       queue_ms=(batch_start - enqueued) * 1000,
+                                       batch_size=len(batch),
+                                       model_version=models.version)
+            future.set_result(response)
+
+
+# File d'attente TCP plus longue que la valeur par défaut (5) pour absorber les pics de connexions
+class RecommendationServer(ThreadingHTTPServer):
+    request_queue_size = 128
+    daemon_threads = True
+
+
+class RecommendationHandler(BaseHTTPRequestHandler):
+    batcher = None
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/health':
+            self._send_json(200, {'status': 'ok', 'model_version': self.batcher.registry.version})
+        else:
+            self._send_json(404, {'error': 'Route inconnue'})
+
+    def do_POST(self):
+        if self.path != '/recommend':
+            self._send_json(404, {'error': 'Route inconnue'})
+            return
+        request_start = time.perf_counter()
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            payload = json.loads(self.rfile.read(length) or b'{}')
+            titre = payload.get('title', '')
+            resume = payload.get('abstract', '')
+            mots_cles = payload.get('keywords', '')
+            k = max(1, int(payload.get('top_k', DEFAULT_TOP_K)))
+        except (ValueError, TypeError, AttributeError) as e:
+            self._send_json(400, {'error': f"Requête invalide : {e}"})
+            return
+        if not (titre and resume and mots_cles):
+            self._send_json(400, {'error': "Les champs title, abstract et keywords sont obligatoires."})
+            return
+
+        try:
+            response = self.batcher.submit(manuscript_text(titre, resume, mots_cles), k).result()
+        except Exception as e:
+            self._send_json(500, {'error': f"Une erreur s'est produite : {e}"})
+            return
+        response['timings']['total_ms'] = (time.perf_counter() - request_start) * 1000
+        self._send_json(200, response)
+
+    # Pas de journal par requête sur la sortie standard
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Service HTTP de recommandation de journaux.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--max-wait-ms', type=float, default=MAX_WAIT_MS)
+    parser.add_argument('--max-batch-size', type=int, default=MAX_BATCH_SIZE)
+    args = parser.parse_args()
+
+    registry = get_registry()
+    registry.get()  # chargement des modèles avant la première requête
+    RecommendationHandler.batcher = MicroBatcher(registry, args.max_wait_ms, args.max_batch_size)
+
+    server = RecommendationServer((args.host, args.port), RecommendationHandler)
+    print(f"Service démarré sur http://{args.host}:{args.port} (POST /recommend, GET /health)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+import io
+import os
+import json
+import argparse
+import numpy as np
+import pandas as pd
+import joblib
+from scipy import sparse
+
+from preprocessing import preprocess_corpus
+
+# Chemins par défaut (relatifs au dossier App)
+DATA_PATH = 'data/df_clustering.csv'
+TFIDF_PATH = 'Tokenizers/tfidf_vectorizer.joblib'
+INDEX_DIR = 'index'
+
+# Colonnes conservées pour relier chaque ligne de la matrice à son journal
+META_COLUMNS = ['journal_name', 'sjr_score']
+
+
+# Prépare les lignes candidates d'un cluster, comme le faisait l'onglet "Par similarité"
+def prepare_cluster_rows(df, cluster_num, n_jobs=1):
+    same_cluster_df = df[df['cluster'] == cluster_num].copy()
+    same_cluster_df['sjr_score'] = pd.to_numeric(same_cluster_df['sjr_score'], errors='coerce')
+    same_cluster_df = same_cluster_df.dropna(subset=['sjr_score'])
+    same_cluster_df['combined_text'] = (
+        same_cluster_df['title'] + ' ' +
+        same_cluster_df['abstract'] + ' ' +
+        same_cluster_df['author_keywords']
+    )
+    same_cluster_df['processed_text'] = preprocess_corpus(same_cluster_df['combined_text'], n_jobs)
+    return same_cluster_df
+
+
+# Écrit un fichier via un fichier temporaire renommé ensuite : les processus qui ont
+# déjà projeté l'ancien fichier en mémoire continuent de lire une version cohérente
+def replace_file(path, write, mode='wb'):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, mode) as f:
+        write(f)
+    os.replace(tmp_path, path)
+
+
+# Sauvegarde une matrice CSR sous forme de tableaux .npy projetables en mémoire
+def save_csr(matrix, path):
+    os.makedirs(path, exist_ok=True)
+    matrix = sparse.csr_matrix(matrix, dtype=np.float32)
+    matrix.sort_indices()
+    replace_file(os.path.join(path, 'data.npy'), lambda f: np.save(f, matrix.data))
+    replace_file(os.path.join(path, 'indices.npy'), lambda f: np.save(f, matrix.indices.astype(np.int32)))
+    replace_file(os.path.join(path, 'indptr.npy'), lambda f: np.save(f, matrix.indptr.astype(np.int64)))
+    replace_file(os.path.join(path, 'shape.json'), lambda f: json.dump(list(matrix.shape), f), mode='w')
+
+
+# Ajoute des valeurs à la fin d'un tableau .npy à une dimension sans réécrire l'existant ; keep : nombre
+# d'éléments valides conservés (les restes d'une mise à jour interrompue sont écrasés). Les données sont
+# écrites avant l'en-tête : un lecteur voit l'ancienne ou la nouvelle longueur, jamais un état partiel.
+def append_npy(path, values, keep=None):
+    with open(path, 'r+b') as f:
+        version = np.lib.format.read_magic(f)
+        read_header, write_header = ((np.lib.format.read_array_header_1_0, np.lib.format.write_array_header_1_0)
+                                     if version == (1, 0) else
+                                     (np.lib.format.read_array_header_2_0, np.lib.format.write_array_header_2_0))
+        shape, _, dtype = read_header(f)
+        header_size = f.tell()
+        keep = shape[0] if keep is None else keep
+        values = np.asarray(values, dtype=dtype)
+        header = io.BytesIO()
+        write_header(header, {'descr': np.lib.format.dtype_to_descr(dtype), 'fortran_order': False,
+                              'shape': (keep + len(values),)})
+        # En-tête de même taille (le remplissage absorbe les chiffres en plus) : écriture en place
+        if len(header.getvalue()) == header_size:
+            f.seek(header_size + keep * dtype.itemsize)
+            f.write(values.tobytes())
+            f.truncate()
+            f.flush()
+            f.seek(0)
+            f.write(header.getvalue())
+            return keep + len(values)
+    existing = np.load(path, mmap_mode='r')[:keep]
+    replace_file(path, lambda f: np.save(f, np.concatenate([existing, values])))
+    return keep + len(values)
+
+
+# Ajoute des lignes à une matrice enregistrée par save_csr ; seules les nouvelles valeurs sont écrites.
+# rows : lignes déjà valides (par défaut celles de shape.json), shape.json est mis à jour en dernier
+def append_csr(matrix, path, rows=None):
+    with open(os.path.join(path, 'shape.json')) as f:
+        shape = json.load(f)
+    rows = shape[0] if rows is None else rows
+    nnz = int(np.load(os.path.join(path, 'indptr.npy'), mmap_mode='r')[rows])
+    matrix = sparse.csr_matrix(matrix, dtype=np.float32)
+    matrix.sort_indices()
+    append_npy(os.path.join(path, 'data.npy'), matrix.data, keep=nnz)
+    append_npy(os.path.join(path, 'indices.npy'), matrix.indices.astype(np.int32), keep=nnz)
+    append_npy(os.path.join(path, 'indptr.npy'), matrix.indptr[1:].astype(np.int64) + nnz, keep=rows + 1)
+    shape = [rows + matrix.shape[0], shape[1]]
+    replace_file(os.path.join(path, 'shape.json'), lambda f: json.dump(shape, f), mode='w')
+    return shape[0]
+
+
+# Ajoute des lignes à un index de cluster existant (ou le crée). rows : taille du cluster dans le
+# manifeste ; des lignes au-delà viennent d'une mise à jour interrompue et sont remplacées
+def append_to_cluster_index(cluster_dir, X_new, meta_new, rows=None):
+    meta_path = os.path.join(cluster_dir, 'meta.csv')
+    if rows == 0 or not os.path.exists(meta_path):
+        save_csr(X_new, cluster_dir)
+        meta_new[META_COLUMNS].to_csv(meta_path, index=False)
+        return X_new.shape[0]
+
+    with open(os.path.join(cluster_dir, 'shape.json')) as f:
+        stored_rows = json.load(f)[0]
+    if rows is not None and rows != stored_rows:
+        meta = pd.read_csv(meta_path, nrows=rows)
+        replace_file(meta_path, lambda f: meta.to_csv(f, index=False), mode='w')
+    size = append_csr(X_new, cluster_dir, rows)
+    meta_new[META_COLUMNS].to_csv(meta_path, mode='a', header=False, index=False)
+    return size
+
+
+# Le manifeste est écrit en dernier : sa modification déclenche le rechargement du registre
+def write_manifest(manifest, index_dir=INDEX_DIR):
+    replace_file(os.path.join(index_dir, 'manifest.json'),
+                 lambda f: json.dump(manifest, f, indent=2), mode='w')
+
+
+def load_manifest(index_dir=INDEX_DIR):
+    with open(os.path.join(index_dir, 'manifest.json')) as f:
+        return json.load(f)
+
+
+# Recharge une matrice CSR sans copier les tableaux (mmap en lecture seule) ; rows : nombre de lignes
+# valides d'après un manifeste (les lignes ajoutées au-delà par append_csr sont ignorées)
+def load_csr(path, mmap_mode='r', rows=None):
+    data = np.load(os.path.join(path, 'data.npy'), mmap_mode=mmap_mode)
+    indices = np.load(os.path.join(path, 'indices.npy'), mmap_mode=mmap_mode)
+    indptr = np.load(os.path.join(path, 'indptr.npy'), mmap_mode=mmap_mode)
+    with open(os.path.join(path, 'shape.json')) as f:
+        shape = tuple(json.load(f))
+    if rows is not None:
+        indptr = indptr[:rows + 1]
+        shape = (rows, shape[1])
+    return sparse.csr_matrix((data, indices, indptr), shape=shape, copy=False)
+
+
+# Étape hors ligne : vectorise chaque cluster une fois pour toutes
+def build_index(df, tfidf, index_dir=INDEX_DIR, n_jobs=1):
+    clusters = sorted(df['cluster'].dropna().unique())
+    manifest = {'clusters': {}}
+    for cluster_num in clusters:
+        cluster_num = int(cluster_num)
+        rows = prepare_cluster_rows(df, cluster_num, n_jobs)
+        if rows.empty:
+            continue
+        X_cluster = tfidf.transform(rows['processed_text'])
+
+        cluster_dir = os.path.join(index_dir, f'cluster_{cluster_num}')
+        save_csr(X_cluster, cluster_dir)
+        rows[META_COLUMNS].to_csv(os.path.join(cluster_dir, 'meta.csv'), index=False)
+
+        manifest['clusters'][str(cluster_num)] = X_cluster.shape[0]
+        print(f"Cluster {cluster_num} : {X_cluster.shape[0]} articles indexés.")
+
+    write_manifest(manifest, index_dir)
+    return manifest
+
+
+# Clusters présents dans l'index (un cluster sans article n'a pas de dossier)
+def indexed_clusters(index_dir=INDEX_DIR):
+    return {int(cluster_num) for cluster_num in load_manifest(index_dir)['clusters']}
+
+
+# Charge la matrice et les métadonnées d'un cluster
+def load_cluster_index(cluster_num, index_dir=INDEX_DIR):
+    cluster_dir = os.path.join(index_dir, f'cluster_{int(cluster_num)}')
+    if not os.path.exists(cluster_dir):
+        raise FileNotFoundError(
+            f"Index du cluster {cluster_num} introuvable dans '{index_dir}'. "
+            "Lancez d'abord : python similarity_index.py"
+        )
+    matrix = load_csr(cluster_dir)
+    meta = pd.read_csv(os.path.join(cluster_dir, 'meta.csv'))
+    return matrix, meta
+
+
+# Retourne les positions et scores des k meilleurs éléments d'un vecteur de scores
+def top_k(scores, k):
+    k = min(k, len(scores))
+    if k == 0:
+        return np.array([], dtype=int), np.array([], dtype=scores.dtype)
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top], kind='stable')]
+    return top, scores[top]
+
+
+# Les vecteurs TF-IDF sont normalisés (L2) : le produit scalaire est la similarité cosinus
+def query_cluster_index(matrix, meta, vecteur, k=10):
+    scores = np.asarray((matrix @ vecteur.T).todense()).ravel()
+    top, similarities = top_k(scores, k)
+    closest_neighbors = meta.iloc[top].copy()
+    closest_neighbors['similarity'] = similarities
+    return closest_neighbors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Construit l'index de similarité par cluster.")
+    parser.add_argument('--data', default=DATA_PATH)
+    parser.add_argument('--tfidf', default=TFIDF_PATH)
+    parser.add_argument('--output', default=INDEX_DIR)
+    parser.add_argument('--jobs', type=int, default=-1,
+                        help="Processus de prétraitement (-1 : tous les cœurs)")
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.data)
+    tfidf = joblib.load(args.tfidf)
+    build_index(df, tfidf, args.output, args.jobs)
+    print(f"Index sauvegardé dans '{args.output}'.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+import os
+import json
+import time
+import argparse
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import joblib
+import sklearn
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.metrics import silhouette_score
+from threadpoolctl import threadpool_limits
+
+from preprocessing import preprocess_corpus, export_text_resources, use_wordnet
+from registry import KMEANS_PATH
+from similarity_index import DATA_PATH, TFIDF_PATH, INDEX_DIR, build_index, replace_file
+from journal_index import JOURNAL_INDEX_DIR, build_journal_index
+from embeddings import EMBEDDING_DIR, build_embeddings
+from cluster_store import CLUSTER_DATASET_DIR, write_cluster_dataset
+
+TRAINING_PATH = 'merged_documents_datasets_Training.csv'
+MANIFEST_DIR = 'Models/manifests'
+
+MAX_FEATURES = 1000
+K_RANGE = (2, 20)
+SILHOUETTE_SAMPLE = 10_000
+RANDOM_STATE = 42
+
+TEXT_COLUMNS = ['title', 'abstract', 'author_keywords', 'journal_name']
+
+
+# Texte combiné utilisé pour l'encodage, comme dans le notebook d'entraînement
+def training_texts(df):
+    return df['title'] + ' ' + df['abstract'] + ' ' + df['author_keywords'] + ' ' + df['journal_name']
+
+
+def make_kmeans(k, minibatch, random_state):
+    if minibatch:
+        return MiniBatchKMeans(n_clusters=k, init='k-means++', random_state=random_state,
+                               batch_size=4096, n_init=3)
+    return KMeans(n_clusters=k, init='k-means++', random_state=random_state)
+
+
+# Matrice partagée par les processus du balayage (transmise une fois par processus)
+_X = None
+# Limite des threads BLAS/OpenMP du processus (conservée pour rester active)
+_thread_limits = None
+
+# Les cœurs sont répartis entre les processus : sans limite, chaque KMeans lancerait
+# autant de threads OpenMP que de cœurs
+def _init_worker(X, n_threads):
+    global _X, _thread_limits
+    _X = X
+    _thread_limits = threadpool_limits(limits=n_threads)
+
+
+# Évalue un k : inertie et silhouette estimée sur un échantillon
+def evaluate_k(k, minibatch, sample_size, random_state):
+    start = time.perf_counter()
+    kmeans = make_kmeans(k, minibatch, random_state)
+    labels = kmeans.fit_predict(_X)
+    fit_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    sample_size = min(sample_size, _X.shape[0]) if sample_size else None
+    silhouette = silhouette_score(_X, labels, sample_size=sample_size, random_state=random_state)
+    return {
+        'k': k,
+        'inertia': float(kmeans.inertia_),
+        'silhouette': float(silhouette),
+        'fit_seconds': round(fit_seconds, 3),
+        'silhouette_seconds': round(time.perf_counter() - start, 3),
+    }
+
+
+# Balayage des valeurs de k dans un pool de processus
+def sweep_k(X, k_values, minibatch=False, sample_size=SILHOUETTE_SAMPLE,
+            random_state=RANDOM_STATE, n_jobs=-1):
+    n_cpus = os.cpu_count() or 1
+    if n_jobs is None or n_jobs < 0:
+        n_jobs = n_cpus
+    k_values = list(k_values)
+    n_jobs = max(1, min(n_jobs, len(k_values)))
+    n_threads = max(1, n_cpus // n_jobs)
+    with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker, initargs=(X, n_threads)) as executor:
+        futures = [executor.submit(evaluate_k, k, minibatch, sample_size, random_state) for k in k_values]
+        return [future.result() for future in futures]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Entraînement du système de recommandation (TF-IDF + KMeans).")
+    parser.add_argument('--training', default=TRAINING_PATH, help="Jeu de documents d'entraînement")
+    parser.add_argument('--k', type=int, default=None,
+                        help="Nombre de clusters imposé ; par défaut, le k de meilleure silhouette")
+    parser.add_argument('--k-min', type=int, default=K_RANGE[0])
+    parser.add_argument('--k-max', type=int, default=K_RANGE[1], help="Borne exclue")
+    parser.add_argument('--silhouette-sample', type=int, default=SILHOUETTE_SAMPLE,
+                        help="Taille de l'échantillon pour la silhouette (0 : tout le corpus)")
+    parser.add_argument('--minibatch', action='store_true', help="MiniBatchKMeans pour les grands corpus")
+    parser.add_argument('--random-state', type=int, default=RANDOM_STATE)
+    parser.add_argument('--jobs', type=int, default=-1, help="Processus (-1 : tous les cœurs)")
+    args = parser.parse_args()
+
+    timings = {}
+    start = time.perf_counter()
+
+    df = pd.read_csv(args.training)
+    df.fillna({column: '' for column in TEXT_COLUMNS}, inplace=True)
+    timings['load_seconds'] = round(time.perf_counter() - start, 3)
+
+    # Les mots absents de la table de lemmes précédente sont lemmatisés par WordNet
+    use_wordnet()
+    step = time.perf_counter()
+    processed = preprocess_corpus(training_texts(df), args.jobs)
+    timings['preprocess_seconds'] = round(time.perf_counter() - step, 3)
+
+    step = time.perf_counter()
+    tfidf = TfidfVectorizer(max_features=MAX_FEATURES)
+    X = tfidf.fit_transform(processed)
+    timings['tfidf_seconds'] = round(time.perf_counter() - step, 3)
+
+    # Lemmes du corpus et des pluriels des termes TF-IDF, exportés pour un démarrage de l'application sans NLTK
+    step = time.perf_counter()
+    n_stopwords, n_lemmas = export_text_resources(training_texts(df), vocabulary=tfidf.vocabulary_)
+    timings['text_resources_seconds'] = round(time.perf_counter() - step, 3)
+    print(f"{n_lemmas} lemmes exportés ({n_stopwords} stopwords exclus).")
+
+    # k imposé : pas de balayage
+    scores = []
+    if args.k:
+        best_k = args.k
+    else:
+        step = time.perf_counter()
+        scores = sweep_k(X, range(args.k_min, args.k_max), args.minibatch,
+                         args.silhouette_sample, args.random_state, args.jobs)
+        timings['sweep_seconds'] = round(time.perf_counter() - step, 3)
+        for score in scores:
+            print(f"k={score['k']:>2}  inertie={score['inertia']:.1f}  silhouette={score['silhouette']:.4f}")
+        best_k = max(scores, key=lambda score: score['silhouette'])['k']
+
+    step = time.perf_counter()
+    kmeans = make_kmeans(best_k, args.minibatch, args.random_state)
+    df['cluster'] = kmeans.fit_predict(X)
+    timings['final_fit_seconds'] = round(time.perf_counter() - step, 3)
+
+    os.makedirs(os.path.dirname(TFIDF_PATH), exist_ok=True)
+    os.makedirs(os.path.dirname(KMEANS_PATH), exist_ok=True)
+    os.makedirs(os.path.dirname(DATA_PATH), exist_ok=True)
+    replace_file(TFIDF_PATH, lambda f: joblib.dump(tfidf, f))
+    replace_file(KMEANS_PATH, lambda f: joblib.dump(kmeans, f))
+    replace_file(DATA_PATH, lambda f: df.to_csv(f, index=False), mode='w')
+    # Copie colonnaire partitionnée par cluster, lue par l'application
+    write_cluster_dataset(df, CLUSTER_DATASET_DIR)
+    print(f"Modèle K-Means (k={best_k}) et TF-IDF sauvegardés.")
+
+    # Index toujours reconstruits : ceux de l'entraînement précédent renverraient, pour le cluster i,
+    # les articles d'un autre découpage (et les vecteurs d'un autre TF-IDF). L'index dense Word2Vec
+    # (gensim, facultatif) n'est reconstruit que s'il a déjà été construit
+    step = time.perf_counter()
+    build_index(df, tfidf, INDEX_DIR, args.jobs)
+    build_journal_index(df, tfidf, JOURNAL_INDEX_DIR, args.jobs)
+    if os.path.exists(os.path.join(EMBEDDING_DIR, 'manifest.json')):
+        build_embeddings(df, EMBEDDING_DIR, args.jobs)
+    timings['index_seconds'] = round(time.perf_counter() - step, 3)
+
+    timings['total_seconds'] = round(time.perf_counter() - start, 3)
+
+    version = datetime.now().strftime('%Y%m%d-%H%M%S')
+    manifest = {
+        'version': version,
+        'training_data': args.training,
+        'documents': int(X.shape[0]),
+        'max_features': MAX_FEATURES,
+        'algorithm': 'MiniBatchKMeans' if args.minibatch else 'KMeans',
+        'best_k': int(best_k),
+        'random_state': args.random_state,
+        'silhouette_sample': args.silhouette_sample,
+        'sklearn_version': sklearn.__version__,
+        'scores': scores,
+        'timings': timings,
+    }
+    os.makedirs(MANIFEST_DIR, exist_ok=True)
+    with open(os.path.join(MANIFEST_DIR, f'{version}.json'), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    replace_file(os.path.join(os.path.dirname(KMEANS_PATH), 'manifest.json'),
+                 lambda f: json.dump(manifest, f, indent=2), mode='w')
+    print(f"Manifeste {version} enregistré ({timings['total_seconds']} s au total).")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,35 +1,15 @@
 import csv
-import time
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from rate_limit import get_limiter, polite_get
+from http_fetcher import HttpFetcher, PageBlocked, parse_article_rows, article_record
 
+# Nombre maximal de pages de détail récupérées simultanément (le débit reste fixé par rate_limit.py)
+DETAIL_WORKERS = 4
 
-# Fonction pour extraire le lien d'un article
-def extract_articles_link(driver, article_element):
-    # Lien vers l'article
-    try:
-        article_link = article_element.find_element(By.CLASS_NAME, 'gsc_a_at').get_attribute('href')
-        citations = article_element.find_element(By.CLASS_NAME, "gsc_a_ac").text
-        year = article_element.find_element(By.CLASS_NAME, "gsc_a_h.gsc_a_hc.gs_ibl").text
-    except Exception as e:
-        print(f"Erreur lors de l'extraction du lien: {e}")
-        article_link = ""
-        citations = None
-        year = None
-    
-    if article_link:
-        title_element, authors, title_source, summary, doi, doc_type, keywords = access_article_page(driver, article_link)
-    else:
-        title_element = None
-        authors = None
-        title_source = None
-        summary = None
-        doi = None
-        doc_type = None
-        keywords = None
-    
-    return article_link, title_element, authors, year, title_source, citations, summary, doi, doc_type, keywords
 
 # Fonction pour accéder à la page de l'article et extraire des informations supplémentaires
 def access_article_page(driver, article_link):
@@ -37,7 +17,7 @@ def access_article_page(driver, article_link):
     driver.execute_script("window.open('');")
     driver.switch_to.window(driver.window_handles[1])
 
-    driver.get(article_link)
+    polite_get(driver, article_link)
     try:
         WebDriverWait(driver, 10).until(
             EC.presence_of_element_located((By.CLASS_NAME, 'gsh_csp'))
@@ -98,58 +78,84 @@ def access_article_page(driver, article_link):
 
     return title_element, authors, source_title, summary, doi, doc_type, keywords
 
-# Fonction pour extraire les articles d'un auteur donné
-def extract_articles_from_author(author_id, driver):
-    url = f"https://scholar.google.com/citations?user={author_id}&hl=en"
-    driver.get(url)
-    time.sleep(3)  # Attendre que la page charge
+# Récupère les pages de détail en parallèle (HTTP + lxml, nombre de requêtes simultanées borné) ;
+# les pages bloquées ou en erreur sont relues une à une dans le navigateur
+def fetch_article_details(article_links, driver, fetcher, workers=DETAIL_WORKERS):
+    fetcher.copy_cookies(driver)
 
-    articles_data = []  # Liste pour stocker les données des articles
-
-    more_articles = True  # Indicateur pour continuer l'extraction si "Show more" est cliquable
-
-    while more_articles:
+    def fetch(article_link):
         try:
-            # Localiser tous les articles visibles sur la page
-            articles = WebDriverWait(driver, 10).until(
-                EC.presence_of_all_elements_located((By.CLASS_NAME, 'gsc_a_tr'))
-            )
-        except Exception as e:
-            print(f"Erreur lors de la localisation des articles: {e}")
-            break
+            return fetcher.article(article_link)
+        except (PageBlocked, requests.RequestException) as e:
+            print(f"Page de l'article indisponible en HTTP ({e}), passage par le navigateur.")
+            return None
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        details = list(pool.map(fetch, article_links))
+
+    for i, article_link in enumerate(article_links):
+        if details[i] is None:
+            title_element, authors, source_title, summary, doi, doc_type, keywords = access_article_page(driver, article_link)
+            details[i] = {
+                "Titre de l'article": title_element, "Auteurs": authors, "Titre de source": source_title,
+                "Résumé": summary, "DOI": doi, "Mots-clés": keywords, "Type de document": doc_type,
+            }
+    return dict(zip(article_links, details))
+
+# Fonction pour extraire les articles d'un auteur donné.
+# known_article(lien) retourne l'article déjà enregistré (sa page de détail n'est pas redemandée)
+def extract_articles_from_author(author_id, driver, known_article=None, fetcher=None):
+    url = f"https://scholar.google.com/citations?user={author_id}&hl=en"
+    polite_get(driver, url)
+
+    try:
+        # Localiser les articles visibles sur la page
+        WebDriverWait(driver, 10).until(
+            EC.presence_of_all_elements_located((By.CLASS_NAME, 'gsc_a_tr'))
+        )
+    except Exception as e:
+        print(f"Erreur lors de la localisation des articles: {e}")
+        return []
 
-        # Extraire les informations de chaque article non encore ajouté
-        for article in articles[len(articles_data):]:  # Seules les nouvelles entrées sont traitées
-            try:
-                article_link, title, authors, year, source_title, citations, summary, doi, doc_type, keywords = extract_articles_link(driver, article)
-                articles_data.append({
-                    "Titre de l'article": title,
-                    "Auteurs": authors,
-                    "Année de publication": year,
-                    "Titre de source": source_title,
-                    "Nombre de citations": citations,
-                    "Résumé": summary,
-                    "DOI": doi,
-                    "Mots-clés": keywords,
-                    "Type de document": doc_type
-                })
-            except Exception as e:
-                print(f"Erreur lors de l'extraction d'un article : {e}")
-                continue
-
-        # Essayer de cliquer sur "Show more articles" pour charger plus d'articles
+    # Cliquer sur "Show more articles" jusqu'à ce que toute la liste soit chargée
+    while True:
         try:
             show_more_button = driver.find_element(By.ID, "gsc_bpf_more")
             if show_more_button.get_attribute("disabled") is not None:
                 print("Aucun autre article à charger.")
-                more_articles = False  # Fin de l'extraction
-            else:
-                show_more_button.click()
-                time.sleep(3)  # Attendre que les nouveaux articles se chargent
+                break
+            n_rows = len(driver.find_elements(By.CLASS_NAME, 'gsc_a_tr'))
+            get_limiter().wait(url)
+            show_more_button.click()
+            # Attendre que les nouveaux articles soient ajoutés (ou que le bouton soit désactivé)
+            WebDriverWait(driver, 15).until(
+                lambda d: len(d.find_elements(By.CLASS_NAME, 'gsc_a_tr')) > n_rows
+                or d.find_element(By.ID, "gsc_bpf_more").get_attribute("disabled") is not None
+            )
+            get_limiter().success(url)
         except Exception as e:
             print(f"Aucun bouton 'Show more' ou une erreur s'est produite: {e}")
             break
 
+    # Toutes les lignes (titre, lien, citations, année) lues en une fois dans le HTML de la page
+    rows = parse_article_rows(driver.page_source)
+    known = [known_article(row['link']) if known_article and row['link'] else None for row in rows]
+    to_fetch = list(dict.fromkeys(row['link'] for row, previous in zip(rows, known)
+                                  if row['link'] and previous is None))
+
+    own_fetcher = fetcher is None
+    if own_fetcher:
+        fetcher = HttpFetcher()
+    try:
+        details = fetch_article_details(to_fetch, driver, fetcher) if to_fetch else {}
+    finally:
+        if own_fetcher:
+            fetcher.close()
+
+    articles_data = []  # Liste pour stocker les données des articles
+    for row, previous in zip(rows, known):
+        articles_data.append(article_record(row, previous or details.get(row['link']) or {}))
+
     return articles_data
 
 def load_from_csv(filename):
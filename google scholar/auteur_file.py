@@ -1,23 +1,24 @@
 from selenium.webdriver.common.by import By
-import time
-import random
 import csv
 from selenium.common.exceptions import NoSuchElementException
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from urllib.parse import urlparse, parse_qs
+from rate_limit import get_limiter, page_ready, polite_get
 
 
 #Recherche un auteur sur Google Scholar et retourne le lien vers son profil.
 def search_author(author_name, driver):
-    driver.get("https://scholar.google.com/")
-    time.sleep(random.uniform(5, 15))
+    polite_get(driver, "https://scholar.google.com/")
 
     # Trouver la barre de recherche et entrer le nom de l'auteur
-    search_box = driver.find_element(By.NAME, "q")
+    search_box = WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.NAME, "q")))
     search_box.send_keys(author_name)
+    get_limiter().wait("https://scholar.google.com/")
     search_box.submit()
-    time.sleep(2) 
+    # Attendre que la page de résultats remplace la page d'accueil
+    WebDriverWait(driver, 10).until(EC.staleness_of(search_box))
+    page_ready(driver)
 
     # Tenter de trouver le lien vers le profil de l'auteur
     try:
@@ -32,9 +33,12 @@ def search_author(author_name, driver):
 
 #Extrait les informations de l'auteur depuis son profil Google Scholar.
 def extract_author_info(profile_link, driver):
-    driver.get(profile_link)
-    time.sleep(2) 
+    polite_get(driver, profile_link)
+    return read_author_info(profile_link, driver)
 
+
+#Lit les informations de l'auteur sur la page de profil déjà ouverte.
+def read_author_info(profile_link, driver):
     author_info = {}
 
     # Extraire l'ID de l'auteur à partir de l'URL
@@ -79,6 +83,7 @@ def extract_author_info(profile_link, driver):
         co_authors = []
         view_all_coauthors_button = driver.find_elements(By.XPATH, '//button[@id="gsc_coauth_opn"]')
         if len(view_all_coauthors_button) > 0 and view_all_coauthors_button[0].is_displayed():
+            get_limiter().wait(profile_link)
             view_all_coauthors_button[0].click()
             co_authors_elements = WebDriverWait(driver, 15).until(
                 EC.presence_of_all_elements_located((By.XPATH, "//h3[@class='gs_ai_name']/a"))
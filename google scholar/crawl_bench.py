@@ -0,0 +1,124 @@
+import json
+import time
+import random
+import argparse
+import threading
+import functools
+import pandas as pd
+from urllib.parse import urlparse, parse_qs, quote
+from urllib.request import urlopen
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from crawler import Crawler
+from rate_limit import RateLimiter
+
+
+# Faux Scholar/Scimago local : graphe d'auteurs synthétique et déterministe, latence fixe par requête
+class MockHandler(BaseHTTPRequestHandler):
+    latency = 0.05
+    n_authors = 5000
+    n_sources = 300
+    co_authors = 3
+    articles = 5
+
+    def _author_index(self, value):
+        return int(value.rsplit(' ', 1)[-1].lstrip('id')) % self.n_authors
+
+    def _author(self, name):
+        index = self._author_index(name)
+        rng = random.Random(index)
+        co_authors = [f"Auteur {rng.randrange(self.n_authors)}" for _ in range(self.co_authors)]
+        return {"ID de l'Auteur": f"id{index}", 'Nom': f"Auteur {index}", 'Co-auteurs': '; '.join(co_authors)}
+
+    def _articles(self, author_id):
+        index = self._author_index(author_id)
+        rng = random.Random(-index - 1)
+        return [{'Titre': f"Article {index}-{i}", 'Lien': f"/article/{index}-{i}", 'DOI': None, 'ISSN': None,
+                 'Titre de source': f"Source {rng.randrange(self.n_sources)}"}
+                for i in range(self.articles)]
+
+    def _journal(self, source_title):
+        index = int(source_title.rsplit(' ', 1)[-1])
+        return {'Nom': source_title, 'ISSN': f"{index:04d}-{index:04d}", 'SJR': '1.0', 'Quartile': 'Q1'}
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        url = urlparse(self.path)
+        key = parse_qs(url.query).get('q', [''])[0]
+        routes = {'/author': self._author, '/articles': self._articles, '/journal': self._journal}
+        if url.path not in routes:
+            self.send_error(404)
+            return
+        body = json.dumps(routes[url.path](key)).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class MockServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+# Backend du crawler qui interroge le faux serveur (une requête par tâche, comme le backend HTTP)
+class MockBackend:
+    def __init__(self, base_url):
+        self.base_url = base_url
+
+    def _get(self, path, key):
+        with urlopen(f"{self.base_url}/{path}?q={quote(str(key))}", timeout=30) as response:
+            return json.loads(response.read())
+
+    def author(self, name):
+        return self._get('author', name)
+
+    def articles(self, author_id, known_article=None):
+        return self._get('articles', author_id)
+
+    def journal(self, source_title):
+        return self._get('journal', source_title)
+
+    def close(self):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Débit du crawler (tâches/s) selon le nombre de workers, "
+                                                 "sur un faux serveur local sans délai de politesse.")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8, 16])
+    parser.add_argument('--latency', type=float, default=0.05, help="Latence de chaque réponse (secondes)")
+    parser.add_argument('--seeds', type=int, default=20, help="Nombre d'auteurs de départ")
+    parser.add_argument('--max-depth', type=int, default=2)
+    args = parser.parse_args()
+
+    MockHandler.latency = args.latency
+    server = MockServer(('127.0.0.1', 0), MockHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    seeds = [f"Auteur {i}" for i in range(args.seeds)]
+
+    rows = []
+    try:
+        for n_workers in args.workers:
+            # Limiteur sans plafond : seul le parallélisme des workers est mesuré
+            crawler = Crawler(functools.partial(MockBackend, base_url), n_workers, args.max_depth,
+                              limiter=RateLimiter(rates={}, default_rate=1e9), save_interval=0)
+            elapsed = crawler.run(seeds)
+            done = sum(state['done'] for state in crawler.status())
+            rows.append({'workers': n_workers, 'tâches': done, 'secondes': round(elapsed, 2),
+                         'tâches/s': round(done / elapsed, 1) if elapsed else None})
+    finally:
+        server.shutdown()
+
+    report = pd.DataFrame(rows)
+    report['accélération'] = (report['tâches/s'] / report['tâches/s'].iloc[0]).round(2)
+    print(report.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
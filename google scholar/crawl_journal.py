@@ -0,0 +1,213 @@
+import os
+import json
+import time
+import pickle
+import argparse
+import threading
+import pandas as pd
+
+from crawl_state import normalize_key
+
+JOURNAL_PATH = 'crawl_journal.jsonl'
+
+# Fichiers finaux produits par la compaction (mêmes noms que les fichiers partiels historiques)
+TREATED_PATH = 'treated_authors.pkl'
+AUTHORS_CSV = 'partial_auteur_info.csv'
+ARTICLES_CSV = 'partial_article_info.csv'
+JOURNALS_CSV = 'partial_journal_info.csv'
+
+# fsync groupé : au plus toutes les FSYNC_EVERY lignes ou FSYNC_INTERVAL secondes
+FSYNC_EVERY = 50
+FSYNC_INTERVAL = 2.0
+
+
+# Dernière ligne tronquée par un arrêt brutal : retirée avant la reprise, sinon le premier
+# enregistrement ajouté y serait collé et ignoré par replay
+def _trim_partial_line(path, chunk_size=4096):
+    if not os.path.exists(path):
+        return
+    with open(path, 'rb+') as f:
+        end = f.seek(0, os.SEEK_END)
+        if end == 0:
+            return
+        f.seek(end - 1)
+        if f.read(1) == b'\n':
+            return
+        while end > 0:
+            start = max(0, end - chunk_size)
+            f.seek(start)
+            newline = f.read(end - start).rfind(b'\n')
+            if newline >= 0:
+                f.truncate(start + newline + 1)
+                break
+            end = start
+        else:
+            f.truncate(0)
+    print("Ligne incomplète retirée du journal d'exploration.")
+
+
+# Journal d'exploration en ajout seul : une ligne JSON par enregistrement, écrite une seule fois.
+# Types : author (avec le nom recherché), article, articles (liste d'un auteur récupérée, même vide),
+# journal, issn (ISSN trouvé pour un titre de source, None si la recherche n'a rien donné)
+class CrawlJournal:
+    def __init__(self, path=JOURNAL_PATH, fsync_every=FSYNC_EVERY, fsync_interval=FSYNC_INTERVAL):
+        self.path = path
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        _trim_partial_line(path)
+        self._file = open(path, 'a', encoding='utf-8')
+        self._lock = threading.Lock()
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def append(self, kind, data):
+        line = json.dumps({'type': kind, 'data': data}, ensure_ascii=False, default=str)
+        with self._lock:
+            self._file.write(line + '\n')
+            self._unsynced += 1
+            if (self._unsynced >= self.fsync_every or
+                    time.monotonic() - self._last_sync >= self.fsync_interval):
+                self._sync()
+
+    def author(self, searched_name, author_data):
+        self.append('author', {'searched': searched_name, 'record': author_data})
+
+    def article(self, article):
+        self.append('article', article)
+
+    def articles(self, author_id, count):
+        self.append('articles', {"ID de l'Auteur": author_id, 'count': count})
+
+    def journal(self, journal_data):
+        self.append('journal', journal_data)
+
+    def issn(self, source_title, issn):
+        self.append('issn', {'Titre de source': source_title, 'ISSN': issn})
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    # Force l'écriture sur disque des lignes en attente
+    def flush(self):
+        with self._lock:
+            if self._unsynced:
+                self._sync()
+
+    def close(self):
+        with self._lock:
+            self._sync()
+            self._file.close()
+
+
+def _clean(record):
+    # Les CSV relus contiennent des NaN pour les cellules vides
+    return {key: (None if value != value else value) for key, value in record.items()}
+
+
+# Relecture du journal ; une dernière ligne tronquée (arrêt brutal) est ignorée.
+# searched : auteurs dont la liste d'articles a été récupérée et titres de source déjà recherchés
+# (titre -> ISSN, None sans résultat), pour ne rien redemander à la reprise
+def replay(path=JOURNAL_PATH):
+    treated_authors = set()
+    all_author_data = []
+    all_article_data = []
+    all_journal_data = []
+    searched = {'articles': set(), 'sources': {}}
+    issn_by_source = {}
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    print("Ligne incomplète ignorée dans le journal d'exploration.")
+                    continue
+                kind, data = entry['type'], entry['data']
+                if kind == 'author':
+                    if data['record'] is not None:
+                        all_author_data.append(data['record'])
+                    if data['searched'] is not None:
+                        treated_authors.add(data['searched'])
+                elif kind == 'article':
+                    all_article_data.append(data)
+                elif kind == 'articles':
+                    searched['articles'].add(data["ID de l'Auteur"])
+                elif kind == 'journal':
+                    all_journal_data.append(data)
+                elif kind == 'issn':
+                    searched['sources'][data['Titre de source']] = data['ISSN']
+                    if data['ISSN'] is not None:
+                        issn_by_source[normalize_key(data['Titre de source'])] = data['ISSN']
+
+    # Titres de source comparés après normalisation, comme dans CrawlState
+    for article in all_article_data:
+        source_title = article.get('Titre de source')
+        if not article.get('ISSN') and source_title and source_title == source_title:
+            issn = issn_by_source.get(normalize_key(source_title))
+            if issn is not None:
+                article['ISSN'] = issn
+    return treated_authors, all_author_data, all_article_data, all_journal_data, searched
+
+
+# Première reprise : les anciens fichiers partiels sont versés une fois dans le journal
+def import_partial_files(path=JOURNAL_PATH):
+    if os.path.exists(path) or not any(os.path.exists(p) for p in (AUTHORS_CSV, ARTICLES_CSV, JOURNALS_CSV)):
+        return False
+    treated_authors = set()
+    if os.path.exists(TREATED_PATH):
+        with open(TREATED_PATH, 'rb') as f:
+            treated_authors = pickle.load(f)
+    journal = CrawlJournal(path)
+    authors = pd.read_csv(AUTHORS_CSV).to_dict(orient='records') if os.path.exists(AUTHORS_CSV) else []
+    for author_data in authors:
+        journal.author(None, _clean(author_data))
+    # Les noms recherchés ne sont pas dans le CSV : ils sont repris du fichier pickle
+    for name in treated_authors:
+        journal.author(name, None)
+    if os.path.exists(ARTICLES_CSV):
+        for article in pd.read_csv(ARTICLES_CSV).to_dict(orient='records'):
+            journal.article(_clean(article))
+    if os.path.exists(JOURNALS_CSV):
+        for journal_data in pd.read_csv(JOURNALS_CSV).to_dict(orient='records'):
+            journal.journal(_clean(journal_data))
+    journal.close()
+    print(f"Fichiers partiels importés dans '{path}'.")
+    return True
+
+
+# Chargement de l'état d'exploration (valeurs de replay, transmises à CrawlState)
+def load_state(path=JOURNAL_PATH):
+    import_partial_files(path)
+    return replay(path)
+
+
+def _replace(path, write, mode='w'):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, mode) as f:
+        write(f)
+    os.replace(tmp_path, path)
+
+
+# Compaction : écrit les CSV finaux à partir du journal (en fin d'exploration ou à la demande)
+def compact(path=JOURNAL_PATH):
+    treated_authors, all_author_data, all_article_data, all_journal_data, _ = load_state(path)
+    _replace(TREATED_PATH, lambda f: pickle.dump(treated_authors, f), mode='wb')
+    _replace(AUTHORS_CSV, lambda f: pd.DataFrame(all_author_data).to_csv(f, index=False))
+    _replace(ARTICLES_CSV, lambda f: pd.DataFrame(all_article_data).to_csv(f, index=False))
+    _replace(JOURNALS_CSV, lambda f: pd.DataFrame(all_journal_data).to_csv(f, index=False))
+    print(f"Compaction : {len(all_author_data)} auteurs, {len(all_article_data)} articles, "
+          f"{len(all_journal_data)} journaux.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compaction du journal d'exploration en fichiers CSV.")
+    parser.add_argument('--journal', default=JOURNAL_PATH)
+    args = parser.parse_args()
+    compact(args.journal)
+
+
+if __name__ == "__main__":
+    main()
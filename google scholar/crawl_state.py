@@ -0,0 +1,164 @@
+import threading
+
+
+# Valeur absente : None, ou NaN pour les lignes relues depuis les CSV partiels
+def is_missing(value):
+    return value is None or value != value
+
+
+# Normalisation des clés de déduplication (noms d'auteurs, titres de sources)
+def normalize_key(value):
+    return ' '.join(str(value).lower().split())
+
+
+# État d'exploration indexé : toutes les vérifications "déjà fait ?" sont en O(1).
+# Index : nom recherché, ID d'auteur -> articles, titre de source normalisé -> ISSN,
+# ISSN -> journal. Les listes restent celles écrites par le journal d'exploration.
+class CrawlState:
+    def __init__(self, treated_authors=(), all_author_data=(), all_article_data=(), all_journal_data=(),
+                 searched=None):
+        self.treated_authors = set()
+        self.all_author_data = []
+        self.all_article_data = []
+        self.all_journal_data = []
+        self.articles_by_author = {}
+        # Articles déjà récupérés, par lien Scholar et par DOI
+        self.article_by_link = {}
+        self.article_by_doi = {}
+        # None : titre déjà recherché sans ISSN trouvé (pas de nouvelle requête pendant l'exécution)
+        self.issn_by_source = {}
+        self.journal_by_issn = {}
+        # Articles encore sans ISSN, par titre de source normalisé
+        self._waiting_issn = {}
+        self._lock = threading.RLock()
+        self.hits = {'author': 0, 'articles': 0, 'detail': 0, 'journal': 0}
+        self.misses = {'author': 0, 'articles': 0, 'detail': 0, 'journal': 0}
+
+        for name in treated_authors:
+            self.treated_authors.add(normalize_key(name))
+        self.all_author_data.extend(all_author_data)
+        for journal_data in all_journal_data:
+            self._add_journal_record(journal_data)
+        # Recherches déjà faites (crawl_journal.replay) : listes d'articles vides, titres sans ISSN
+        searched = searched or {}
+        for author_id in searched.get('articles', ()):
+            self.articles_by_author.setdefault(author_id, [])
+        for source_title, issn in searched.get('sources', {}).items():
+            if is_missing(issn):
+                self.issn_by_source.setdefault(normalize_key(source_title), None)
+            else:
+                self.issn_by_source[normalize_key(source_title)] = issn
+        for article in all_article_data:
+            self._add_article(article.get("ID de l'Auteur"), article)
+
+    def _count(self, kind, hit):
+        if hit:
+            self.hits[kind] += 1
+        else:
+            self.misses[kind] += 1
+        return hit
+
+    # Auteurs
+    def has_author(self, name):
+        with self._lock:
+            return self._count('author', normalize_key(name) in self.treated_authors)
+
+    def add_author(self, name, author_data):
+        with self._lock:
+            self.treated_authors.add(normalize_key(name))
+            self.all_author_data.append(author_data)
+
+    # Articles : un auteur est traité dès que sa liste a été récupérée, même vide
+    def has_articles(self, author_id):
+        with self._lock:
+            return self._count('articles', author_id in self.articles_by_author)
+
+    def add_articles(self, author_id, articles_data):
+        with self._lock:
+            self.articles_by_author.setdefault(author_id, [])
+            for article in articles_data:
+                article["ID de l'Auteur"] = author_id
+                self._add_article(author_id, article)
+
+    def _add_article(self, author_id, article):
+        if not is_missing(author_id):
+            self.articles_by_author.setdefault(author_id, []).append(article)
+        self.all_article_data.append(article)
+        if not is_missing(article.get('Lien')) and article.get('Lien'):
+            self.article_by_link.setdefault(article['Lien'], article)
+        if not is_missing(article.get('DOI')) and article.get('DOI'):
+            self.article_by_doi.setdefault(article['DOI'], article)
+        source_title = article.get('Titre de source')
+        if is_missing(source_title) or not source_title:
+            return
+        key = normalize_key(source_title)
+        if not is_missing(article.get('ISSN')):
+            if self.issn_by_source.get(key) is None:
+                self._resolve_source(key, article['ISSN'])
+        elif self.issn_by_source.get(key) is not None:
+            article['ISSN'] = self.issn_by_source[key]
+        else:
+            self._waiting_issn.setdefault(key, []).append(article)
+
+    # Associe un ISSN au titre de source et le reporte sur les articles qui l'attendaient
+    def _resolve_source(self, key, issn):
+        self.issn_by_source[key] = issn
+        for article in self._waiting_issn.pop(key, []):
+            article['ISSN'] = issn
+
+    # Article déjà enregistré pour ce lien Scholar (ou ce DOI), None sinon
+    def known_article(self, link=None, doi=None):
+        with self._lock:
+            article = self.article_by_link.get(link) or self.article_by_doi.get(doi)
+            self._count('detail', article is not None)
+            return article
+
+    # Journaux : True si le titre de source a déjà été recherché
+    def has_source(self, source_title):
+        with self._lock:
+            return self._count('journal', normalize_key(source_title) in self.issn_by_source)
+
+    def source_issn(self, source_title):
+        return self.issn_by_source.get(normalize_key(source_title))
+
+    # Titres de source encore à rechercher, dans l'ordre des articles
+    def pending_sources(self):
+        with self._lock:
+            titles = {}
+            for key, articles in self._waiting_issn.items():
+                if key not in self.issn_by_source:
+                    titles[key] = articles[0]['Titre de source']
+            return list(titles.values())
+
+    def _add_journal_record(self, journal_data):
+        issn = journal_data.get('ISSN')
+        if is_missing(issn) or issn in self.journal_by_issn:
+            return False
+        self.journal_by_issn[issn] = journal_data
+        self.all_journal_data.append(journal_data)
+        return True
+
+    # Enregistre le résultat d'une recherche de journal et complète l'ISSN des articles en attente ;
+    # retourne True si le journal est nouveau
+    def add_journal(self, source_title, journal_data):
+        issn = journal_data.get('ISSN') if journal_data else None
+        key = normalize_key(source_title)
+        with self._lock:
+            if is_missing(issn):
+                self.issn_by_source.setdefault(key, None)
+                return False
+            self._resolve_source(key, issn)
+            return self._add_journal_record(journal_data)
+
+    def stats(self):
+        report = {}
+        for kind in self.hits:
+            total = self.hits[kind] + self.misses[kind]
+            report[kind] = {'hits': self.hits[kind], 'misses': self.misses[kind],
+                            'hit_rate': round(self.hits[kind] / total, 3) if total else None}
+        return report
+
+    def print_stats(self):
+        for kind, values in self.stats().items():
+            print(f"{kind} : {values['hits']} déjà connus, {values['misses']} à récupérer "
+                  f"(taux de réussite {values['hit_rate']})")
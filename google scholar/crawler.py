@@ -0,0 +1,336 @@
+import time
+import queue
+import argparse
+import functools
+import itertools
+import threading
+
+# Import des modules existants
+from auteur_file import search_author, extract_author_info, load_authors_from_file
+from article_file import extract_articles_from_author
+from journal_file import search_journal_by_issn
+from main_func import make_driver, load_progress, clean_search_query
+from crawl_journal import CrawlJournal, compact
+from crawl_state import CrawlState, is_missing, normalize_key
+from http_fetcher import HttpFetcher, PageBlocked
+from page_cache import PageCache, CapturingDriver
+from rate_limit import get_limiter, Interrupted
+from journal_cache import get_journal_cache
+
+# Intervalle (secondes) entre deux écritures forcées du journal d'exploration
+SAVE_INTERVAL = 5.0
+# Numéros des navigateurs : chaque worker garde le même profil persistant d'une exécution à l'autre
+BROWSER_IDS = itertools.count(1)
+
+
+# File de tâches partagée et dédupliquée : une tâche (type, clé) n'est ajoutée qu'une fois
+class Frontier:
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._seen = set()
+        self._lock = threading.Lock()
+
+    def add(self, kind, key, depth=0):
+        if is_missing(key) or not key:
+            return False
+        seen_key = (kind, normalize_key(key))
+        with self._lock:
+            if seen_key in self._seen:
+                return False
+            self._seen.add(seen_key)
+        self._queue.put((kind, key, depth))
+        return True
+
+    def get(self, timeout):
+        return self._queue.get(timeout=timeout)
+
+    def task_done(self):
+        self._queue.task_done()
+
+    # Nombre de tâches ajoutées mais pas encore terminées
+    @property
+    def pending(self):
+        return self._queue.unfinished_tasks
+
+
+# Backend Selenium : un navigateur isolé par worker, parsing des modules existants
+class SeleniumBackend:
+    def __init__(self, page_cache=None, lean=True):
+        self.driver = make_driver(f"worker-{next(BROWSER_IDS)}", lean)
+        if page_cache is not None:
+            self.driver = CapturingDriver(self.driver, page_cache)
+        # Pages de détail des articles récupérées en HTTP, avec les cookies du navigateur
+        self.fetcher = HttpFetcher(page_cache=page_cache)
+
+    def author(self, name):
+        profile_link = search_author(clean_search_query(name), self.driver)
+        if profile_link:
+            return extract_author_info(profile_link, self.driver)
+        return None
+
+    def articles(self, author_id, known_article=None):
+        return extract_articles_from_author(author_id, self.driver, known_article, self.fetcher)
+
+    def journal(self, source_title):
+        return search_journal_by_issn(source_title, self.driver)
+
+    def close(self):
+        self.fetcher.close()
+        self.driver.quit()
+
+
+# Backend HTTP + lxml pour les pages statiques ; le navigateur (créé à la demande)
+# reste utilisé pour les listes d'articles ("Show more") et les pages bloquées
+class HttpBackend:
+    def __init__(self, save_dir=None, page_cache=None, lean=True):
+        self.fetcher = HttpFetcher(save_dir, page_cache=page_cache)
+        self.page_cache = page_cache
+        self.lean = lean
+        self._browser = None
+
+    @property
+    def browser(self):
+        if self._browser is None:
+            self._browser = SeleniumBackend(self.page_cache, self.lean)
+        return self._browser
+
+    def author(self, name):
+        try:
+            profile_link = self.fetcher.search_author(clean_search_query(name))
+            if not profile_link:
+                print("Profil de l'auteur non trouvé.")
+                return None
+            author_info = self.fetcher.author_info(profile_link)
+            if author_info is not None:
+                return author_info
+        except PageBlocked as e:
+            print(f"Page bloquée, passage par le navigateur : {e}")
+        return self.browser.author(name)
+
+    def articles(self, author_id, known_article=None):
+        return self.browser.articles(author_id, known_article)
+
+    def journal(self, source_title):
+        try:
+            return self.fetcher.journal(source_title)
+        except PageBlocked as e:
+            print(f"Page bloquée, passage par le navigateur : {e}")
+            return self.browser.journal(source_title)
+
+    def close(self):
+        self.fetcher.close()
+        if self._browser is not None:
+            self._browser.close()
+
+
+BACKENDS = {'http': HttpBackend, 'selenium': SeleniumBackend}
+
+
+# État d'un worker, consultable pendant l'exploration
+class WorkerState:
+    def __init__(self, name):
+        self.name = name
+        self.status = 'starting'
+        self.current = None
+        self.done = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+
+
+class Crawler:
+    def __init__(self, backend_factory=SeleniumBackend, n_workers=4, max_depth=2,
+                 limiter=None, save_interval=SAVE_INTERVAL, crawl_log=None):
+        self.backend_factory = backend_factory
+        self.n_workers = n_workers
+        self.max_depth = max_depth
+        # Chaque requête attend son jeton de domaine (rate_limit.py), tous workers confondus
+        self.limiter = limiter or get_limiter()
+        self.save_interval = save_interval
+        # Chaque résultat est ajouté une seule fois au journal (crawl_journal.py)
+        self.crawl_log = crawl_log
+        self.frontier = Frontier()
+        self.stop_event = threading.Event()
+        self.states = [WorkerState(f'worker-{i}') for i in range(n_workers)]
+        self.state = CrawlState()
+
+    # Reprise : les résultats déjà enregistrés ne sont pas redemandés
+    def resume(self, treated_authors, all_author_data, all_article_data, all_journal_data, searched=None):
+        self.state = CrawlState(treated_authors, all_author_data, all_article_data, all_journal_data, searched)
+        # Auteurs déjà extraits dont les articles manquent encore, puis titres sans ISSN
+        for author in self.state.all_author_data:
+            self.frontier.add('articles', author.get("ID de l'Auteur"))
+        for source_title in self.state.pending_sources():
+            self.frontier.add('journal', source_title)
+
+    def _record(self, kind, *args):
+        if self.crawl_log is not None:
+            getattr(self.crawl_log, kind)(*args)
+
+    def save(self):
+        if self.crawl_log is not None:
+            self.crawl_log.flush()
+
+    # Exécute une tâche et ajoute les tâches qui en découlent
+    def _handle(self, backend, kind, key, depth):
+        if kind == 'author':
+            author_data = backend.author(key)
+            if not author_data:
+                return
+            self.state.add_author(key, author_data)
+            self._record('author', key, author_data)
+            self.frontier.add('articles', author_data.get("ID de l'Auteur"))
+            if depth < self.max_depth and not is_missing(author_data.get('Co-auteurs')):
+                for co_author in author_data['Co-auteurs'].split("; "):
+                    self.frontier.add('author', co_author, depth + 1)
+
+        elif kind == 'articles':
+            articles_data = backend.articles(key, self.state.known_article) or []
+            self.state.add_articles(key, articles_data)
+            for article in articles_data:
+                self._record('article', article)
+            self._record('articles', key, len(articles_data))
+            for article in articles_data:
+                self.frontier.add('journal', article.get('Titre de source'))
+
+        elif kind == 'journal':
+            journal_data = backend.journal(key)
+            if self.state.add_journal(key, journal_data):
+                self._record('journal', journal_data)
+            # Recherche aboutie, même sans ISSN (None : erreur, le titre sera recherché à la reprise)
+            if journal_data is not None or self.state.source_issn(key) is not None:
+                self._record('issn', key, self.state.source_issn(key))
+
+    # Résultat déjà connu (reprise ou autre worker) : la tâche est ignorée sans attendre le domaine
+    def _known(self, kind, key):
+        if kind == 'author':
+            return self.state.has_author(key)
+        if kind == 'articles':
+            return self.state.has_articles(key)
+        return self.state.has_source(key)
+
+    def _worker(self, state):
+        backend = None
+        try:
+            backend = self.backend_factory()
+            while not self.stop_event.is_set():
+                state.status = 'idle'
+                state.current = None
+                try:
+                    kind, key, depth = self.frontier.get(timeout=0.2)
+                except queue.Empty:
+                    continue
+                try:
+                    if self._known(kind, key):
+                        continue
+                    state.status = 'busy'
+                    state.current = (kind, key)
+                    start = time.perf_counter()
+                    try:
+                        self._handle(backend, kind, key, depth)
+                        state.done += 1
+                    except Interrupted:
+                        pass
+                    except Exception as e:
+                        state.errors += 1
+                        print(f"[{state.name}] Erreur sur {kind} '{key}' : {e}")
+                    state.busy_seconds += time.perf_counter() - start
+                finally:
+                    self.frontier.task_done()
+        except Exception as e:
+            print(f"[{state.name}] Arrêt du worker : {e}")
+        finally:
+            state.status = 'stopped'
+            if backend is not None:
+                try:
+                    backend.close()
+                except Exception as e:
+                    print(f"[{state.name}] Erreur à la fermeture du navigateur : {e}")
+
+    def status(self):
+        return [{'worker': state.name, 'status': state.status, 'current': state.current,
+                 'done': state.done, 'errors': state.errors, 'busy_s': round(state.busy_seconds, 1)}
+                for state in self.states]
+
+    # Lance les workers et attend que la frontière soit vide (ou un Ctrl+C) ;
+    # les résultats sont enregistrés périodiquement puis à l'arrêt
+    def run(self, authors):
+        for author_name in authors:
+            self.frontier.add('author', author_name, 0)
+
+        threads = [threading.Thread(target=self._worker, args=(state,), name=state.name, daemon=True)
+                   for state in self.states]
+        for thread in threads:
+            thread.start()
+
+        self.limiter.resume()
+        start = time.perf_counter()
+        last_save = time.monotonic()
+        try:
+            while self.frontier.pending and any(thread.is_alive() for thread in threads):
+                time.sleep(0.1)
+                if self.save_interval and time.monotonic() - last_save >= self.save_interval:
+                    self.save()
+                    last_save = time.monotonic()
+        except KeyboardInterrupt:
+            print("Arrêt demandé : fin des tâches en cours...")
+        finally:
+            self.stop_event.set()
+            # Les attentes de jetons en cours sont interrompues
+            self.limiter.interrupt()
+            for thread in threads:
+                thread.join()
+            self.limiter.resume()
+            self.save()
+
+        elapsed = time.perf_counter() - start
+        done = sum(state.done for state in self.states)
+        print(f"{done} tâches en {elapsed:.1f} s ({done / elapsed if elapsed else 0:.2f} tâches/s) "
+              f"avec {self.n_workers} workers.")
+        self.state.print_stats()
+        self.limiter.print_stats()
+        print(f"Cache des journaux : {get_journal_cache().stats()}")
+        return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exploration concurrente de Google Scholar (auteurs, articles, journaux).")
+    parser.add_argument('--authors', default='authors.txt')
+    parser.add_argument('--workers', type=int, default=4, help="Nombre de navigateurs en parallèle")
+    parser.add_argument('--max-depth', type=int, default=2, help="Profondeur maximale des co-auteurs")
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default='http',
+                        help="http : pages statiques via HTTP + lxml, navigateur en secours ; selenium : navigateur seul")
+    parser.add_argument('--save-pages', default=None,
+                        help="Dossier où enregistrer les pages HTTP (fixtures pour parse_bench.py)")
+    parser.add_argument('--page-cache', default=None,
+                        help="Dossier du cache des pages brutes, rejouable hors ligne avec replay.py")
+    parser.add_argument('--browser', choices=['lean', 'default'], default='lean',
+                        help="lean : headless, ressources inutiles bloquées, profil persistant ; default : Chrome par défaut")
+    args = parser.parse_args()
+
+    authors = load_authors_from_file(args.authors)
+    if not authors:
+        print("No authors to process.")
+        return
+
+    page_cache = PageCache(args.page_cache) if args.page_cache else None
+    lean = args.browser == 'lean'
+    if args.backend == 'http':
+        backend_factory = functools.partial(HttpBackend, args.save_pages, page_cache, lean)
+    else:
+        backend_factory = functools.partial(SeleniumBackend, page_cache, lean)
+    treated_authors, all_author_data, all_article_data, all_journal_data, searched = load_progress()
+    crawl_log = CrawlJournal()
+    crawler = Crawler(backend_factory, args.workers, args.max_depth, crawl_log=crawl_log)
+    crawler.resume(treated_authors, all_author_data, all_article_data, all_journal_data, searched)
+    try:
+        crawler.run(authors)
+    finally:
+        crawl_log.close()
+    # Fichiers CSV finaux écrits une seule fois, à partir du journal
+    compact()
+    for state in crawler.status():
+        print(state)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+import os
+import time
+import shutil
+import tempfile
+from selenium import webdriver
+
+MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Profils persistants (cookies, session) : un dossier par navigateur, conservé entre les exécutions
+PROFILE_DIR = os.path.join(MODULE_DIR, 'browser_profiles')
+HEADLESS = True
+# 'eager' : la page est rendue à l'appelant dès que le DOM est prêt, sans attendre images et sous-ressources
+PAGE_LOAD_STRATEGY = 'eager'
+# Ressources bloquées (motifs d'URL du protocole DevTools). Les feuilles de style restent chargées :
+# sans elles, les éléments masqués apparaîtraient dans le .text de Selenium
+BLOCKED_URLS = [
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico',
+    '*.woff', '*.woff2', '*.ttf', '*.otf', '*.mp4', '*.webm',
+    '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*', '*googlesyndication.com*',
+]
+# Le navigateur est relancé (même profil) après MAX_PAGES pages ou au-delà de MAX_RSS_MB
+MAX_PAGES = 300
+MAX_RSS_MB = 1500
+
+
+# Mémoire résidente (Mo) du pilote et des processus du navigateur ; None sans psutil
+def browser_rss_mb(driver):
+    try:
+        import psutil
+    except ImportError:
+        return None
+    try:
+        process = psutil.Process(driver.service.process.pid)
+        processes = [process] + process.children(recursive=True)
+        return sum(p.memory_info().rss for p in processes) / 1024 ** 2
+    except (psutil.Error, AttributeError):
+        return None
+
+
+# Options Chromium communes à Chrome et Edge
+def browser_options(options, profile, lean, headless):
+    if lean:
+        options.page_load_strategy = PAGE_LOAD_STRATEGY
+        options.add_argument(f"--user-data-dir={profile}")
+        options.add_argument("--disable-extensions")
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        options.add_experimental_option('prefs', {'profile.managed_default_content_settings.images': 2})
+        if headless:
+            options.add_argument("--headless=new")
+            options.add_argument("--window-size=1366,900")
+    return options
+
+
+# Crée le pilote Selenium ; lean=False reproduit le navigateur par défaut (pour comparer)
+def create_driver(browser='chrome', driver_path=None, profile=None, lean=True, headless=HEADLESS):
+    if browser == 'edge':
+        from selenium.webdriver.edge.options import Options
+        from selenium.webdriver.edge.service import Service
+        options = browser_options(Options(), profile, lean, headless)
+        driver = webdriver.Edge(service=Service(executable_path=driver_path), options=options)
+    else:
+        from selenium.webdriver.chrome.options import Options
+        from selenium.webdriver.chrome.service import Service
+        options = browser_options(Options(), profile, lean, headless)
+        driver = webdriver.Chrome(service=Service(executable_path=driver_path), options=options)
+    if lean:
+        try:
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_URLS})
+        except Exception as e:
+            print(f"Blocage des ressources indisponible : {e}")
+    return driver
+
+
+# Navigateur géré : profil persistant, relance automatique (nombre de pages ou mémoire)
+# et statistiques (pages par minute, RSS). S'utilise comme un pilote Selenium.
+# Chrome refuse deux navigateurs sur le même profil : un nom par point d'entrée, ou temporary=True
+# pour une session jetable (profil propre au processus, supprimé à la fermeture)
+class ManagedDriver:
+    def __init__(self, name='main', browser='chrome', driver_path=None, lean=True, headless=HEADLESS,
+                 max_pages=MAX_PAGES, max_rss_mb=MAX_RSS_MB, profile_dir=PROFILE_DIR, temporary=False):
+        self.name = name
+        self.browser = browser
+        self.driver_path = driver_path
+        self.lean = lean
+        self.headless = headless
+        self.max_pages = max_pages
+        self.max_rss_mb = max_rss_mb
+        self.temporary = temporary
+        if temporary:
+            self.profile = tempfile.mkdtemp(prefix=f"{browser}-{name}-{os.getpid()}-")
+        else:
+            self.profile = os.path.join(profile_dir, f"{browser}-{name}")
+            os.makedirs(self.profile, exist_ok=True)
+        self.pages = 0
+        self.total_pages = 0
+        self.restarts = 0
+        self.peak_rss_mb = None
+        self.started = time.monotonic()
+        self._driver = self._create()
+
+    def _create(self):
+        return create_driver(self.browser, self.driver_path, self.profile, self.lean, self.headless)
+
+    def __getattr__(self, name):
+        return getattr(self._driver, name)
+
+    def rss_mb(self):
+        rss = browser_rss_mb(self._driver)
+        if rss is not None:
+            self.peak_rss_mb = max(self.peak_rss_mb or 0, rss)
+        return rss
+
+    # Relance entre deux pages, seulement quand un seul onglet est ouvert
+    def _recycle_if_needed(self):
+        reason = None
+        if self.max_pages and self.pages >= self.max_pages:
+            reason = f"{self.pages} pages"
+        elif self.max_rss_mb and self.pages and self.pages % 20 == 0:
+            rss = self.rss_mb()
+            if rss is not None and rss > self.max_rss_mb:
+                reason = f"{rss:.0f} Mo"
+        if reason is None or len(self._driver.window_handles) > 1:
+            return
+        print(f"[{self.name}] Relance du navigateur ({reason}).")
+        self._driver.quit()
+        self._driver = self._create()
+        self.pages = 0
+        self.restarts += 1
+
+    def get(self, url):
+        self._recycle_if_needed()
+        self._driver.get(url)
+        self.pages += 1
+        self.total_pages += 1
+
+    def stats(self):
+        minutes = (time.monotonic() - self.started) / 60
+        rss = self.rss_mb()
+        return {
+            'pages': self.total_pages,
+            'pages_per_min': round(self.total_pages / minutes, 1) if minutes else None,
+            'restarts': self.restarts,
+            'rss_mb': round(rss, 1) if rss is not None else None,
+            'peak_rss_mb': round(self.peak_rss_mb, 1) if self.peak_rss_mb is not None else None,
+        }
+
+    def quit(self):
+        print(f"[{self.name}] Navigateur : {self.stats()}")
+        self._driver.quit()
+        if self.temporary:
+            shutil.rmtree(self.profile, ignore_errors=True)
@@ -0,0 +1,274 @@
+import os
+import time
+import hashlib
+from urllib.parse import urljoin, urlparse, parse_qs, quote_plus
+
+import requests
+from requests.adapters import HTTPAdapter
+from lxml import html as lxml_html
+
+from rate_limit import get_limiter, looks_blocked
+from journal_cache import EMPTY_JOURNAL, cached_journal
+from scimago_import import offline_journal
+
+SCHOLAR_URL = "https://scholar.google.com"
+SCIMAGO_URL = "https://www.scimagojr.com"
+
+HEADERS = {
+    'User-Agent': "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                  "(KHTML, like Gecko) Chrome/120.0 Safari/537.36",
+    'Accept-Language': "en-US,en;q=0.9",
+}
+TIMEOUT = 20
+POOL_SIZE = 8
+
+
+# Page bloquée (CAPTCHA, 429...) : l'appelant repasse par le navigateur
+class PageBlocked(Exception):
+    pass
+
+
+# Texte d'un élément tel que l'afficherait Selenium (espaces normalisés)
+def element_text(element):
+    return ' '.join(element.text_content().split())
+
+
+# Texte du premier élément trouvé ; les XPath sont essayés dans l'ordre
+def xpath_text(tree, *paths):
+    for path in paths:
+        found = tree.xpath(path)
+        if found:
+            return element_text(found[0])
+    return None
+
+
+def is_blocked(status_code, page):
+    return status_code in (403, 429, 503) or looks_blocked(page)
+
+
+# Lien vers le profil du premier auteur dans les résultats de recherche Scholar
+def parse_author_search(page, base_url=SCHOLAR_URL):
+    links = lxml_html.fromstring(page).xpath("//h4/a[contains(@href, '/citations?user=')]/@href")
+    return urljoin(base_url, links[0]) if links else None
+
+
+# Mêmes champs que extract_author_info ; retourne aussi True si la liste complète
+# des co-auteurs n'est pas dans la page (bouton "Voir tout")
+def parse_author_profile(page, profile_link):
+    tree = lxml_html.fromstring(page)
+    author_info = {}
+    author_info['ID de l\'Auteur'] = parse_qs(urlparse(profile_link).query).get('user', [None])[0]
+    author_info['Nom Complet'] = xpath_text(tree, "//*[@id='gsc_prf_in']")
+    author_info['Pays d\'Affiliation'] = xpath_text(tree, "//*[contains(concat(' ', @class, ' '), ' gsc_prf_ila ')]")
+
+    metrics = [element_text(element) for element in
+               tree.xpath("//*[contains(concat(' ', @class, ' '), ' gsc_rsb_std ')]")]
+    author_info['Citations Totales'] = metrics[0] if len(metrics) >= 4 else None
+    author_info['H-index'] = metrics[2] if len(metrics) >= 4 else None
+    # FWCI n'est pas disponible sur Google Scholar
+    author_info['FWCI'] = 'N/A'
+
+    co_authors = [element_text(element) for element in tree.xpath("//span[@class='gsc_rsb_a_desc']/a")]
+    author_info['Co-auteurs'] = "; ".join(co_authors) if co_authors else None
+    needs_full_list = bool(tree.xpath('//button[@id="gsc_coauth_opn"]'))
+    return author_info, needs_full_list
+
+
+# Liste complète des co-auteurs (page statique équivalente à la fenêtre "Voir tout")
+def parse_colleagues(page):
+    names = [element_text(element) for element in
+             lxml_html.fromstring(page).xpath("//h3[@class='gs_ai_name']/a")]
+    return "; ".join(names) if names else None
+
+
+# Lignes de la liste d'articles d'un profil (celles chargées dans la page)
+def parse_article_rows(page, base_url=SCHOLAR_URL):
+    rows = []
+    for row in lxml_html.fromstring(page).xpath("//tr[contains(concat(' ', @class, ' '), ' gsc_a_tr ')]"):
+        links = row.xpath(".//a[contains(concat(' ', @class, ' '), ' gsc_a_at ')]")
+        rows.append({
+            'title': element_text(links[0]) if links else None,
+            'link': urljoin(base_url, links[0].get('href')) if links and links[0].get('href') else "",
+            'citations': xpath_text(row, ".//*[contains(concat(' ', @class, ' '), ' gsc_a_ac ')]"),
+            'year': xpath_text(row, ".//*[contains(concat(' ', @class, ' '), ' gsc_a_h ')"
+                                    " and contains(concat(' ', @class, ' '), ' gsc_a_hc ')]"),
+        })
+    return rows
+
+
+# Type de document d'après la première ligne du tableau (mêmes règles que access_article_page)
+def document_type(venue_text):
+    venue_text = venue_text.lower()
+    if 'conference' in venue_text or 'proceedings' in venue_text:
+        return 'Conference'
+    if 'journal' in venue_text:
+        return 'Article'
+    if 'book' in venue_text:
+        return 'Book'
+    return 'Other'
+
+
+# Mêmes champs que access_article_page (article_file.py)
+def parse_article_page(page):
+    tree = lxml_html.fromstring(page)
+    links = tree.xpath("//*[contains(concat(' ', @class, ' '), ' gsc_oci_title_link ')]")
+    venue = tree.xpath('//*[@id="gsc_oci_table"]/div[3]/div[1]')
+    return {
+        "Titre de l'article": element_text(links[0]) if links else None,
+        "Auteurs": xpath_text(tree, "//div[@class='gsc_oci_value']"),
+        "Titre de source": xpath_text(tree, '//*[@id="gsc_oci_table"]/div[3]/div[2]'),
+        "Résumé": xpath_text(tree, '//*[@id="gsc_oci_descr"]/div'),
+        "DOI": links[0].get('href') if links else None,
+        "Mots-clés": None,
+        "Type de document": document_type(element_text(venue[0])) if venue else None,
+    }
+
+
+# Article d'une liste d'auteur : ligne de la liste complétée par sa page de détail (dict vide si
+# absente). Partagé par l'exploration (article_file.py) et le rejeu hors ligne (replay.py)
+def article_record(row, detail):
+    return {
+        "Titre de l'article": detail.get("Titre de l'article") or row['title'],
+        "Auteurs": detail.get("Auteurs"),
+        "Année de publication": row['year'],
+        "Titre de source": detail.get("Titre de source"),
+        "Nombre de citations": row['citations'],
+        "Résumé": detail.get("Résumé"),
+        "DOI": detail.get("DOI"),
+        "Mots-clés": detail.get("Mots-clés"),
+        "Type de document": detail.get("Type de document"),
+        "Lien": row['link'],
+    }
+
+
+# Lien du journal dans les résultats Scimago : titre exact, sinon premier résultat
+def parse_journal_search(page, source_title, base_url=SCIMAGO_URL):
+    if "Sorry, no results were found." in page:
+        return None
+    tree = lxml_html.fromstring(page)
+    links = tree.xpath("//div[@class='search_results']/a[@href]")
+    for link in links:
+        names = link.xpath(".//*[contains(concat(' ', @class, ' '), ' jrnlname ')]")
+        if names and element_text(names[0]) == source_title:
+            return urljoin(base_url + '/', link.get('href'))
+    return urljoin(base_url + '/', links[0].get('href')) if links else None
+
+
+# Mêmes champs que extract_journal_info (journal_file.py)
+def parse_journal_page(page):
+    tree = lxml_html.fromstring(page)
+    journal_info = {}
+    journal_info['Nom'] = xpath_text(tree, "//h1")
+    journal_info['Editeur'] = xpath_text(tree, "//div[h2[text()='Publisher']]/p/a")
+    journal_info['ISSN'] = xpath_text(tree, "//div[h2[text()='ISSN']]/p")
+    journal_info['Index'] = xpath_text(tree, "//div[h2[text()='Coverage']]/p")
+    journal_info['H-index'] = xpath_text(tree, "//div[h2[text()='H-Index']]/p")
+
+    # Le navigateur ajoute tbody aux tableaux ; le HTML brut n'en contient pas toujours,
+    # d'où "//tr" (les lignes d'en-tête n'ont pas de td)
+    for field, position in (('Quartile', 1), ('SJR', 2), ('Impact factor', 4)):
+        journal_info[field] = xpath_text(tree, f"(//div[@class='cellcontent']//table//tr[last()]/td[3])[{position}]")
+
+    # Portée thématique : le texte du bloc sans son titre
+    scope = tree.xpath("//*[contains(concat(' ', @class, ' '), ' fullwidth ')]")
+    if scope:
+        text = element_text(scope[0])
+        headings = scope[0].xpath("./h1|./h2|./h3")
+        if headings and text.startswith(element_text(headings[0])):
+            text = text[len(element_text(headings[0])):]
+        journal_info['Portee thematique'] = text.strip()
+    else:
+        journal_info['Portee thematique'] = None
+    return journal_info
+
+
+# Récupération HTTP avec connexions persistantes ; une instance par worker
+class HttpFetcher:
+    def __init__(self, save_dir=None, timeout=TIMEOUT, pool_size=POOL_SIZE, page_cache=None, limiter=None):
+        self.session = requests.Session()
+        self.session.headers.update(HEADERS)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.timeout = timeout
+        self.save_dir = save_dir
+        # Pages brutes conservées pour le rejeu hors ligne (page_cache.py)
+        self.page_cache = page_cache
+        # Débit par domaine partagé avec les autres workers (rate_limit.py)
+        self.limiter = limiter or get_limiter()
+        # Durées de parsing par type de page (ms)
+        self.parse_ms = {}
+
+    def get(self, url, kind):
+        self.limiter.wait(url)
+        try:
+            response = self.session.get(url, timeout=self.timeout)
+            page = response.text
+            if is_blocked(response.status_code, page):
+                self.limiter.blocked(url)
+                raise PageBlocked(f"{url} ({response.status_code})")
+            response.raise_for_status()
+        except requests.RequestException:
+            self.limiter.error(url)
+            raise
+        self.limiter.success(url)
+        if self.page_cache is not None:
+            self.page_cache.put(response.url, page)
+        if self.save_dir:
+            # Pages conservées comme fixtures pour parse_bench.py
+            os.makedirs(self.save_dir, exist_ok=True)
+            name = f"{kind}_{hashlib.sha1(url.encode()).hexdigest()[:12]}.html"
+            with open(os.path.join(self.save_dir, name), 'w', encoding='utf-8') as f:
+                f.write(f"<!-- {url} -->\n{page}")
+        return page
+
+    def _parse(self, kind, parser, *args):
+        start = time.perf_counter()
+        result = parser(*args)
+        self.parse_ms.setdefault(kind, []).append((time.perf_counter() - start) * 1000)
+        return result
+
+    def search_author(self, author_name):
+        page = self.get(f"{SCHOLAR_URL}/scholar?hl=en&q={quote_plus(author_name)}", 'search')
+        return self._parse('search', parse_author_search, page)
+
+    # Retourne None si la liste des co-auteurs nécessite le navigateur et n'a pas pu être lue
+    def author_info(self, profile_link):
+        page = self.get(profile_link, 'author')
+        author_info, needs_full_list = self._parse('author', parse_author_profile, page, profile_link)
+        if needs_full_list:
+            author_id = author_info['ID de l\'Auteur']
+            colleagues = self.get(f"{SCHOLAR_URL}/citations?view_op=list_colleagues&hl=en&user={author_id}",
+                                  'colleagues')
+            co_authors = self._parse('colleagues', parse_colleagues, colleagues)
+            if co_authors is None:
+                return None
+            author_info['Co-auteurs'] = co_authors
+        return author_info
+
+    # Page de détail d'un article (mêmes champs que access_article_page)
+    def article(self, article_link):
+        return self._parse('article', parse_article_page, self.get(article_link, 'article'))
+
+    # Reprend les cookies du navigateur (session Scholar déjà ouverte)
+    def copy_cookies(self, driver):
+        for cookie in driver.get_cookies():
+            self.session.cookies.set(cookie['name'], cookie['value'], domain=cookie.get('domain'))
+
+    # Même comportement que search_journal_by_issn (cache des journaux compris)
+    def journal(self, source_title):
+        return cached_journal(source_title, lambda title: offline_journal(title) or self._search_journal(title))
+
+    def _search_journal(self, source_title):
+        if source_title is None:
+            print("Error: source_title is None.")
+            return dict(EMPTY_JOURNAL)
+        page = self.get(f"{SCIMAGO_URL}/journalsearch.php?q={quote_plus(source_title)}", 'journal_search')
+        link = self._parse('journal_search', parse_journal_search, page, source_title)
+        if link is None:
+            print(f"No results found for {source_title}.")
+            return dict(EMPTY_JOURNAL)
+        return self._parse('journal', parse_journal_page, self.get(link, 'journal'))
+
+    def close(self):
+        self.session.close()
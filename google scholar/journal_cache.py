@@ -0,0 +1,224 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import argparse
+import threading
+
+# Base partagée par les trois scrapers (Google Scholar, Scopus, Web of Science), à côté de ce module
+CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'journal_cache.sqlite')
+# Les valeurs SJR et les quartiles changent chaque année
+TTL_SECONDS = 180 * 24 * 3600
+# Titres ou ISSN sans résultat : nouvelle recherche après ce délai
+NEGATIVE_TTL_SECONDS = 30 * 24 * 3600
+# Format des fiches : 'scholar' (journal_file.py, http_fetcher.py), 'metrics' (notebooks Scopus et WoS)
+DEFAULT_KIND = 'scholar'
+
+EMPTY_JOURNAL = {
+    'Nom': None, 'Editeur': None, 'ISSN': None, 'Index': None, 'H-index': None,
+    'Quartile': None, 'SJR': None, 'Impact factor': None, 'Portee thematique': None
+}
+
+ISSN_RE = re.compile(r'\b(\d{4})-?(\d{3}[\dXx])\b')
+
+
+# ISSN normalisés (8 caractères sans tiret) ; Scimago en donne parfois plusieurs ("15729974, 00978493")
+def normalize_issns(value):
+    if value is None or value != value:
+        return []
+    return [(first + last).upper() for first, last in ISSN_RE.findall(str(value))]
+
+
+def normalize_title(title):
+    return ' '.join(str(title).lower().split())
+
+
+def _known(value):
+    return None if value in (None, '', 'N/A') else value
+
+
+# Fiche des notebooks Scopus et WoS au format de Google Scholar
+def metrics_to_scholar(record):
+    quartile = record.get('quartile')
+    if isinstance(quartile, dict):
+        quartile = quartile.get('quartile_value')
+    return dict(EMPTY_JOURNAL, **{
+        'Nom': _known(record.get('name')),
+        'ISSN': _known(record.get('issn')),
+        'H-index': _known(record.get('h_index')),
+        'Quartile': _known(quartile),
+        'SJR': _known((record.get('sjr') or {}).get('sjr_value')),
+        'Impact factor': _known((record.get('impact_factor') or {}).get('impact_factor_value')),
+        'Portee thematique': _known(record.get('scope')),
+    })
+
+
+# Fiche de Google Scholar au format des notebooks ; Scholar ne relève pas l'année des métriques
+def scholar_to_metrics(record):
+    quartile = _known(record.get('Quartile'))
+    return {
+        'issn': record.get('ISSN'),
+        'name': record.get('Nom') or 'N/A',
+        'scope': record.get('Portee thematique') or 'N/A',
+        'h_index': record.get('H-index') or 'N/A',
+        'quartile': {'year': 'N/A', 'quartile_value': quartile} if quartile else 'N/A',
+        'sjr': {'sjr_value': record.get('SJR') or 'N/A', 'year': 'N/A'},
+        'impact_factor': {'impact_factor_value': record.get('Impact factor') or 'N/A', 'year': 'N/A'},
+    }
+
+
+# Conversions (format enregistré, format demandé) : une fiche écrite par un scraper répond aux autres
+CONVERTERS = {
+    ('metrics', 'scholar'): metrics_to_scholar,
+    ('scholar', 'metrics'): scholar_to_metrics,
+}
+
+
+# Cache des fiches de journaux : une entrée par ISSN et par format, et un index des titres de source
+# normalisés vers l'ISSN (NULL : recherche sans résultat). Une fiche absente dans le format demandé
+# est reconstruite à partir de celle d'un autre format pour le même ISSN
+class JournalCache:
+    def __init__(self, path=CACHE_PATH, ttl=TTL_SECONDS, negative_ttl=NEGATIVE_TTL_SECONDS):
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("CREATE TABLE IF NOT EXISTS journals "
+                       "(issn TEXT, kind TEXT, data TEXT, fetched REAL, PRIMARY KEY (issn, kind))")
+            db.execute("CREATE TABLE IF NOT EXISTS aliases (title TEXT PRIMARY KEY, issn TEXT, fetched REAL)")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _count(self, hit, data=None):
+        with self._lock:
+            if not hit:
+                self.misses += 1
+            elif data is None:
+                self.negative_hits += 1
+            else:
+                self.hits += 1
+
+    def _fresh(self, data, fetched, now):
+        return now - fetched <= (self.ttl if data is not None else self.negative_ttl)
+
+    # Recherche par titre de source ou par ISSN ; retourne (trouvé, fiche).
+    # (True, None) : résultat négatif encore valide, inutile de relancer la recherche
+    def get(self, source_title=None, issn=None, kind=DEFAULT_KIND):
+        now = time.time()
+        with self._connect() as db:
+            issns = normalize_issns(issn)
+            if not issns and source_title:
+                row = db.execute("SELECT issn, fetched FROM aliases WHERE title = ?",
+                                 (normalize_title(source_title),)).fetchone()
+                if row is not None and row[0] is None and now - row[1] <= self.negative_ttl:
+                    self._count(True)
+                    return True, None
+                issns = [row[0]] if row is not None and row[0] is not None else []
+            for key in issns:
+                rows = {row[0]: row[1:] for row in db.execute(
+                    "SELECT kind, data, fetched FROM journals WHERE issn = ?", (key,))}
+                if kind in rows and self._fresh(rows[kind][0], rows[kind][1], now):
+                    data = json.loads(rows[kind][0]) if rows[kind][0] is not None else None
+                    self._count(True, data)
+                    return True, data
+                # Les résultats négatifs d'un autre format ne valent pas pour celui-ci
+                for other, (data, fetched) in rows.items():
+                    if (other, kind) in CONVERTERS and data is not None and self._fresh(data, fetched, now):
+                        data = CONVERTERS[(other, kind)](json.loads(data))
+                        self._count(True, data)
+                        return True, data
+        self._count(False)
+        return False, None
+
+    # Enregistre une fiche (None ou sans ISSN : résultat négatif pour le titre ou l'ISSN demandé)
+    def put(self, journal_data, source_title=None, issn=None, kind=DEFAULT_KIND):
+        now = time.time()
+        record_issns = normalize_issns(journal_data.get('ISSN') or journal_data.get('issn')) if journal_data else []
+        issns = normalize_issns(issn) + [key for key in record_issns if key not in normalize_issns(issn)]
+        with self._connect() as db:
+            if not record_issns:
+                for key in normalize_issns(issn):
+                    db.execute("INSERT OR REPLACE INTO journals VALUES (?, ?, NULL, ?)", (key, kind, now))
+                if source_title:
+                    db.execute("INSERT OR REPLACE INTO aliases VALUES (?, NULL, ?)", (normalize_title(source_title), now))
+                return
+            data = json.dumps(journal_data, ensure_ascii=False, default=str)
+            for key in issns:
+                db.execute("INSERT OR REPLACE INTO journals VALUES (?, ?, ?, ?)", (key, kind, data, now))
+            if source_title:
+                db.execute("INSERT OR REPLACE INTO aliases VALUES (?, ?, ?)", (normalize_title(source_title), issns[0], now))
+
+    # Supprime les entrées expirées
+    def purge(self):
+        now = time.time()
+        with self._connect() as db:
+            removed = db.execute("DELETE FROM journals WHERE (data IS NOT NULL AND fetched < ?) "
+                                 "OR (data IS NULL AND fetched < ?)",
+                                 (now - self.ttl, now - self.negative_ttl)).rowcount
+            removed += db.execute("DELETE FROM aliases WHERE (issn IS NOT NULL AND fetched < ?) "
+                                  "OR (issn IS NULL AND fetched < ?)",
+                                  (now - self.ttl, now - self.negative_ttl)).rowcount
+        return removed
+
+    def stats(self):
+        with self._connect() as db:
+            journals = db.execute("SELECT COUNT(*) FROM journals WHERE data IS NOT NULL").fetchone()[0]
+            aliases = db.execute("SELECT COUNT(*) FROM aliases").fetchone()[0]
+        total = self.hits + self.negative_hits + self.misses
+        return {
+            'hits': self.hits,
+            'negative_hits': self.negative_hits,
+            'misses': self.misses,
+            'hit_rate': round((self.hits + self.negative_hits) / total, 3) if total else None,
+            'journals': journals,
+            'titles': aliases,
+        }
+
+
+# Recherche d'un journal par titre de source en passant par le cache ;
+# fetch(source_title) n'est appelé qu'en cas d'absence (None = erreur, non mise en cache)
+def cached_journal(source_title, fetch, journal_cache=None):
+    journal_cache = journal_cache or get_journal_cache()
+    found, journal_data = journal_cache.get(source_title)
+    if found:
+        return journal_data if journal_data is not None else dict(EMPTY_JOURNAL)
+    journal_data = fetch(source_title)
+    if journal_data is not None:
+        journal_cache.put(journal_data, source_title)
+    return journal_data
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+# Cache unique du processus
+def get_journal_cache():
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = JournalCache()
+    return _cache
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cache local des fiches de journaux : statistiques et purge.")
+    parser.add_argument('--path', default=CACHE_PATH)
+    parser.add_argument('--purge', action='store_true', help="Supprime les entrées expirées")
+    args = parser.parse_args()
+
+    journal_cache = JournalCache(args.path)
+    if args.purge:
+        print(f"{journal_cache.purge()} entrées expirées supprimées.")
+    print(journal_cache.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -2,14 +2,23 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import NoSuchElementException, TimeoutException
-import time
-import random
 import csv
+from rate_limit import get_limiter, page_ready, polite_get
+from journal_cache import cached_journal
+from scimago_import import offline_journal
 
+SCIMAGO_URL = "https://www.scimagojr.com"
 
-# Function to search for a journal by ISSN on SJR
+
+# Function to search for a journal by ISSN on SJR, through the local journal cache
+# and the imported Scimago export; the browser is only used for titles missing from both
 def search_journal_by_issn(source_title, driver):
-    driver.get("https://www.scimagojr.com")
+    return cached_journal(source_title, lambda title: offline_journal(title) or search_scimago(title, driver))
+
+
+# Browser search on Scimago (cache misses only)
+def search_scimago(source_title, driver):
+    polite_get(driver, SCIMAGO_URL)
 
     # Check if source_title is None and handle it
     if source_title is None:
@@ -26,8 +35,11 @@ def search_journal_by_issn(source_title, driver):
         )
         search_box.clear()
         search_box.send_keys(source_title)
+        get_limiter().wait(SCIMAGO_URL)
         search_box.submit()
-        time.sleep(random.uniform(5, 15))
+        # Wait until the results page replaces the home page
+        WebDriverWait(driver, 10).until(EC.staleness_of(search_box))
+        page_ready(driver)
 
         # Check for "no results" message on the page
         no_results_message = "Sorry, no results were found."
@@ -43,84 +55,86 @@ def search_journal_by_issn(source_title, driver):
         links = driver.find_elements(By.XPATH, "//div[@class='search_results']/a[@href]")
         jrl_names = driver.find_elements(By.CLASS_NAME, 'jrnlname')
 
-        # Check if any of the results match the exact journal title
-        exact_match_found = False
+        # Check if any of the results match the exact journal title,
+        # otherwise use the first search result
+        journal_link = links[0]
         for i, name in enumerate(jrl_names):
             if name.text == source_title:
-                links[i].click()  # Click on the exact matching link
-                exact_match_found = True
-                time.sleep(random.uniform(5, 10))
+                journal_link = links[i]
                 break
-        
-        if not exact_match_found:
-            # Click on the first search result if no exact match was found
-            journal_link = driver.find_element(By.XPATH, "//div[@class='search_results']/a[@href]")
-            journal_link.click()
-            time.sleep(random.uniform(5, 15))
-
-        # Extract journal information
-        journal_info = {}
-
-        # Journal name
-        journal_info['Nom'] = driver.find_element(By.XPATH, "//h1").text
-        
-        # Publisher
-        try:
-            journal_info['Editeur'] = driver.find_element(By.XPATH, "//div[h2[text()='Publisher']]/p/a").text
-        except NoSuchElementException:
-            journal_info['Editeur'] = None
-
-        # ISSN
-        try:
-            issn_element = WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.XPATH, "//div[h2[text()='ISSN']]/p"))
-            )
-            journal_info['ISSN'] = issn_element.text
-        except (NoSuchElementException, TimeoutException):
-            journal_info['ISSN'] = None
-        
-        # Indexing
-        try:
-            journal_info['Index'] = driver.find_element(By.XPATH, "//div[h2[text()='Coverage']]/p").text
-        except NoSuchElementException:
-            journal_info['Index'] = None
-        
-        # H-index
-        try:
-            journal_info['H-index'] = driver.find_element(By.XPATH, "//div[h2[text()='H-Index']]/p").text
-        except NoSuchElementException:
-            journal_info['H-index'] = None
-        
-        # Quartile
-        try:
-            journal_info['Quartile'] = driver.find_element(By.XPATH, "(//div[@class='cellcontent']//table/tbody/tr[last()]/td[3])[1]").text
-        except NoSuchElementException:
-            journal_info['Quartile'] = None
-        
-        # SJR Score
-        try:
-            journal_info['SJR'] = driver.find_element(By.XPATH, "(//div[@class='cellcontent']//table/tbody/tr[last()]/td[3])[2]").text
-        except NoSuchElementException:
-            journal_info['SJR'] = None
-
-        # Impact factor (sometimes available)
-        try:
-            journal_info['Impact factor'] = driver.find_element(By.XPATH, "(//div[@class='cellcontent']//table/tbody/tr[last()]/td[3])[4]").text
-        except NoSuchElementException:
-            journal_info['Impact factor'] = None
-        
-        # Thematic scope
-        try:
-            journal_info['Portee thematique'] = driver.find_element(By.CLASS_NAME, 'fullwidth').text.split('\n', 1)[-1].strip()
-        except NoSuchElementException:
-            journal_info['Portee thematique'] = None
-        
-        return journal_info
+
+        get_limiter().wait(SCIMAGO_URL)
+        journal_link.click()
+        WebDriverWait(driver, 10).until(EC.staleness_of(journal_link))
+        page_ready(driver)
+
+        return extract_journal_info(driver)
     
     except Exception as e:
         print(f"An error occurred while searching for journal {source_title}: {e}")
         return None
 
+
+# Extrait les informations d'une page de journal Scimago déjà ouverte
+def extract_journal_info(driver):
+    journal_info = {}
+
+    # Journal name
+    journal_info['Nom'] = driver.find_element(By.XPATH, "//h1").text
+    
+    # Publisher
+    try:
+        journal_info['Editeur'] = driver.find_element(By.XPATH, "//div[h2[text()='Publisher']]/p/a").text
+    except NoSuchElementException:
+        journal_info['Editeur'] = None
+
+    # ISSN
+    try:
+        issn_element = WebDriverWait(driver, 10).until(
+            EC.presence_of_element_located((By.XPATH, "//div[h2[text()='ISSN']]/p"))
+        )
+        journal_info['ISSN'] = issn_element.text
+    except (NoSuchElementException, TimeoutException):
+        journal_info['ISSN'] = None
+    
+    # Indexing
+    try:
+        journal_info['Index'] = driver.find_element(By.XPATH, "//div[h2[text()='Coverage']]/p").text
+    except NoSuchElementException:
+        journal_info['Index'] = None
+    
+    # H-index
+    try:
+        journal_info['H-index'] = driver.find_element(By.XPATH, "//div[h2[text()='H-Index']]/p").text
+    except NoSuchElementException:
+        journal_info['H-index'] = None
+    
+    # Quartile
+    try:
+        journal_info['Quartile'] = driver.find_element(By.XPATH, "(//div[@class='cellcontent']//table/tbody/tr[last()]/td[3])[1]").text
+    except NoSuchElementException:
+        journal_info['Quartile'] = None
+    
+    # SJR Score
+    try:
+        journal_info['SJR'] = driver.find_element(By.XPATH, "(//div[@class='cellcontent']//table/tbody/tr[last()]/td[3])[2]").text
+    except NoSuchElementException:
+        journal_info['SJR'] = None
+
+    # Impact factor (sometimes available)
+    try:
+        journal_info['Impact factor'] = driver.find_element(By.XPATH, "(//div[@class='cellcontent']//table/tbody/tr[last()]/td[3])[4]").text
+    except NoSuchElementException:
+        journal_info['Impact factor'] = None
+    
+    # Thematic scope
+    try:
+        journal_info['Portee thematique'] = driver.find_element(By.CLASS_NAME, 'fullwidth').text.split('\n', 1)[-1].strip()
+    except NoSuchElementException:
+        journal_info['Portee thematique'] = None
+    
+    return journal_info
+
 def load_from_csv(filename):
     """
     Load data from a CSV file and return it as a list of dictionaries.
@@ -1,59 +1,49 @@
-import time
-import random
-import os
-import pickle
-import pandas as pd
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import WebDriverException
 
 # Import des modules existants
 from auteur_file import search_author, extract_author_info, load_authors_from_file
 from article_file import extract_articles_from_author
 from journal_file import search_journal_by_issn
+from crawl_journal import CrawlJournal, load_state, compact
+from crawl_state import CrawlState
+from rate_limit import get_limiter, looks_blocked
+from journal_cache import get_journal_cache
+from driver_factory import ManagedDriver
 
 # Configuration du WebDriver
-chrome_options = Options()
 chromedriver_path = "C:\\chromedriver.exe"
-service = Service(executable_path=chromedriver_path)
-driver = webdriver.Chrome(service=service, options=chrome_options)
 
-# Chargement des données
-def load_progress():
-    if os.path.exists("treated_authors.pkl"):
-        with open("treated_authors.pkl", "rb") as file:
-            treated_authors = pickle.load(file)
-    else:
-        treated_authors = set()
-
-    all_author_data = pd.read_csv('partial_auteur_info.csv').to_dict(orient="records") if os.path.exists('partial_auteur_info.csv') else []
-    all_article_data = pd.read_csv('partial_article_info.csv').to_dict(orient="records") if os.path.exists('partial_article_info.csv') else []
-    all_journal_data = pd.read_csv('partial_journal_info.csv').to_dict(orient="records") if os.path.exists('partial_journal_info.csv') else []
+# Crée un navigateur Chrome (un par processus, ou un par worker dans crawler.py) ; name désigne
+# le profil persistant, propre à chaque point d'entrée ; temporary=True : profil jetable.
+# lean=False : navigateur par défaut, visible et sans blocage des ressources (comparaison)
+def make_driver(name='main', lean=True, temporary=False):
+    return ManagedDriver(name, driver_path=chromedriver_path, lean=lean, headless=lean, temporary=temporary)
 
-    existing_issns = set(journal.get('ISSN') for journal in all_journal_data if 'ISSN' in journal)
+driver = None
+# Journal d'exploration en ajout seul (crawl_journal.py)
+crawl_log = None
+# État indexé de l'exploration (crawl_state.py)
+state = None
 
-    return treated_authors, all_author_data, all_article_data, all_journal_data, existing_issns
+# Chargement des données : relecture du journal d'exploration
+def load_progress():
+    return load_state()
 
+# Les enregistrements sont déjà dans le journal : on force seulement l'écriture sur disque
 def save_progress():
-    with open("treated_authors.pkl", "wb") as file:
-        pickle.dump(treated_authors, file)
-    pd.DataFrame(all_author_data).to_csv('partial_auteur_info.csv', index=False)
-    pd.DataFrame(all_article_data).to_csv('partial_article_info.csv', index=False)
-    pd.DataFrame(all_journal_data).to_csv('partial_journal_info.csv', index=False)
-    print("Progress saved to partial files.")
+    crawl_log.flush()
 
 # Nettoyage des requêtes pour Google
 def clean_search_query(query):
     query = query.replace(" in ", " \"in\" ")  # Gestion spécifique des mots-clés
     return f'"{query.strip()}"'
 
-# Détection et gestion des blocages
+# Détection des blocages : le domaine est ralenti et mis en pause par le limiteur partagé
 def detect_and_handle_blocking():
     try:
-        if "captcha" in driver.page_source.lower():
-            print("CAPTCHA detected! Pausing for a longer time.")
-            time.sleep(random.uniform(60, 120))
+        if looks_blocked(driver.page_source):
+            print("CAPTCHA detected! Slowing down this domain.")
+            get_limiter().blocked(driver.current_url)
     except WebDriverException as e:
         print(f"Webdriver issue: {e}")
 
@@ -64,7 +54,7 @@ def extract_author_and_coauthors(author_name, depth=0, max_depth=2):
     
     print(f"Processing author (level {depth}): {author_name}")
     
-    if author_name in treated_authors:
+    if state.has_author(author_name):
         print(f"Author {author_name} already processed, skipping.")
         return
 
@@ -72,8 +62,8 @@ def extract_author_and_coauthors(author_name, depth=0, max_depth=2):
     if profile_link:
         author_data = extract_author_info(profile_link, driver)
         if author_data:
-            all_author_data.append(author_data)
-            treated_authors.add(author_name)
+            state.add_author(author_name, author_data)
+            crawl_log.author(author_name, author_data)
 
             # Traitement des co-auteurs
             if 'Co-auteurs' in author_data and author_data['Co-auteurs']:
@@ -81,44 +71,46 @@ def extract_author_and_coauthors(author_name, depth=0, max_depth=2):
                 for co_author in co_authors:
                     extract_author_and_coauthors(co_author, depth + 1, max_depth)
 
-    time.sleep(random.uniform(1, 3))
     save_progress()
 
 # Extraction des articles
 def process_articles():
-    for author_data in all_author_data:
+    for author_data in list(state.all_author_data):
         author_id = author_data.get("ID de l'Auteur")
-        if author_id not in [article.get("ID de l'Auteur") for article in all_article_data]:
-            articles_data = extract_articles_from_author(author_id, driver)
-            if articles_data:
-                for article in articles_data:
-                    article["ID de l'Auteur"] = author_id
-                    all_article_data.append(article)
-            time.sleep(random.uniform(5, 15))
+        if not state.has_articles(author_id):
+            articles_data = extract_articles_from_author(author_id, driver, state.known_article) or []
+            state.add_articles(author_id, articles_data)
+            for article in articles_data:
+                crawl_log.article(article)
+            crawl_log.articles(author_id, len(articles_data))
             save_progress()
 
 # Extraction des journaux
 def process_journals():
-    for article in all_article_data:
-        source_title = article.get('Titre de source')
-        if 'ISSN' not in article and source_title not in existing_issns:
+    # Un titre de source n'est recherché qu'une fois ; les articles qui le partagent reçoivent le même ISSN
+    for source_title in state.pending_sources():
+        if not state.has_source(source_title):
             journal_data = search_journal_by_issn(source_title, driver)
-            if journal_data:
-                article['ISSN'] = journal_data.get('ISSN')
-                all_journal_data.append(journal_data)
-                existing_issns.add(journal_data.get('ISSN'))
-            time.sleep(random.uniform(1, 3))
+            if state.add_journal(source_title, journal_data):
+                crawl_log.journal(journal_data)
+            # Recherche aboutie, même sans ISSN (None : erreur, le titre sera recherché à la reprise)
+            if journal_data is not None or state.source_issn(source_title) is not None:
+                crawl_log.issn(source_title, state.source_issn(source_title))
             save_progress()
 
 # Fonction principale
 def main():
-    global treated_authors, all_author_data, all_article_data, all_journal_data, existing_issns
-    treated_authors, all_author_data, all_article_data, all_journal_data, existing_issns = load_progress()
+    global driver, crawl_log, state
+    driver = make_driver()
+    treated_authors, all_author_data, all_article_data, all_journal_data, searched = load_progress()
+    state = CrawlState(treated_authors, all_author_data, all_article_data, all_journal_data, searched)
+    crawl_log = CrawlJournal()
 
     authors = load_authors_from_file('authors.txt')
 
     if not authors:
         print("No authors to process.")
+        crawl_log.close()
         driver.quit()
         return
 
@@ -133,7 +125,12 @@ def main():
     process_journals()
 
     print("Processing complete.")
-    save_progress()
+    state.print_stats()
+    get_limiter().print_stats()
+    print(f"Cache des journaux : {get_journal_cache().stats()}")
+    crawl_log.close()
+    # Fichiers CSV finaux écrits une seule fois, à partir du journal
+    compact()
     driver.quit()
 
 if __name__ == "__main__":
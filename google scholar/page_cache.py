@@ -0,0 +1,200 @@
+import os
+import gzip
+import time
+import sqlite3
+import hashlib
+import argparse
+import datetime
+from urllib.parse import urlparse, parse_qs
+
+CACHE_DIR = 'page_cache'
+# Taille maximale des pages compressées ; au-delà, les moins récemment utilisées sont supprimées
+MAX_BYTES = 2 * 1024 ** 3
+# La taille est vérifiée toutes les EVICT_EVERY pages enregistrées
+EVICT_EVERY = 100
+
+
+# Type de page d'après son URL (les pages Selenium et HTTP sont classées de la même façon)
+def page_kind(url):
+    parsed = urlparse(url)
+    query = parse_qs(parsed.query)
+    if 'scholar.google' in parsed.netloc:
+        if parsed.path.startswith('/citations'):
+            view_op = query.get('view_op', [None])[0]
+            if view_op == 'view_citation':
+                return 'article'
+            if view_op == 'list_colleagues':
+                return 'colleagues'
+            if 'user' in query:
+                return 'author'
+        elif parsed.path.startswith('/scholar') and 'q' in query:
+            return 'search'
+    elif 'scimagojr' in parsed.netloc and parsed.path.endswith('journalsearch.php'):
+        return 'journal' if query.get('tip') == ['sid'] else 'journal_search'
+    # Pages des notebooks Scopus et Web of Science (y compris via le proxy de l'université)
+    elif 'scopus.com' in parsed.netloc:
+        if parsed.path.startswith('/authid/detail.uri'):
+            return 'scopus_author'
+        if parsed.path.startswith('/search/submit/coAuthorSearch.uri'):
+            return 'scopus_coauthors'
+        if parsed.path.startswith(('/record/display.uri', '/pages/publications/')):
+            return 'scopus_document'
+    elif 'webofscience.com' in parsed.netloc:
+        if parsed.path.startswith('/wos/author/record/'):
+            return 'wos_author'
+        if '/full-record/' in parsed.path:
+            return 'wos_article'
+    return 'other'
+
+
+# Cache des pages brutes : le HTML compressé est stocké une fois par contenu (empreinte SHA-256),
+# l'index SQLite associe chaque URL et date de récupération à son contenu
+class PageCache:
+    def __init__(self, root=CACHE_DIR, max_bytes=MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._puts = 0
+        os.makedirs(os.path.join(root, 'objects'), exist_ok=True)
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("CREATE TABLE IF NOT EXISTS blobs (hash TEXT PRIMARY KEY, size INTEGER, last_used REAL)")
+            db.execute("CREATE TABLE IF NOT EXISTS captures "
+                       "(url TEXT, fetched TEXT, kind TEXT, hash TEXT, PRIMARY KEY (url, fetched))")
+
+    def _connect(self):
+        return sqlite3.connect(os.path.join(self.root, 'index.sqlite'), timeout=30)
+
+    def blob_path(self, digest):
+        return os.path.join(self.root, 'objects', digest[:2], digest + '.html.gz')
+
+    # Enregistre une page ; une seule capture par URL et par jour (la dernière)
+    def put(self, url, page, kind=None):
+        data = page.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.blob_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with gzip.open(tmp_path, 'wb', compresslevel=6) as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        with self._connect() as db:
+            db.execute("INSERT OR REPLACE INTO blobs VALUES (?, ?, ?)",
+                       (digest, os.path.getsize(path), time.time()))
+            db.execute("INSERT OR REPLACE INTO captures VALUES (?, ?, ?, ?)",
+                       (url, datetime.date.today().isoformat(), kind or page_kind(url), digest))
+        self._puts += 1
+        if self._puts % EVICT_EVERY == 0:
+            self.evict()
+        return digest
+
+    # Dernière capture de l'URL (ou celle du jour demandé, 'AAAA-MM-JJ'), None si absente
+    def get(self, url, fetched=None):
+        with self._connect() as db:
+            if fetched is None:
+                row = db.execute("SELECT hash FROM captures WHERE url = ? ORDER BY fetched DESC LIMIT 1",
+                                 (url,)).fetchone()
+            else:
+                row = db.execute("SELECT hash FROM captures WHERE url = ? AND fetched = ?",
+                                 (url, fetched)).fetchone()
+            if row is None or not os.path.exists(self.blob_path(row[0])):
+                self.misses += 1
+                return None
+            db.execute("UPDATE blobs SET last_used = ? WHERE hash = ?", (time.time(), row[0]))
+        self.hits += 1
+        return read_blob(self.blob_path(row[0]))
+
+    # Captures de l'index : (url, date, type, chemin du contenu), les plus récentes d'abord
+    def captures(self, kinds=None):
+        query = "SELECT url, fetched, kind, hash FROM captures"
+        params = ()
+        if kinds:
+            query += f" WHERE kind IN ({','.join('?' * len(kinds))})"
+            params = tuple(kinds)
+        with self._connect() as db:
+            rows = db.execute(query + " ORDER BY fetched DESC", params).fetchall()
+        return [(url, fetched, kind, self.blob_path(digest)) for url, fetched, kind, digest in rows]
+
+    # Supprime les contenus les moins récemment utilisés (et leurs captures) jusqu'à max_bytes
+    def evict(self, max_bytes=None):
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        removed = 0
+        with self._connect() as db:
+            total = db.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+            if total <= max_bytes:
+                return 0
+            for digest, size in db.execute("SELECT hash, size FROM blobs ORDER BY last_used").fetchall():
+                if total <= max_bytes:
+                    break
+                db.execute("DELETE FROM captures WHERE hash = ?", (digest,))
+                db.execute("DELETE FROM blobs WHERE hash = ?", (digest,))
+                try:
+                    os.remove(self.blob_path(digest))
+                except FileNotFoundError:
+                    pass
+                total -= size
+                removed += 1
+        return removed
+
+    def stats(self):
+        with self._connect() as db:
+            n_blobs, size = db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM blobs").fetchone()
+            kinds = dict(db.execute("SELECT kind, COUNT(*) FROM captures GROUP BY kind").fetchall())
+        return {'captures': sum(kinds.values()), 'contents': n_blobs, 'size_mb': round(size / 1024 ** 2, 1),
+                'by_kind': kinds, 'hits': self.hits, 'misses': self.misses}
+
+
+def read_blob(path):
+    with gzip.open(path, 'rb') as f:
+        return f.read().decode('utf-8')
+
+
+# Navigateur qui enregistre chaque page visitée avant de la quitter : les fonctions
+# d'extraction existantes s'utilisent sans modification
+class CapturingDriver:
+    def __init__(self, driver, page_cache):
+        self._driver = driver
+        self._page_cache = page_cache
+
+    def __getattr__(self, name):
+        return getattr(self._driver, name)
+
+    def capture(self):
+        try:
+            url = self._driver.current_url
+            if url.startswith('http'):
+                self._page_cache.put(url, self._driver.page_source)
+        except Exception as e:
+            print(f"Page non enregistrée dans le cache : {e}")
+
+    def get(self, url):
+        self.capture()
+        self._driver.get(url)
+
+    def close(self):
+        self.capture()
+        self._driver.close()
+
+    def quit(self):
+        self.capture()
+        self._driver.quit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cache local des pages récupérées : statistiques et nettoyage.")
+    parser.add_argument('--cache', default=CACHE_DIR)
+    parser.add_argument('--max-mb', type=float, default=None,
+                        help="Supprime les pages les moins récemment utilisées au-delà de cette taille")
+    args = parser.parse_args()
+
+    page_cache = PageCache(args.cache)
+    if args.max_mb is not None:
+        removed = page_cache.evict(int(args.max_mb * 1024 ** 2))
+        print(f"{removed} contenus supprimés.")
+    print(page_cache.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import os
+import re
+import glob
+import time
+import argparse
+import pandas as pd
+
+from http_fetcher import parse_author_profile, parse_colleagues, parse_journal_page
+
+# Fixtures enregistrées par HttpFetcher(save_dir=...) : <type>_<empreinte>.html,
+# la première ligne rappelle l'URL d'origine
+PARSERS = {
+    'author': lambda page, url: parse_author_profile(page, url)[0],
+    'colleagues': lambda page, url: parse_colleagues(page),
+    'journal': lambda page, url: parse_journal_page(page),
+}
+URL_RE = re.compile(r'^<!-- (.*) -->')
+
+
+def read_fixture(path):
+    with open(path, encoding='utf-8') as f:
+        page = f.read()
+    match = URL_RE.match(page)
+    return page, match.group(1) if match else ''
+
+
+# Même page lue par Selenium (fichier local) avec les fonctions existantes
+def selenium_parse(driver, kind, path, url):
+    from auteur_file import read_author_info
+    from journal_file import extract_journal_info
+    driver.get('file://' + os.path.abspath(path))
+    start = time.perf_counter()
+    if kind == 'author':
+        read_author_info(url, driver)
+    elif kind == 'journal':
+        extract_journal_info(driver)
+    else:
+        return None
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Temps de parsing par page : lxml contre Selenium, sur des pages enregistrées.")
+    parser.add_argument('fixtures', nargs='?', default='fixtures',
+                        help="Dossier des pages HTML enregistrées (par défaut : les pages de test du dépôt)")
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--selenium', action='store_true', help="Mesurer aussi le chemin Selenium (navigateur requis)")
+    args = parser.parse_args()
+
+    driver = None
+    if args.selenium:
+        from main_func import make_driver
+        driver = make_driver('bench', temporary=True)
+
+    rows = []
+    try:
+        for path in sorted(glob.glob(os.path.join(args.fixtures, '*.html'))):
+            kind = os.path.basename(path).split('_', 1)[0]
+            if kind not in PARSERS:
+                continue
+            page, url = read_fixture(path)
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                result = PARSERS[kind](page, url)
+            row = {
+                'page': os.path.basename(path),
+                'type': kind,
+                'lxml_ms': round((time.perf_counter() - start) * 1000 / args.repeat, 3),
+                'champs': sum(value is not None for value in result.values()) if isinstance(result, dict) else None,
+            }
+            if driver is not None:
+                row['selenium_ms'] = selenium_parse(driver, kind, path, url)
+            rows.append(row)
+    finally:
+        if driver is not None:
+            driver.quit()
+
+    if not rows:
+        print("Aucune page trouvée. Enregistrez des pages avec HttpFetcher(save_dir=...).")
+        return
+    report = pd.DataFrame(rows)
+    print(report.to_string(index=False))
+    print(report.drop(columns=['page']).groupby('type').mean(numeric_only=True).round(3).to_string())
+
+
+if __name__ == "__main__":
+    main()
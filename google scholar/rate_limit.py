@@ -0,0 +1,221 @@
+import time
+import threading
+from urllib.parse import urlparse
+
+# Débit initial (requêtes par seconde) par domaine, partagé par tous les workers du processus
+DOMAIN_RATES = {
+    'scholar.google.com': 0.5,
+    'www.scimagojr.com': 1.0,
+    'www.scopus.com': 0.5,
+    'www.webofscience.com': 0.5,
+    # Web of Science via le proxy de l'IMIST (notebook WoS, hors réseau de l'ENSA)
+    'www.webofscience.com.eressources.imist.ma': 0.5,
+}
+DEFAULT_RATE = 1.0
+# Rafale maximale (jetons accumulés pendant l'inactivité)
+BURST = 2
+# Bornes du débit adaptatif, relatives au débit initial
+MIN_FACTOR = 0.05
+MAX_FACTOR = 2.0
+# Page bloquée (CAPTCHA) : débit divisé par deux et pause du domaine ; erreur : débit réduit de 20 %
+BLOCKED_FACTOR = 0.5
+BLOCKED_PAUSE = 60.0
+ERROR_FACTOR = 0.8
+# Après SPEEDUP_AFTER succès consécutifs, le débit augmente de 10 %
+SPEEDUP_AFTER = 20
+SPEEDUP_FACTOR = 1.1
+# Attente maximale du chargement d'une page dans le navigateur
+PAGE_TIMEOUT = 15
+# En bas de page, attente maximale d'un contenu chargé à la demande
+SCROLL_SETTLE = 1.0
+
+# Marqueurs des pages de vérification (CAPTCHA Scholar, reCAPTCHA, trafic inhabituel)
+BLOCKED_MARKERS = ('gs_captcha', 'g-recaptcha', 'unusual traffic', "not a robot")
+
+
+def looks_blocked(page):
+    lowered = page.lower()
+    return any(marker in lowered for marker in BLOCKED_MARKERS)
+
+
+def domain_of(url):
+    return urlparse(url).netloc or url
+
+
+# Arrêt demandé pendant une attente (Ctrl+C dans crawler.py) ; hérite de BaseException
+# pour traverser les "except Exception" des fonctions d'extraction
+class Interrupted(BaseException):
+    pass
+
+
+# Seau à jetons d'un domaine ; les jetons sont réservés sous verrou, l'attente se fait hors verrou
+class TokenBucket:
+    def __init__(self, rate, burst=BURST):
+        self.base_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.streak = 0
+        self.requests = 0
+        self.blocked = 0
+        self.errors = 0
+        self.throttled_seconds = 0.0
+        self.first_request = None
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    # Réserve un jeton ; retourne le délai à attendre
+    def reserve(self):
+        now = time.monotonic()
+        self._refill(now)
+        self.tokens -= 1
+        self.requests += 1
+        if self.first_request is None:
+            self.first_request = now
+        delay = max(-self.tokens / self.rate, 0.0)
+        self.throttled_seconds += delay
+        return delay
+
+    def set_rate(self, factor):
+        self._refill(time.monotonic())
+        self.rate = min(max(self.rate * factor, self.base_rate * MIN_FACTOR), self.base_rate * MAX_FACTOR)
+
+
+# Limiteur adaptatif par domaine, partagé par les extracteurs Selenium, HttpFetcher et crawler.py
+class RateLimiter:
+    def __init__(self, rates=DOMAIN_RATES, default_rate=DEFAULT_RATE):
+        self.rates = dict(rates)
+        self.default_rate = default_rate
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._interrupt = threading.Event()
+
+    def _bucket(self, domain):
+        bucket = self._buckets.get(domain)
+        if bucket is None:
+            bucket = self._buckets[domain] = TokenBucket(self.rates.get(domain, self.default_rate))
+        return bucket
+
+    # Attend le prochain jeton du domaine (URL ou nom de domaine)
+    def wait(self, url):
+        with self._lock:
+            delay = self._bucket(domain_of(url)).reserve()
+        if self._interrupt.wait(delay):
+            raise Interrupted(domain_of(url))
+
+    def success(self, url):
+        with self._lock:
+            bucket = self._bucket(domain_of(url))
+            bucket.streak += 1
+            if bucket.streak >= SPEEDUP_AFTER:
+                bucket.streak = 0
+                bucket.set_rate(SPEEDUP_FACTOR)
+
+    # CAPTCHA : débit réduit et domaine en pause (les requêtes suivantes attendent)
+    def blocked(self, url):
+        with self._lock:
+            bucket = self._bucket(domain_of(url))
+            bucket.blocked += 1
+            bucket.streak = 0
+            bucket.set_rate(BLOCKED_FACTOR)
+            bucket.tokens = min(bucket.tokens, -BLOCKED_PAUSE * bucket.rate)
+
+    def error(self, url):
+        with self._lock:
+            bucket = self._bucket(domain_of(url))
+            bucket.errors += 1
+            bucket.streak = 0
+            bucket.set_rate(ERROR_FACTOR)
+
+    # Les attentes en cours et à venir lèvent Interrupted jusqu'à resume()
+    def interrupt(self):
+        self._interrupt.set()
+
+    def resume(self):
+        self._interrupt.clear()
+
+    def stats(self):
+        now = time.monotonic()
+        report = {}
+        with self._lock:
+            for domain, bucket in self._buckets.items():
+                elapsed = now - bucket.first_request if bucket.first_request is not None else 0
+                report[domain] = {
+                    'requests': bucket.requests,
+                    'effective_rate': round(bucket.requests / elapsed, 3) if elapsed else None,
+                    'rate': round(bucket.rate, 3),
+                    'throttled_s': round(bucket.throttled_seconds, 1),
+                    'blocked': bucket.blocked,
+                    'errors': bucket.errors,
+                }
+        return report
+
+    def print_stats(self):
+        for domain, values in self.stats().items():
+            print(f"{domain} : {values['requests']} requêtes, {values['effective_rate']} req/s effectives "
+                  f"(débit actuel {values['rate']}), {values['throttled_s']} s d'attente, "
+                  f"{values['blocked']} blocages, {values['errors']} erreurs")
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+# Limiteur unique du processus
+def get_limiter():
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = RateLimiter()
+    return _limiter
+
+
+# Attend que le DOM de la page soit prêt ('interactive' suffit avec la stratégie de chargement 'eager'
+# de driver_factory.py), puis signale le résultat au limiteur ; retourne False si la page est un CAPTCHA
+def page_ready(driver, url=None, timeout=PAGE_TIMEOUT):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if driver.execute_script("return document.readyState") in ('interactive', 'complete'):
+                break
+        except Exception:
+            pass
+        time.sleep(0.1)
+    url = url or driver.current_url
+    if looks_blocked(driver.page_source):
+        print(f"CAPTCHA détecté sur {domain_of(url)} : ralentissement du domaine.")
+        get_limiter().blocked(url)
+        return False
+    get_limiter().success(url)
+    return True
+
+
+# driver.get au rythme du domaine ; une page bloquée est redemandée après la pause du domaine
+def polite_get(driver, url, retries=1):
+    for _ in range(retries + 1):
+        get_limiter().wait(url)
+        driver.get(url)
+        if page_ready(driver, url):
+            return True
+    return False
+
+
+# Fait défiler la page jusqu'en bas par pas de step pixels, une image (requestAnimationFrame) par pas
+# pour déclencher le chargement à la demande ; en bas de page, attend au plus settle secondes que
+# la page s'allonge au lieu d'une pause fixe à chaque pas
+def scroll_to_bottom(driver, step=1000, settle=SCROLL_SETTLE):
+    position = 0
+    while True:
+        height = driver.execute_script("return document.body.scrollHeight")
+        while position < height:
+            position += step
+            driver.execute_script("window.scrollTo(0, arguments[0]);"
+                                  "return new Promise(resolve => requestAnimationFrame(resolve));", position)
+        deadline = time.monotonic() + settle
+        while driver.execute_script("return document.body.scrollHeight") <= height:
+            if time.monotonic() >= deadline:
+                return
+            time.sleep(0.1)
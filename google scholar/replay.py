@@ -0,0 +1,172 @@
+import os
+import time
+import argparse
+import pandas as pd
+from urllib.parse import urlparse, parse_qs
+from concurrent.futures import ProcessPoolExecutor
+
+from page_cache import PageCache, CACHE_DIR, read_blob
+from http_fetcher import (parse_author_profile, parse_colleagues, parse_article_rows,
+                          parse_article_page, parse_journal_page, article_record)
+from source_parsers import (parse_scopus_author, parse_scopus_coauthors, parse_scopus_document,
+                            parse_wos_author, parse_wos_article)
+
+# Pages utiles au rejeu ; les pages de recherche ne servent qu'à la navigation
+KINDS = ('author', 'colleagues', 'article', 'journal',
+         'scopus_author', 'scopus_coauthors', 'scopus_document', 'wos_author', 'wos_article')
+OUTPUT_DIR = 'replay'
+OUTPUT_FILES = {
+    'author': 'auteur_info.csv',
+    'article': 'article_info.csv',
+    'journal': 'journal_info.csv',
+    'scopus_author': 'scopus_auteur_info.csv',
+    'scopus_document': 'scopus_document_info.csv',
+    'wos_author': 'wos_auteur_info.csv',
+    'wos_article': 'wos_article_info.csv',
+}
+
+# Parseurs des pages Scopus et Web of Science (notebooks), appelés avec la page et son URL
+SOURCE_PARSERS = {
+    'scopus_author': parse_scopus_author,
+    'scopus_coauthors': parse_scopus_coauthors,
+    'scopus_document': lambda page, url: parse_scopus_document(page),
+    'wos_author': parse_wos_author,
+    'wos_article': lambda page, url: parse_wos_article(page),
+}
+
+
+def query_param(url, name):
+    return parse_qs(urlparse(url).query).get(name, [None])[0]
+
+
+# Parsing d'une capture, exécuté dans les processus de travail
+def parse_capture(capture):
+    url, fetched, kind, path = capture
+    try:
+        page = read_blob(path)
+    except OSError:
+        # Contenu supprimé par l'éviction entre la lecture de l'index et le parsing
+        return None
+    if kind == 'author':
+        author_info, needs_full_list = parse_author_profile(page, url)
+        # Pages Selenium : la fenêtre "Voir tout" peut être ouverte dans la page enregistrée
+        return {'author': author_info, 'needs_full_list': needs_full_list,
+                'modal': parse_colleagues(page), 'rows': parse_article_rows(page)}
+    if kind == 'colleagues':
+        return parse_colleagues(page)
+    if kind == 'article':
+        return parse_article_page(page)
+    if kind in SOURCE_PARSERS:
+        return SOURCE_PARSERS[kind](page, url)
+    return parse_journal_page(page)
+
+
+# Auteurs et documents Scopus : métriques de la capture la plus récente où le nom a été lu
+# (#tab=metrics ou liste des documents), co-auteurs de la page de recherche des co-auteurs
+def scopus_tables(profiles, coauthors, documents):
+    all_author_data = []
+    author_by_link = {}
+    for author_id, results in profiles.items():
+        author_data = next((data for data, _ in results if data['Nom_Complet'] != "N/A"), results[0][0])
+        all_author_data.append({'ID_Auteur': author_id, **author_data,
+                                'Co-auteur-liste': coauthors.get(author_id, [])})
+        for _, docs_links in results:
+            for link in docs_links:
+                author_by_link.setdefault(link, author_id)
+    all_document_data = [dict(data, ID_Auteur=author_by_link.get(url), Lien=url) for url, data in documents.items()]
+    return all_author_data, all_document_data
+
+
+# Reconstruit auteurs, articles et journaux à partir des pages en cache (les plus récentes d'abord) ;
+# retourne une table par fichier de OUTPUT_FILES et le nombre de pages relues
+def replay(page_cache, workers=None):
+    captures = page_cache.captures(KINDS)
+    workers = workers or os.cpu_count()
+    with ProcessPoolExecutor(workers) as pool:
+        parsed = list(pool.map(parse_capture, captures, chunksize=max(1, len(captures) // (workers * 4))))
+
+    profiles = {}
+    colleagues = {}
+    details = {}
+    journals = {}
+    scopus_profiles = {}
+    scopus_coauthors = {}
+    scopus_documents = {}
+    wos_authors = {}
+    wos_articles = {}
+    for (url, fetched, kind, _), result in zip(captures, parsed):
+        if result is None:
+            continue
+        if kind == 'scopus_author':
+            scopus_profiles.setdefault(query_param(url, 'authorId'), []).append(result)
+        elif kind == 'scopus_coauthors':
+            scopus_coauthors.setdefault(query_param(url, 'authorId'), result)
+        elif kind == 'scopus_document':
+            scopus_documents.setdefault(url, result)
+        elif kind == 'wos_author':
+            infos, id_co_auteur = result
+            wos_authors.setdefault(infos["ID de l'Auteur"], dict(infos, id_co_auteurs=id_co_auteur))
+        elif kind == 'wos_article':
+            wos_articles.setdefault(url, dict(result, Lien=url))
+        elif kind == 'author':
+            profiles.setdefault(query_param(url, 'user'), []).append(result)
+        elif kind == 'colleagues':
+            colleagues.setdefault(query_param(url, 'user'), result)
+        elif kind == 'article':
+            details.setdefault(query_param(url, 'citation_for_view'), result)
+        else:
+            journals.setdefault(url, result)
+
+    all_author_data = []
+    all_article_data = []
+    for author_id, results in profiles.items():
+        author_info = dict(results[0]['author'])
+        if results[0]['needs_full_list']:
+            full_list = colleagues.get(author_id) or next((r['modal'] for r in results if r['modal']), None)
+            if full_list:
+                author_info['Co-auteurs'] = full_list
+        all_author_data.append(author_info)
+
+        # La capture la plus complète de la liste (après les clics sur "Show more")
+        rows = max((r['rows'] for r in results), key=len)
+        for row in rows:
+            detail = details.get(query_param(row['link'], 'citation_for_view')) if row['link'] else None
+            # Mêmes colonnes que l'exploration (CrawlState.add_articles ajoute l'ID de l'auteur)
+            article = article_record(row, detail or {})
+            article["ID de l'Auteur"] = author_id
+            all_article_data.append(article)
+
+    scopus_authors, scopus_docs = scopus_tables(scopus_profiles, scopus_coauthors, scopus_documents)
+    tables = {
+        'author': all_author_data,
+        'article': all_article_data,
+        'journal': list(journals.values()),
+        'scopus_author': scopus_authors,
+        'scopus_document': scopus_docs,
+        'wos_author': list(wos_authors.values()),
+        'wos_article': list(wos_articles.values()),
+    }
+    return tables, len(captures)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rejeu hors ligne des extractions à partir du cache des pages.")
+    parser.add_argument('--cache', default=CACHE_DIR)
+    parser.add_argument('--out', default=OUTPUT_DIR)
+    parser.add_argument('--workers', type=int, default=None, help="Nombre de processus (par défaut : un par cœur)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    tables, n_pages = replay(PageCache(args.cache), args.workers)
+    os.makedirs(args.out, exist_ok=True)
+    # Fichiers Scopus et Web of Science écrits seulement si le cache contient leurs pages
+    for kind, data in tables.items():
+        if data or kind in ('author', 'article', 'journal'):
+            pd.DataFrame(data).to_csv(os.path.join(args.out, OUTPUT_FILES[kind]), index=False)
+    counts = ', '.join(f"{OUTPUT_FILES[kind]} ({len(data)})" for kind, data in tables.items() if data)
+    print(f"{n_pages} pages relues en {time.perf_counter() - start:.1f} s : {counts or 'aucune fiche'} "
+          f"dans '{args.out}'.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+import os
+import re
+import glob
+import argparse
+import threading
+import numpy as np
+import pandas as pd
+
+MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Exports annuels téléchargés depuis scimagojr.com ("scimagojr 2023.csv", séparateur ';', décimales ',')
+SCIMAGO_DIR = os.path.join(MODULE_DIR, 'scimago')
+# Table importée, partagée par les scrapers et l'enrichissement des jeux de données
+TABLE_PATH = os.path.join(MODULE_DIR, 'scimago_sjr.parquet')
+
+COLUMNS = {
+    'Sourceid': 'sourceid', 'Title': 'title', 'Type': 'type', 'Issn': 'issns', 'SJR': 'sjr',
+    'SJR Best Quartile': 'quartile', 'H index': 'h_index', 'Publisher': 'publisher',
+    'Coverage': 'coverage', 'Categories': 'categories',
+}
+ISSN_PATTERN = r'\d{4}-?\d{3}[\dXx]'
+YEAR_PATTERN = r'((?:19|20)\d{2})'
+# Colonnes ajoutées par l'enrichissement
+ENRICH_FIELDS = ['sjr', 'quartile', 'h_index', 'year', 'title']
+
+
+def normalize_issn_series(values):
+    return values.str.replace('-', '', regex=False).str.upper()
+
+
+def normalize_title_series(values):
+    return values.astype('string').str.lower().str.split().str.join(' ')
+
+
+# Lit un export Scimago : une ligne par (ISSN, année), les journaux sans ISSN restent accessibles par titre
+def read_export(path, year=None):
+    if year is None:
+        match = re.search(YEAR_PATTERN, os.path.basename(path))
+        if match is None:
+            raise ValueError(f"Année introuvable dans le nom de fichier '{path}' (nom attendu : 'scimagojr AAAA.csv').")
+        year = int(match.group(1))
+    df = pd.read_csv(path, sep=';', decimal=',', usecols=lambda column: column in COLUMNS,
+                     dtype={'Sourceid': str, 'Issn': str})
+    df = df.rename(columns=COLUMNS)
+    df['year'] = year
+    df['quartile'] = df['quartile'].replace('-', np.nan)
+    df['title_key'] = normalize_title_series(df['title'])
+    df['issn'] = df['issns'].astype('string').str.findall(ISSN_PATTERN)
+    df = df.explode('issn')
+    df['issn'] = normalize_issn_series(df['issn'].astype('string'))
+    return df
+
+
+# Importe un ou plusieurs exports annuels (une année peut être remplacée par un nouvel export)
+def build_table(paths, table_path=TABLE_PATH):
+    frames = [read_export(path) for path in paths]
+    if os.path.exists(table_path):
+        previous = pd.read_parquet(table_path)
+        imported_years = {int(frame['year'].iloc[0]) for frame in frames if len(frame)}
+        frames.insert(0, previous[~previous['year'].isin(imported_years)])
+    table = pd.concat(frames, ignore_index=True)
+    table = table.drop_duplicates(['issn', 'year', 'sourceid']).sort_values(['issn', 'year'], kind='stable')
+    tmp_path = table_path + '.tmp'
+    table.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, table_path)
+    return table
+
+
+# Table de correspondance ISSN/titre -> SJR, quartile, H-index, pour toutes les années importées
+class SjrTable:
+    def __init__(self, table):
+        self.table = table.reset_index(drop=True)
+        by_issn = self.table.dropna(subset=['issn'])
+        # Année la plus récente par ISSN et par titre normalisé
+        self.latest = by_issn.drop_duplicates('issn', keep='last').set_index('issn')
+        self.by_year = by_issn.drop_duplicates(['issn', 'year'], keep='last').set_index(['issn', 'year'])
+        self.by_title = (self.table.sort_values('year', kind='stable')
+                         .drop_duplicates('title_key', keep='last').set_index('title_key'))
+
+    @classmethod
+    def load(cls, table_path=TABLE_PATH):
+        return cls(pd.read_parquet(table_path))
+
+    # Ligne d'un journal (par ISSN, sinon par titre), pour l'année demandée ou la plus récente
+    def lookup(self, issn=None, title=None, year=None):
+        for key in re.findall(ISSN_PATTERN, str(issn)) if issn else []:
+            key = key.replace('-', '').upper()
+            if year is not None and (key, year) in self.by_year.index:
+                return self.by_year.loc[(key, year)].to_dict()
+            if key in self.latest.index:
+                return self.latest.loc[key].to_dict()
+        if title:
+            title_key = ' '.join(str(title).lower().split())
+            if title_key in self.by_title.index:
+                return self.by_title.loc[title_key].to_dict()
+        return None
+
+    # Jointure vectorisée : ISSN et année de publication, puis ISSN seul (année la plus récente),
+    # puis titre de source normalisé. Ajoute les colonnes scimago_* ; retourne aussi le masque des lignes non trouvées
+    def enrich(self, articles, issn_col=None, title_col=None, year_col=None):
+        n_rows = len(articles)
+        rows = np.arange(n_rows)
+        parts = []
+        if issn_col:
+            exploded = pd.DataFrame({'row': rows, 'issn': articles[issn_col].astype('string')
+                                     .str.findall(ISSN_PATTERN).values})
+            exploded = exploded.explode('issn').dropna(subset=['issn'])
+            exploded['issn'] = normalize_issn_series(exploded['issn'].astype('string'))
+            # Ordre des ISSN de l'article : le premier trouvé l'emporte
+            exploded['order'] = np.arange(len(exploded))
+            if year_col:
+                years = pd.to_numeric(articles[year_col].astype('string').str.extract(YEAR_PATTERN)[0],
+                                      errors='coerce')
+                exploded['year'] = years.values[exploded['row'].to_numpy()]
+                exact = exploded.dropna(subset=['year']).astype({'year': int}).merge(
+                    self.by_year[['sjr', 'quartile', 'h_index', 'title']].reset_index(), on=['issn', 'year'])
+                parts.append(exact.assign(priority=0))
+            latest = exploded.drop(columns='year', errors='ignore').merge(
+                self.latest[ENRICH_FIELDS].reset_index(), on='issn')
+            parts.append(latest.assign(priority=1))
+        if title_col:
+            titles = pd.DataFrame({'row': rows, 'title_key': normalize_title_series(articles[title_col]).values})
+            by_title = titles.dropna(subset=['title_key']).merge(
+                self.by_title[ENRICH_FIELDS].reset_index(), on='title_key')
+            parts.append(by_title.assign(priority=2, order=0))
+
+        enriched = articles.copy()
+        if parts:
+            found = (pd.concat(parts, ignore_index=True).sort_values(['row', 'priority', 'order'], kind='stable')
+                     .drop_duplicates('row').set_index('row'))
+        else:
+            found = pd.DataFrame(columns=ENRICH_FIELDS)
+        for field in ENRICH_FIELDS:
+            enriched[f'scimago_{field}'] = found[field].reindex(rows).values
+        missing = enriched['scimago_title'].isna().to_numpy()
+        return enriched, missing
+
+
+_table = None
+_table_lock = threading.Lock()
+
+# Table du processus, None si aucun export n'a été importé
+def get_sjr_table(table_path=TABLE_PATH):
+    global _table
+    if _table is None and os.path.exists(table_path):
+        with _table_lock:
+            if _table is None:
+                _table = SjrTable.load(table_path)
+    return _table
+
+
+# Fiche au format de search_journal_by_issn tirée de la table (None si absente : recherche en ligne)
+def offline_journal(source_title):
+    table = get_sjr_table()
+    if table is None or source_title is None:
+        return None
+    row = table.lookup(title=source_title)
+    if row is None:
+        return None
+    return {
+        'Nom': row['title'],
+        'Editeur': row.get('publisher'),
+        'ISSN': row.get('issns'),
+        'Index': row.get('coverage'),
+        'H-index': None if pd.isna(row.get('h_index')) else str(int(row['h_index'])),
+        'Quartile': None if pd.isna(row.get('quartile')) else row['quartile'],
+        'SJR': None if pd.isna(row.get('sjr')) else str(row['sjr']),
+        'Impact factor': None,
+        'Portee thematique': row.get('categories'),
+    }
+
+
+# Titres non trouvés dans la table : recherche dans le navigateur (cache des journaux compris)
+def browser_fallback(enriched, missing, title_col):
+    from main_func import make_driver
+    from journal_file import search_journal_by_issn
+
+    titles = enriched.loc[missing, title_col].dropna().unique()
+    if not len(titles):
+        return enriched
+    print(f"{len(titles)} titres absents de la table Scimago : recherche en ligne.")
+    # Profil jetable : la recherche Scimago peut tourner pendant une exploration
+    driver = make_driver('scimago', temporary=True)
+    try:
+        results = {title: search_journal_by_issn(title, driver) for title in titles}
+    finally:
+        driver.quit()
+    fields = {'sjr': 'SJR', 'quartile': 'Quartile', 'h_index': 'H-index', 'title': 'Nom'}
+    for field, key in fields.items():
+        values = enriched.loc[missing, title_col].map(lambda title: (results.get(title) or {}).get(key))
+        enriched.loc[missing, f'scimago_{field}'] = values
+    enriched['scimago_sjr'] = pd.to_numeric(enriched['scimago_sjr'], errors='coerce')
+    return enriched
+
+
+def pick_column(columns, requested, candidates):
+    if requested:
+        return requested
+    return next((column for column in candidates if column in columns), None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import des exports Scimago et enrichissement hors ligne des jeux d'articles.")
+    parser.add_argument('--import', dest='exports', nargs='*', default=None,
+                        help="Exports CSV à importer (par défaut : tous les CSV du dossier scimago)")
+    parser.add_argument('--table', default=TABLE_PATH)
+    parser.add_argument('--enrich', default=None, help="Jeu d'articles (CSV) à enrichir")
+    parser.add_argument('--out', default=None, help="Fichier de sortie (par défaut : <entrée>_sjr.csv)")
+    parser.add_argument('--issn-col', default=None)
+    parser.add_argument('--title-col', default=None)
+    parser.add_argument('--year-col', default=None)
+    parser.add_argument('--fallback', action='store_true',
+                        help="Recherche dans le navigateur les journaux absents de la table")
+    args = parser.parse_args()
+
+    if args.exports is not None:
+        paths = args.exports or sorted(glob.glob(os.path.join(SCIMAGO_DIR, '*.csv')))
+        if not paths:
+            print(f"Aucun export trouvé dans '{SCIMAGO_DIR}'.")
+            return
+        table = build_table(paths, args.table)
+        print(f"{table['sourceid'].nunique()} journaux, {table['issn'].nunique()} ISSN, "
+              f"années {sorted(table['year'].unique().tolist())} dans '{args.table}'.")
+
+    if args.enrich:
+        articles = pd.read_csv(args.enrich)
+        issn_col = pick_column(articles.columns, args.issn_col, ['ISSN', 'issn'])
+        title_col = pick_column(articles.columns, args.title_col, ['Titre de source', 'Titre de journal'])
+        year_col = pick_column(articles.columns, args.year_col, ['Année de publication', 'Date de publication'])
+        enriched, missing = SjrTable.load(args.table).enrich(articles, issn_col, title_col, year_col)
+        print(f"{len(articles) - missing.sum()} articles sur {len(articles)} trouvés dans la table Scimago.")
+        if args.fallback and title_col and missing.any():
+            enriched = browser_fallback(enriched, missing, title_col)
+        out = args.out or os.path.splitext(args.enrich)[0] + '_sjr.csv'
+        enriched.to_csv(out, index=False)
+        print(f"Jeu enrichi enregistré dans '{out}'.")
+
+
+if __name__ == "__main__":
+    main()
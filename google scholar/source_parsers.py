@@ -0,0 +1,170 @@
+import re
+from urllib.parse import urljoin, urlparse, parse_qs
+
+from lxml import html as lxml_html
+
+from http_fetcher import element_text, xpath_text
+
+# Parseurs lxml des pages Scopus et Web of Science enregistrées par les notebooks
+# (CapturingDriver) : mêmes sélecteurs et mêmes champs que les fonctions Selenium des notebooks,
+# pour le rejeu hors ligne (replay.py)
+
+
+# Condition XPath : l'élément porte toutes les classes (équivalent de By.CLASS_NAME "a.b")
+def has_classes(*names):
+    return ' and '.join(f"contains(concat(' ', @class, ' '), ' {name} ')" for name in names)
+
+
+# Texte d'un élément ligne par ligne, comme element.text de Selenium pour un bloc
+def block_text(element):
+    return '\n'.join(part.strip() for part in element.itertext() if part.strip())
+
+
+def first(tree, path):
+    found = tree.xpath(path)
+    return found[0] if found else None
+
+
+# Scopus : métriques de l'auteur (extract_author_metrics) et liens de ses documents (fetch_author_docs_links)
+def parse_scopus_author(page, url):
+    tree = lxml_html.fromstring(page)
+    author_data = {
+        "Nom_Complet": "N/A",
+        "Affiliation": "N/A",
+        "Citations": 0,
+        "Documents": 0,
+        "h-index": 0,
+        "FWCI": 0.0
+    }
+    name = first(tree, f"//*[{has_classes('Typography-module__lVnit', 'Typography-module__oFCaL')}]")
+    if name is not None:
+        author_data["Nom_Complet"] = element_text(name)
+    header = first(tree, f"//*[{has_classes('AuthorHeader-module__DRxsE')}]")
+    if header is not None:
+        parts = header.xpath(f".//*[{has_classes('Typography-module__lVnit', 'Typography-module__Nfgvc')}]")
+        if parts:
+            author_data["Affiliation"] = element_text(parts[-1]).lstrip(', ').replace(', ', ' - ')
+
+    metrics = first(tree, f"//*[{has_classes('MetricSection-module__s8lWB')}]")
+    if metrics is not None:
+        text = block_text(metrics)
+        for field, match in (("Citations", re.search(r'(\d{1,3}(?:,\d{3})*)\s*citation', text.lower())),
+                             ("Documents", re.search(r'(\d{1,3}(?:,\d{3})*)\s*Document', text)),
+                             ("h-index", re.search(r'(\d{1,3}(?:,\d{3})*)\s*h-index', text.lower()))):
+            if match:
+                author_data[field] = int(match.group(1).replace(',', ''))
+
+    panel = first(tree, "//*[@id='metrics-panel']")
+    if panel is not None:
+        fwci = re.search(r'field-weighted citation impact\s+(\d+\.\d+)', block_text(panel).lower())
+        if fwci:
+            author_data["FWCI"] = float(fwci.group(1))
+
+    docs_links = []
+    for element in tree.xpath("//*[" + has_classes('Typography-module__lVnit', 'Typography-module__Cv8mo',
+                                                   'Typography-module__mZVLC', 'Typography-module__ETlt8') + "]"):
+        hrefs = element.xpath(".//a/@href")
+        if hrefs:
+            docs_links.append(urljoin(url, hrefs[0]))
+    return author_data, docs_links
+
+
+# Scopus : identifiants des co-auteurs (fetch_co_authors), dans l'ordre de la page, sans l'auteur lui-même
+def parse_scopus_coauthors(page, url):
+    author_id = parse_qs(urlparse(url).query).get('authorId', [None])[0]
+    author_ids = []
+    for row in lxml_html.fromstring(page).xpath("//*[@id='srchResultsList']//tr"):
+        hrefs = row.xpath(".//a/@href")
+        match = re.search(r'authorId=(\d+)', hrefs[0]) if hrefs else None
+        if match and match.group(1) != author_id and match.group(1) not in author_ids:
+            author_ids.append(match.group(1))
+    return author_ids
+
+
+# Scopus : champs d'un document (fetch_documents_data)
+def parse_scopus_document(page):
+    tree = lxml_html.fromstring(page)
+
+    def source_info(test_id):
+        return xpath_text(tree, f"//dl[@data-testid='source-info-entry-{test_id}']/dd") or ''
+
+    citation = xpath_text(tree, f"//*[{has_classes('panel-title')}]")
+    return {
+        "authors": [element_text(element) for element in tree.xpath(
+            "//*[" + has_classes('Button-module__nc6_8', 'Button-module__rphhF', 'Button-module__VBKvn',
+                                 'Button-module__MlsfC', 'Button-module__Y0far', 'Button-module__hK_LA',
+                                 'Button-module__qDdAl') + "]")],
+        "issn": source_info('issn'),
+        "doi": source_info('doi'),
+        "title": xpath_text(tree, f"//h2[{has_classes('Typography-module__lVnit')}]") or '',
+        "type_doc": source_info('document-type'),
+        "source_type": source_info('source-type'),
+        "citation": citation.split()[-2] if citation and len(citation.split()) > 1 else '',
+        "date_pub": xpath_text(tree, "(//div[contains(@class, 'PublicationInformationBar-module')]//span)[4]") or '',
+        "abstract": xpath_text(tree, "//*[" + has_classes('Typography-module__lVnit', 'Typography-module__ETlt8',
+                                                          'Typography-module__GK8Sg') + "]") or '',
+        "key_words": [element_text(element) for element in tree.xpath(
+            "//*[" + has_classes('Typography-module__lVnit', 'Typography-module__ETlt8',
+                                 'AuthorKeywords-module__tuDgJ') + "]")] or '',
+    }
+
+
+# Web of Science : fiche auteur et identifiants des co-auteurs (get_author_information)
+def parse_wos_author(page, url):
+    tree = lxml_html.fromstring(page)
+    infos = {
+        'ID de l\'Auteur': urlparse(url).path.rstrip('/').split('/')[-1],
+        'nom_complet': xpath_text(tree, f"//*[{has_classes('wat-author-name')}]"),
+        'pays_affiliation': None,
+        'co_auteurs': [],
+        'H-Index': 0,
+        'Sum of Times Cited': 0
+    }
+    co_auteurs = tree.xpath(f"//*[{has_classes('authors-list-link')}]")
+    infos['co_auteurs'] = [element_text(auteur) for auteur in co_auteurs]
+    id_co_auteur = [(auteur.get('href') or '').split('/')[-1] for auteur in co_auteurs]
+
+    for metric in tree.xpath(f"//*[{has_classes('wat-author-metric-descriptor')}]"):
+        if element_text(metric) in ['H-Index', 'Sum of Times Cited']:
+            value = metric.xpath('./preceding-sibling::div[1]')
+            if value:
+                infos[element_text(metric)] = element_text(value[0])
+
+    details = xpath_text(tree, f"//*[{has_classes('more-details')}]")
+    if details:
+        infos['pays_affiliation'] = details.split(',')[-1].strip()
+    return infos, id_co_auteur
+
+
+# Web of Science : champs d'un article (extract_article_details) ; None pour une page d'erreur
+def parse_wos_article(page):
+    tree = lxml_html.fromstring(page)
+    if tree.xpath(f"//*[{has_classes('error-content')}]"):
+        return None
+    infos = {}
+    infos['Titre de l’article'] = xpath_text(tree, f"//*[{has_classes('title')}]")
+    authors = tree.xpath("//a[starts-with(@id,'SumAuthTa-DisplayName-author-en-')]")
+    infos['Auteurs'] = ' ; '.join(element_text(element) for element in authors) if authors else None
+    infos['Date de publication'] = xpath_text(tree, "//*[@id='FullRTa-pubdate']", "//*[@id='FullRTa-earlyAccess']")
+    infos['Titre de la source'] = xpath_text(tree, f"//*[{has_classes('summary-source-title-link')}]",
+                                             f"//*[{has_classes('summary-source-title')}]")
+
+    mots_cles = ''
+    for id_name in ['FRkeywordsTa-keyWordsPlusLink-', 'FRkeywordsTa-authorKeywordLink-']:
+        value = tree.xpath(f"//a[starts-with(@id,'{id_name}')]")
+        if value:
+            mots_cles = mots_cles + ' ' + ' ; '.join(element_text(element) for element in value)
+    infos['Mots-clés'] = mots_cles
+
+    citation = first(tree, f"//*[{has_classes('citation-count')}]")
+    if citation is None:
+        infos['Nombre de citations'] = None
+    else:
+        info_elem = block_text(citation).split('\n')
+        infos['Nombre de citations'] = 0 if len(info_elem) > 1 and info_elem[1] == 'Cited References' else info_elem[0]
+
+    infos['DOI'] = xpath_text(tree, "//*[@id='FullRTa-DOI']")
+    infos['Résumé'] = xpath_text(tree, "//*[@id='FullRTa-abstract-basic']")
+    infos['Type de document'] = xpath_text(tree, '//*[@id="FullRTa-doctype-0"]')
+    infos['issn'] = xpath_text(tree, f"//*[{has_classes('value', 'section-label-data', 'text-color')}]")
+    return infos
@@ -0,0 +1,30 @@
+from crawl_journal import CrawlJournal, replay
+
+
+def test_append_after_truncated_tail(tmp_path):
+    path = str(tmp_path / 'crawl_journal.jsonl')
+    journal = CrawlJournal(path)
+    journal.author('Jane Example', {'Nom Complet': 'Jane Example'})
+    journal.close()
+    # Arrêt brutal au milieu d'une ligne
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"type": "article", "data": {"Titre de l')
+
+    journal = CrawlJournal(path)
+    journal.issn('Journal of Examples', '1234-5678')
+    journal.close()
+
+    treated_authors, all_author_data, _, _, searched = replay(path)
+    assert treated_authors == {'Jane Example'}
+    assert all_author_data == [{'Nom Complet': 'Jane Example'}]
+    assert searched['sources'] == {'Journal of Examples': '1234-5678'}
+
+
+def test_tail_without_any_complete_line(tmp_path):
+    path = str(tmp_path / 'crawl_journal.jsonl')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('{"type": "au')
+    journal = CrawlJournal(path, fsync_every=1)
+    journal.articles('AbCdEfGhIjkJ', 0)
+    journal.close()
+    assert replay(path)[4]['articles'] == {'AbCdEfGhIjkJ'}
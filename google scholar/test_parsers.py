@@ -0,0 +1,109 @@
+import os
+
+from http_fetcher import (parse_author_profile, parse_colleagues, parse_article_rows, parse_article_page,
+                          parse_journal_search, parse_journal_page, article_record)
+
+# Pages Scholar et Scimago anonymisées, au format de HttpFetcher(save_dir=...) (URL en première ligne) ;
+# les valeurs attendues sont celles que lisent les fonctions Selenium (auteur_file.py, article_file.py,
+# journal_file.py) sur les mêmes pages : texte aux espaces normalisés, champs absents à None
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+PROFILE_URL = 'https://scholar.google.com/citations?user=AbCdEfGhIjkJ&hl=en'
+ARTICLE_URL = ('https://scholar.google.com/citations?view_op=view_citation&hl=en&user=AbCdEfGhIjkJ'
+               '&citation_for_view=AbCdEfGhIjkJ:u5HHmVD_uO8C')
+
+
+def fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), encoding='utf-8') as f:
+        return f.read()
+
+
+def test_author_profile():
+    author_info, needs_full_list = parse_author_profile(fixture('author_profile.html'), PROFILE_URL)
+    assert author_info == {
+        "ID de l'Auteur": 'AbCdEfGhIjkJ',
+        'Nom Complet': 'Jane Example',
+        "Pays d'Affiliation": 'Example University, Rabat',
+        'Citations Totales': '1234',
+        'H-index': '17',
+        'FWCI': 'N/A',
+        'Co-auteurs': 'Ali Sample; Marie Placeholder',
+    }
+    # Bouton "Voir tout" : extract_author_info lit la liste complète dans la fenêtre des co-auteurs
+    assert needs_full_list
+
+
+def test_author_profile_without_metrics_or_coauthors():
+    author_info, needs_full_list = parse_author_profile(
+        fixture('author_solo.html'), 'https://scholar.google.com/citations?user=ZyXwVuTsRqpJ&hl=en')
+    assert author_info == {
+        "ID de l'Auteur": 'ZyXwVuTsRqpJ',
+        'Nom Complet': 'Sam Solo',
+        "Pays d'Affiliation": 'Independent researcher',
+        'Citations Totales': None,
+        'H-index': None,
+        'FWCI': 'N/A',
+        'Co-auteurs': None,
+    }
+    assert not needs_full_list
+    assert parse_article_rows(fixture('author_solo.html')) == []
+
+
+def test_colleagues():
+    assert parse_colleagues(fixture('colleagues_list.html')) == 'Ali Sample; Marie Placeholder; Omar Fixture'
+
+
+def test_article_rows():
+    assert parse_article_rows(fixture('author_profile.html')) == [
+        {'title': 'A study of example methods', 'link': ARTICLE_URL, 'citations': '42', 'year': '2021'},
+        {'title': 'Placeholder results for testing',
+         'link': ('https://scholar.google.com/citations?view_op=view_citation&hl=en&user=AbCdEfGhIjkJ'
+                  '&citation_for_view=AbCdEfGhIjkJ:d1gkVwhDpl0C'),
+         'citations': '', 'year': '2019'},
+    ]
+
+
+def test_article_page():
+    assert parse_article_page(fixture('article_detail.html')) == {
+        "Titre de l'article": 'A study of example methods',
+        'Auteurs': 'Jane Example, Ali Sample',
+        'Titre de source': 'Journal of Examples',
+        'Résumé': 'We present example methods for testing parsers.',
+        'DOI': 'https://doi.org/10.1000/example.2021.001',
+        'Mots-clés': None,
+        'Type de document': 'Article',
+    }
+
+
+def test_article_record_falls_back_to_list_row():
+    rows = parse_article_rows(fixture('author_profile.html'))
+    detailed = article_record(rows[0], parse_article_page(fixture('article_detail.html')))
+    assert detailed['Titre de source'] == 'Journal of Examples'
+    assert detailed['Lien'] == ARTICLE_URL
+    missing = article_record(rows[1], {})
+    assert missing["Titre de l'article"] == 'Placeholder results for testing'
+    assert missing['Année de publication'] == '2019'
+    assert set(missing) == set(detailed)
+
+
+def test_journal_search():
+    page = fixture('journalsearch_results.html')
+    assert parse_journal_search(page, 'Journal of Examples') == \
+        'https://www.scimagojr.com/journalsearch.php?q=12345&tip=sid&clean=0'
+    # Pas de titre identique : premier résultat, comme search_journal_by_issn
+    assert parse_journal_search(page, 'Unknown Journal') == \
+        'https://www.scimagojr.com/journalsearch.php?q=99999&tip=sid&clean=0'
+    assert parse_journal_search('<p>Sorry, no results were found.</p>', 'Unknown Journal') is None
+
+
+def test_journal_page():
+    assert parse_journal_page(fixture('journal_page.html')) == {
+        'Nom': 'Journal of Examples',
+        'Editeur': 'Example Press',
+        'ISSN': '12345678, 8765432X',
+        'Index': '1995-2023',
+        'H-index': '58',
+        'Quartile': 'Q1',
+        'SJR': '0.907',
+        'Impact factor': '3.214',
+        'Portee thematique': 'The journal publishes original research on example methods.',
+    }
@@ -0,0 +1,97 @@
+import os
+
+from page_cache import page_kind
+from source_parsers import (parse_scopus_author, parse_scopus_coauthors, parse_scopus_document,
+                            parse_wos_author, parse_wos_article)
+
+# Pages Scopus et Web of Science réduites aux éléments que lisent les notebooks (mêmes classes et
+# identifiants) ; les valeurs attendues sont celles que liraient les fonctions Selenium des notebooks
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+SCOPUS_AUTHOR_URL = 'https://www.scopus.com/authid/detail.uri?authorId=57203014555#tab=metrics'
+WOS_PROXY = 'https://www.webofscience.com.eressources.imist.ma'
+
+
+def fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), encoding='utf-8') as f:
+        return f.read()
+
+
+def test_page_kind():
+    assert page_kind(SCOPUS_AUTHOR_URL) == 'scopus_author'
+    assert page_kind('https://www.scopus.com/search/submit/coAuthorSearch.uri?authorId=1&origin=AuthorProfile') \
+        == 'scopus_coauthors'
+    assert page_kind('https://www.scopus.com/record/display.uri?eid=2-s2.0-85000000001') == 'scopus_document'
+    assert page_kind(f'{WOS_PROXY}/wos/author/record/1234567') == 'wos_author'
+    assert page_kind(f'{WOS_PROXY}/wos/woscc/full-record/WOS:000000000000001') == 'wos_article'
+    assert page_kind(f'{WOS_PROXY}/') == 'other'
+
+
+def test_scopus_author():
+    author_data, docs_links = parse_scopus_author(fixture('scopus_author.html'), SCOPUS_AUTHOR_URL)
+    assert author_data == {
+        "Nom_Complet": 'Example, Jane',
+        "Affiliation": 'Rabat - Morocco',
+        "Citations": 1234,
+        "Documents": 42,
+        "h-index": 17,
+        "FWCI": 1.37,
+    }
+    assert docs_links == [
+        'https://www.scopus.com/record/display.uri?eid=2-s2.0-85000000001&origin=resultslist',
+        'https://www.scopus.com/record/display.uri?eid=2-s2.0-85000000002&origin=resultslist',
+    ]
+
+
+def test_scopus_coauthors():
+    page = ('<table id="srchResultsList">'
+            '<tr><td><a href="/authid/detail.uri?authorId=57203014555">Example, Jane</a></td></tr>'
+            '<tr><td><a href="/authid/detail.uri?authorId=11111111111">Sample, Ali</a></td></tr>'
+            '<tr><td>Sans lien</td></tr>'
+            '<tr><td><a href="/authid/detail.uri?authorId=22222222222">Placeholder, Marie</a></td></tr>'
+            '</table>')
+    url = 'https://www.scopus.com/search/submit/coAuthorSearch.uri?authorId=57203014555&origin=AuthorProfile'
+    assert parse_scopus_coauthors(page, url) == ['11111111111', '22222222222']
+
+
+def test_scopus_document():
+    assert parse_scopus_document(fixture('scopus_document.html')) == {
+        "authors": ['Example, J.', 'Sample, A.'],
+        "issn": '12345678',
+        "doi": '10.1000/example.2021.001',
+        "title": 'A study of example methods',
+        "type_doc": 'Article',
+        "source_type": 'Journal',
+        "citation": '12',
+        "date_pub": 'March 2021',
+        "abstract": 'We present example methods for testing parsers.',
+        "key_words": ['Parsing', 'Testing'],
+    }
+
+
+def test_wos_author():
+    infos, id_co_auteur = parse_wos_author(fixture('wos_author.html'), f'{WOS_PROXY}/wos/author/record/1234567')
+    assert infos == {
+        'ID de l\'Auteur': '1234567',
+        'nom_complet': 'Example, Jane',
+        'pays_affiliation': 'Morocco',
+        'co_auteurs': ['Sample, Ali', 'Placeholder, Marie'],
+        'H-Index': '17',
+        'Sum of Times Cited': '1,234',
+    }
+    assert id_co_auteur == ['2345678', '3456789']
+
+
+def test_wos_article():
+    assert parse_wos_article(fixture('wos_article.html')) == {
+        'Titre de l’article': 'A study of example methods',
+        'Auteurs': 'Example, Jane ; Sample, Ali',
+        'Date de publication': 'MAR 2021',
+        'Titre de la source': 'JOURNAL OF EXAMPLES',
+        'Mots-clés': ' PARSING Testing ; Fixtures',
+        'Nombre de citations': '12',
+        'DOI': '10.1000/example.2021.001',
+        'Résumé': 'We present example methods for testing parsers.',
+        'Type de document': 'Article',
+        'issn': '1234-5678',
+    }
+    assert parse_wos_article('<div class="error-content">Record not found</div>') is None